@@ -0,0 +1,26 @@
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from api.constants import TOKEN_CACHE_KEY, TOKEN_CACHE_TIMEOUT
+
+
+def invalidate_tokens(*keys):
+    cache.delete_many([TOKEN_CACHE_KEY.format(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication с кэшем токен -> пользователь.
+
+    Записи сбрасываются при удалении токена и любом сохранении
+    пользователя, в том числе при смене пароля и деактивации. Другие
+    процессы видят сброс сразу, только если кэш общий (проверка api.W001),
+    иначе отозванный токен действует в них до TOKEN_CACHE_TIMEOUT.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = TOKEN_CACHE_KEY.format(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, TOKEN_CACHE_TIMEOUT)
+        return token.user, token
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кэш токенов, закреплений за основной базой и счетчиков частоты
+    запросов должен быть общим для всех процессов."""
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Warning(
+        'Кэш по умолчанию виден только своему процессу.',
+        hint=(
+            'Отзыв токенов, чтение своих изменений после записи и '
+            'ограничение частоты запросов не будут согласованы между '
+            'процессами. Укажите общий CACHE_BACKEND, например '
+            'django.core.cache.backends.memcached.PyMemcacheCache.'
+        ),
+        id='api.W001',
+    )]
@@ -1 +1,26 @@
 LIMIT_SIZE = 6
+FEED_MAX_PAGE_SIZE = 100
+RECIPE_ORDERING_CHOICES = (
+    ('popular', 'Популярные'),
+    ('trending', 'В тренде'),
+    ('calories', 'Калорийность по возрастанию'),
+    ('-calories', 'Калорийность по убыванию'),
+    ('cost', 'Стоимость по возрастанию'),
+    ('-cost', 'Стоимость по убыванию'),
+    ('views', 'Просмотры по возрастанию'),
+    ('-views', 'Просмотры по убыванию'),
+)
+SCORE_ORDERINGS = ('popular', 'trending')
+TAGS_MATCH_CHOICES = (
+    ('any', 'Любой из тегов'),
+    ('all', 'Все теги'),
+)
+TOKEN_CACHE_KEY = 'auth-token:{}'
+TOKEN_CACHE_TIMEOUT = 60
+BATCH_MAX_SIZE = 100
+FIELDS_QUERY_PARAM = 'fields'
+CATALOGUE_CACHE_CONTROL = {
+    'public': True,
+    'max_age': 60 * 60 * 24 * 365,
+    'immutable': True,
+}
@@ -1,5 +1,8 @@
+from django.db.models import Exists, F, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
+from api.constants import (RECIPE_ORDERING_CHOICES, SCORE_ORDERINGS,
+                           TAGS_MATCH_CHOICES)
 from recipes.models import Ingredient, Recipe, Tag
 
 
@@ -13,22 +16,62 @@ class IngredientFilter(FilterSet):
 
 class RecipeFilter(FilterSet):
     tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
         to_field_name='slug',
         queryset=Tag.objects.all(),
+        method='filter_tags',
         label='Теги'
     )
+    tags_match = filters.ChoiceFilter(
+        choices=TAGS_MATCH_CHOICES,
+        method='filter_tags_match',
+        label='Совпадение тегов'
+    )
     is_favorited = filters.BooleanFilter(method='filter_is_favorited',
                                          label='Избранные')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart',
         label='В списке покупок'
     )
+    calories_min = filters.NumberFilter(
+        field_name='calories', lookup_expr='gte', label='Калорийность от'
+    )
+    calories_max = filters.NumberFilter(
+        field_name='calories', lookup_expr='lte', label='Калорийность до'
+    )
+    cost_min = filters.NumberFilter(
+        field_name='cost', lookup_expr='gte', label='Стоимость от'
+    )
+    cost_max = filters.NumberFilter(
+        field_name='cost', lookup_expr='lte', label='Стоимость до'
+    )
+    ordering = filters.ChoiceFilter(
+        choices=RECIPE_ORDERING_CHOICES,
+        method='filter_ordering',
+        label='Сортировка'
+    )
 
     class Meta:
         model = Recipe
         fields = ('author', 'is_favorited', 'is_in_shopping_cart', 'tags')
 
+    def filter_tags(self, queryset, name, value):
+        tag_ids = {tag.id for tag in value}
+        if not tag_ids:
+            return queryset
+        recipe_tags = Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk')
+        )
+        if self.form.cleaned_data.get('tags_match') == 'all':
+            for tag_id in tag_ids:
+                queryset = queryset.filter(
+                    Exists(recipe_tags.filter(tag_id=tag_id))
+                )
+            return queryset
+        return queryset.filter(Exists(recipe_tags.filter(tag_id__in=tag_ids)))
+
+    def filter_tags_match(self, queryset, name, value):
+        return queryset
+
     def filter_is_favorited(self, queryset, name, value):
         if self.request.user.is_authenticated and value:
             return queryset.filter(favorites__user=self.request.user)
@@ -38,3 +81,15 @@ class RecipeFilter(FilterSet):
         if self.request.user.is_authenticated and value:
             return queryset.filter(shopping_carts__user=self.request.user)
         return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        if value in SCORE_ORDERINGS:
+            return queryset.order_by(
+                F(f'score__{value}').desc(nulls_last=True), '-pub_date'
+            )
+        field = F(value.lstrip('-'))
+        return queryset.order_by(
+            field.desc(nulls_last=True) if value.startswith('-')
+            else field.asc(nulls_last=True),
+            '-pub_date',
+        )
@@ -1,6 +1,81 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from binascii import Error as DecodeError
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api.constants import FEED_MAX_PAGE_SIZE, LIMIT_SIZE
 
 
 class LimitPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class OptionalLimitPagination(LimitPagination):
+    """Делит список на страницы, только если передан limit."""
+
+    page_size = None
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по ключу (pub_date, id) последней записи."""
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    max_page_size = FEED_MAX_PAGE_SIZE
+    page_size = LIMIT_SIZE
+    page_size_query_param = 'limit'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, recipe_id = b64decode(
+                encoded.encode()).decode().split('|')
+            position = parse_datetime(pub_date), int(recipe_id)
+        except (DecodeError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def encode_cursor(position):
+        pub_date, recipe_id = position
+        return b64encode(
+            f'{pub_date.isoformat()}|{recipe_id}'.encode()).decode()
+
+    def paginate_keys(self, get_keys, request):
+        self.request = request
+        limit = self.get_page_size(request)
+        keys = get_keys(limit + 1, self.decode_cursor(request))
+        page = keys[:limit]
+        self.next_position = page[-1] if len(keys) > limit else None
+        return page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,51 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson else None
+)
+EXPONENT = re.compile(rb'\d[eE][-+]?\d')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, кодирующий компактный вывод через orjson.
+
+    Даты и прочие нестандартные типы отдаются кодировщику DRF, поэтому
+    результат совпадает с JSONRenderer байт в байт. Числа с экспонентой
+    orjson пишет иначе (1e-7 вместо 1e-07), поэтому при похожей на них
+    последовательности вывод пересобирается через JSONRenderer. NaN и
+    бесконечность orjson отдает как null, а JSONRenderer - ошибкой. Без
+    orjson и для форматированного вывода работает как JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if EXPONENT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace(
+            '\u2029'.encode(), b'\\u2029'
+        )
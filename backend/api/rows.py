@@ -0,0 +1,115 @@
+"""Сборка ответов списков напрямую из values() без сериализаторов.
+
+Результат совпадает с выводом соответствующих сериализаторов,
+но не проходит по полям каждой строки.
+"""
+from django.core.files.storage import default_storage
+
+from api.serializers import (GramUserSerializer, RecipeIngredientSerializer,
+                             RecipeSerializer, TagSerializer)
+from recipes.models import Recipe, RecipeIngredient
+
+IMAGE_FIELDS = ('image', 'avatar')
+RECIPE_COLUMNS = ('id', 'name', 'image', 'cooking_time', 'text')
+USER_FLAGS = ('is_subscribed',)
+
+
+def build_image_url(name, request):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def simple_rows(queryset, serializer_class):
+    return list(queryset.values(*serializer_class.Meta.fields))
+
+
+def get_recipe_values(queryset, fields):
+    columns = [
+        name for name in RECIPE_COLUMNS if name in fields or name == 'id'
+    ]
+    for annotation in ('is_favorited', 'is_in_shopping_cart'):
+        if annotation in fields and annotation in queryset.query.annotations:
+            columns.append(annotation)
+    if 'author' in fields:
+        columns += [
+            f'author__{name}' for name in GramUserSerializer.Meta.fields
+            if name not in USER_FLAGS
+        ]
+        if 'author_is_subscribed' in queryset.query.annotations:
+            columns.append('author_is_subscribed')
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def build_author(row, request):
+    author = {}
+    for name in GramUserSerializer.Meta.fields:
+        if name in USER_FLAGS:
+            author[name] = row.get('author_is_subscribed', False)
+        elif name in IMAGE_FIELDS:
+            author[name] = build_image_url(row[f'author__{name}'], request)
+        else:
+            author[name] = row[f'author__{name}']
+    return author
+
+
+def get_ingredients(recipe_ids):
+    ingredients = {}
+    rows = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).order_by(
+        'id'
+    ).values_list(
+        'recipe_id', 'ingredient__id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount'
+    )
+    for recipe_id, *values in rows:
+        ingredients.setdefault(recipe_id, []).append(
+            dict(zip(RecipeIngredientSerializer.Meta.fields, values))
+        )
+    return ingredients
+
+
+def get_tags(recipe_ids):
+    tags = {}
+    rows = Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('tag__name').values_list(
+        'recipe_id', *(f'tag__{name}' for name in TagSerializer.Meta.fields)
+    )
+    for recipe_id, *values in rows:
+        tags.setdefault(recipe_id, []).append(
+            dict(zip(TagSerializer.Meta.fields, values))
+        )
+    return tags
+
+
+def build_recipe(row, request, fields, ingredients, tags):
+    recipe = {}
+    for name in RecipeSerializer.Meta.fields:
+        if name not in fields:
+            continue
+        if name == 'author':
+            recipe[name] = build_author(row, request)
+        elif name in IMAGE_FIELDS:
+            recipe[name] = build_image_url(row[name], request)
+        elif name == 'ingredients':
+            recipe[name] = ingredients.get(row['id'], [])
+        elif name == 'tags':
+            recipe[name] = tags.get(row['id'], [])
+        elif name in ('is_favorited', 'is_in_shopping_cart'):
+            recipe[name] = row.get(name, False)
+        else:
+            recipe[name] = row[name]
+    return recipe
+
+
+def recipe_rows(page, request, fields):
+    """Строки RecipeSerializer для страницы из get_recipe_values."""
+    recipe_ids = [row['id'] for row in page]
+    ingredients = (
+        get_ingredients(recipe_ids) if 'ingredients' in fields else {}
+    )
+    tags = get_tags(recipe_ids) if 'tags' in fields else {}
+    return [
+        build_recipe(row, request, fields, ingredients, tags) for row in page
+    ]
@@ -1,19 +1,97 @@
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.forms import ValidationError
 from djoser.serializers import UserSerializer
 from drf_extra_fields.fields import Base64ImageField
+from foodgram.deletion import bulk_delete
 from rest_framework import serializers
-
-from api.constants import LIMIT_SIZE
-from recipes.constants import INGREDIENT_AMOUNT_MAX, INGREDIENT_AMOUNT_MIN
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+from api.constants import BATCH_MAX_SIZE, FIELDS_QUERY_PARAM, LIMIT_SIZE
+from recipes.changes import record_queryset
+from recipes.constants import (CHANGES_BATCH_SIZE, INGREDIENT_AMOUNT_MAX,
+                               INGREDIENT_AMOUNT_MIN)
+from recipes.models import (ChangeEvent, Favorite, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from recipes.tasks import delete_media
 from users.models import Follow
 
 User = get_user_model()
 
 
+def get_requested_fields(request):
+    if request is None or not request.query_params.get(FIELDS_QUERY_PARAM):
+        return None
+    return set(request.query_params[FIELDS_QUERY_PARAM].split(','))
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля из ?fields=.
+
+    Действует лишь на сериализатор верхнего уровня,
+    вложенные объекты выводятся целиком.
+    """
+
+    def is_root(self):
+        return self.parent is None or (
+            isinstance(self.parent, serializers.ListSerializer)
+            and self.parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None or not self.is_root():
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in requested
+        }
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField, берущий объекты из заранее загруженных.
+
+    Списки таких полей загружают все объекты одним запросом вместо
+    запроса на каждый элемент.
+    """
+
+    preloaded = {}
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return PreloadedManyRelatedField(**list_kwargs)
+
+    def preload(self, data):
+        pks = set()
+        for pk in data:
+            try:
+                pks.add(int(pk))
+            except (TypeError, ValueError):
+                continue
+        self.preloaded = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class PreloadedManyRelatedField(serializers.ManyRelatedField):
+
+    def to_internal_value(self, data):
+        if isinstance(data, (list, tuple)):
+            self.child_relation.preload(data)
+        return super().to_internal_value(data)
+
+
 class AvatarSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(allow_null=True)
 
@@ -22,7 +100,7 @@ class AvatarSerializer(serializers.ModelSerializer):
         fields = ('avatar',)
 
 
-class GramUserSerializer(UserSerializer):
+class GramUserSerializer(SparseFieldsMixin, UserSerializer):
     avatar = Base64ImageField(required=False, allow_null=True)
     is_subscribed = serializers.SerializerMethodField()
 
@@ -36,6 +114,8 @@ class GramUserSerializer(UserSerializer):
         read_only_fields = ('id', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context['request']
         return (request and request.user.is_authenticated
                 and request.user.user_subscriptions.filter(
@@ -49,30 +129,40 @@ class ShortRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
-class FavoriteShoppingCartSerializers(serializers.ModelSerializer):
+class AuthorIdsSerializer(serializers.Serializer):
+    authors = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
 
-    class Meta:
-        fields = ('recipe', 'user')
 
-    def validate(self, data):
-        user = data.get('user')
-        recipe = data.get('recipe')
-        if self.Meta.model.objects.filter(recipe=recipe, user=user).exists():
-            raise ValidationError(
-                f'"{recipe.name}" уже добавлен в {self._meta.verbose_name}')
-        return data
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
 
-    def to_representation(self, instance):
-        return ShortRecipeSerializer(
-            instance.recipe,
-            context=self.context
-        ).data
+
+class RecipeMatchSerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
+    max_missing = serializers.IntegerField(min_value=0, required=False)
 
 
-class FavoriteSerializer(FavoriteShoppingCartSerializers):
+class CatalogueDeltaSerializer(serializers.Serializer):
+    since_version = serializers.IntegerField(min_value=0)
 
-    class Meta(FavoriteShoppingCartSerializers.Meta):
-        model = Favorite
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=CHANGES_BATCH_SIZE, default=CHANGES_BATCH_SIZE
+    )
 
 
 class FollowCreateSerializer(serializers.ModelSerializer):
@@ -122,16 +212,13 @@ class FollowIssuanceSerializer(GramUserSerializer):
 
     def get_recipes(self, obj):
         request = self.context['request']
-        if 'recipes_limit' in request.GET:
-            try:
-                limit = int(request.GET['recipes_limit'])
-            except ValueError:
-                pass
-        else:
+        try:
+            limit = int(request.GET.get('recipes_limit', LIMIT_SIZE))
+        except ValueError:
             limit = LIMIT_SIZE
 
         return ShortRecipeSerializer(
-            obj.recipes.all()[:int(limit)],
+            obj.recipes.all()[:limit],
             many=True,
             context=self.context
         ).data
@@ -151,9 +238,19 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'slug')
 
 
+class RecipeIngredientListSerializer(serializers.ListSerializer):
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.fields['id'].preload(
+                item.get('id') for item in data if isinstance(item, dict)
+            )
+        return super().to_internal_value(data)
+
+
 class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all(),
-                                            source='ingredient.id')
+    id = PreloadedPrimaryKeyRelatedField(queryset=Ingredient.objects.all(),
+                                         source='ingredient.id')
     amount = serializers.IntegerField(
         max_value=INGREDIENT_AMOUNT_MAX,
         min_value=INGREDIENT_AMOUNT_MIN,
@@ -162,6 +259,7 @@ class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = RecipeIngredient
         fields = ('id', 'amount')
+        list_serializer_class = RecipeIngredientListSerializer
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
@@ -177,7 +275,7 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = PreloadedPrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
         many=True,
         label='Теги',
@@ -211,8 +309,21 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 amount=ingredient['amount']
             ) for ingredient in ingredients
         )
+        record_queryset(
+            RecipeIngredient.objects.filter(recipe=recipe),
+            ChangeEvent.Action.SAVE,
+        )
 
     def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance],
+            Prefetch(
+                'ingredient_list',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient').order_by('id')
+            ),
+            'tags',
+        )
         serializer = RecipeSerializer(
             instance,
             context=self.context
@@ -229,12 +340,23 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         self.set_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
+        old_image = instance.image.name
         instance.tags.clear()
-        instance.ingredients.clear()
+        bulk_delete(RecipeIngredient, instance.ingredient_list.values_list(
+            'pk', flat=True
+        ))
         self.set_ingredients(validated_data.pop('ingredients'), instance)
         instance.tags.set(validated_data.pop('tags'))
-        return super().update(instance, validated_data)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Просмотры и пищевая ценность пишутся в обход сериализатора,
+        # поэтому сохраняются только поля из запроса.
+        instance.save(update_fields=(*validated_data, 'modified'))
+        if old_image and old_image != instance.image.name:
+            delete_media.delay(old_image)
+        return instance
 
     def validate(self, data):
         ingredients = data.get('ingredients')
@@ -255,7 +377,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return data
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = GramUserSerializer(read_only=True)
     ingredients = RecipeIngredientSerializer(
         source='ingredient_list',
@@ -279,7 +401,9 @@ class RecipeSerializer(serializers.ModelSerializer):
             'text',
         )
 
-    def check_request(self, obj, model):
+    def check_request(self, obj, model, annotation):
+        if hasattr(obj, annotation):
+            return getattr(obj, annotation)
         request = self.context.get('request')
         return (
             request
@@ -288,13 +412,12 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
-        return self.check_request(obj, Favorite)
+        return self.check_request(obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return self.check_request(obj, ShoppingCart)
+        return self.check_request(obj, ShoppingCart, 'is_in_shopping_cart')
 
-
-class ShoppingCartSerializer(FavoriteShoppingCartSerializers):
-
-    class Meta(FavoriteShoppingCartSerializers.Meta):
-        model = ShoppingCart
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
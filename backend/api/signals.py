@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from foodgram.deletion import pre_bulk_delete
+from rest_framework.authtoken.models import Token
+
+from api.authentication import invalidate_tokens
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver(pre_bulk_delete, sender=Token)
+def invalidate_deleted_tokens(sender, queryset, **kwargs):
+    invalidate_tokens(*queryset.values_list('key', flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    invalidate_tokens(*Token.objects.filter(
+        user=instance
+    ).values_list('key', flat=True))
@@ -0,0 +1,68 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов по скользящему окну.
+
+    Хранит в кэше только два счётчика на клиента: текущего и прошлого
+    окна. Вклад прошлого окна убывает линейно по мере его ухода.
+    Область берётся из throttle_scopes представления по действию,
+    иначе read/write по методу; для анонимов - с префиксом anon_.
+    """
+
+    cache_format = 'throttle:{scope}:{ident}:{window}'
+
+    def __init__(self):
+        pass
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scopes', {}).get(
+            getattr(view, 'action', None)
+        )
+        if scope is None:
+            scope = 'read' if request.method in SAFE_METHODS else 'write'
+        if not request.user.is_authenticated:
+            scope = f'anon_{scope}'
+        return scope
+
+    def get_ident(self, request):
+        if request.user.is_authenticated:
+            return request.user.pk
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        ident = self.get_ident(request)
+        position = self.timer() / self.duration
+        window = int(position)
+        current_key, previous_key = (
+            self.cache_format.format(
+                scope=self.scope, ident=ident, window=number
+            ) for number in (window, window - 1)
+        )
+        counts = self.cache.get_many((current_key, previous_key))
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        elapsed = position - window
+        if previous * (1 - elapsed) + current >= self.num_requests:
+            self.wait_seconds = self.get_wait(previous, current, elapsed)
+            return False
+        # add не перезаписывает счетчик, созданный параллельным запросом.
+        self.cache.add(current_key, 0, self.duration * 2)
+        self.cache.incr(current_key)
+        return True
+
+    def get_wait(self, previous, current, elapsed):
+        if current < self.num_requests:
+            release = 1 - (self.num_requests - current) / previous
+            return (release - elapsed) * self.duration
+        release = 1 - self.num_requests / current
+        return (1 - elapsed + release) * self.duration
+
+    def wait(self):
+        return self.wait_seconds
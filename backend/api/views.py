@@ -1,26 +1,50 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum
-from django.http import FileResponse
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import (BooleanField, Count, Exists, F, OuterRef,
+                              Prefetch, Subquery, Sum, Value)
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from recipes.views import short_url
+from foodgram.deletion import bulk_delete
+from foodgram.payloads import get_payload_digest, payload_response
+from recipes.views import short_link
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
 
+from api.constants import CATALOGUE_CACHE_CONTROL
 from api.filters import IngredientFilter, RecipeFilter
-from api.pagination import LimitPagination
+from api.pagination import (KeysetPagination, LimitPagination,
+                            OptionalLimitPagination)
 from api.permissions import OwnerOrReadOnly
-from api.serializers import (AvatarSerializer, FavoriteSerializer,
+from api.renderers import FastJSONRenderer
+from api.rows import get_recipe_values, recipe_rows, simple_rows
+from api.serializers import (AuthorIdsSerializer, AvatarSerializer,
+                             CatalogueDeltaSerializer, ChangesQuerySerializer,
                              FollowCreateSerializer, FollowIssuanceSerializer,
                              GramUserSerializer, IngredientSerializer,
-                             RecipeCreateSerializer, RecipeSerializer,
-                             ShoppingCartSerializer, TagSerializer)
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+                             RecipeCreateSerializer, RecipeIdsSerializer,
+                             RecipeMatchSerializer, RecipeSerializer,
+                             ShortRecipeSerializer, TagSerializer,
+                             get_requested_fields)
+from recipes import catalogue
+from recipes.analytics import recipe_views
+from recipes.changes import get_events, record_queryset
+from recipes.feed import get_feed_keys
+from recipes.matching import match_index
+from recipes.models import (ChangeEvent, CoFavoriteRecipe, Favorite,
+                            Ingredient, Recipe, RecipeIngredient, ShoppingCart,
+                            SimilarRecipe, Tag, UnitConversion)
+from recipes.shortlinks import get_code
+from recipes.tasks import backfill_feed, update_recipe_scores
 from users.models import Follow
 
 
@@ -31,8 +55,24 @@ class GramUserViewSet(UserViewSet):
     queryset = User.objects.all()
     pagination_class = LimitPagination
     permission_classes = (AllowAny,)
+    read_from_replica = True
     serializer_class = GramUserSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        fields = get_requested_fields(self.request)
+        if user.is_authenticated and (
+            fields is None or 'is_subscribed' in fields
+        ):
+            queryset = queryset.annotate(is_subscribed=Exists(
+                Follow.objects.filter(user=user, author=OuterRef('pk'))
+            ))
+        return queryset
+
+    def perform_destroy(self, instance):
+        bulk_delete(User, [instance.pk])
+
     @action(
         methods=('put',),
         detail=False,
@@ -78,7 +118,8 @@ class GramUserViewSet(UserViewSet):
             }
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
@@ -95,6 +136,72 @@ class GramUserViewSet(UserViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(IsAuthenticated,),
+        url_path='subscribe',
+        url_name='subscribe-batch',
+    )
+    def subscribe_batch(self, request):
+        serializer = AuthorIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+        author_ids = set(User.objects.filter(
+            id__in=serializer.validated_data['authors']
+        ).exclude(id=user.id).values_list('id', flat=True))
+        new_ids = author_ids - set(Follow.objects.filter(
+            user=user, author_id__in=author_ids
+        ).values_list('author_id', flat=True))
+        with transaction.atomic():
+            Follow.objects.bulk_create(
+                (
+                    Follow(user=user, author_id=author_id)
+                    for author_id in new_ids
+                ),
+                ignore_conflicts=True,
+            )
+            record_queryset(
+                Follow.objects.filter(user=user, author_id__in=new_ids),
+                ChangeEvent.Action.SAVE,
+            )
+        if new_ids:
+            backfill_feed.delay(user.id, *sorted(new_ids))
+        return Response(
+            {'authors': sorted(author_ids)},
+            status=status.HTTP_201_CREATED
+        )
+
+    @subscribe_batch.mapping.delete
+    def delete_subscribe_batch(self, request):
+        serializer = AuthorIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bulk_delete(Follow, Follow.objects.filter(
+            user=request.user,
+            author_id__in=serializer.validated_data['authors']
+        ).values_list('pk', flat=True))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+        url_path='subscriptions/status',
+        url_name='subscriptions-status',
+    )
+    def subscriptions_status(self, request):
+        serializer = AuthorIdsSerializer(data={
+            'authors': request.query_params.get('authors', '').split(',')
+        })
+        serializer.is_valid(raise_exception=True)
+        author_ids = serializer.validated_data['authors']
+        subscribed = set(Follow.objects.filter(
+            user=request.user, author_id__in=author_ids
+        ).values_list('author_id', flat=True))
+        return Response({
+            author_id: author_id in subscribed for author_id in author_ids
+        })
+
     @action(
         detail=False,
         methods=('get',),
@@ -104,10 +211,23 @@ class GramUserViewSet(UserViewSet):
     )
     def get_subscriptions(self, request):
         user = request.user
+        fields = (
+            get_requested_fields(request)
+            or set(FollowIssuanceSerializer.Meta.fields)
+        )
         queryset = User.objects.filter(
-            subscriptions_to_author__user=user).annotate(
-            recipes_count=Count('recipes')
+            subscriptions_to_author__user=user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
         ).order_by('username')
+        if 'recipes_count' in fields:
+            queryset = queryset.annotate(recipes_count=Count('recipes'))
+        if 'recipes' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'recipes',
+                queryset=Recipe.objects.only(
+                    'author', *ShortRecipeSerializer.Meta.fields)
+            ))
         pages = self.paginate_queryset(queryset)
         serializer = FollowIssuanceSerializer(
             pages,
@@ -121,26 +241,264 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    pagination_class = OptionalLimitPagination
     permission_classes = (AllowAny,)
+    read_from_replica = True
     serializer_class = IngredientSerializer
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            queryset = self.filter_queryset(self.get_queryset()).values(
+                *self.serializer_class.Meta.fields
+            )
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(list(queryset))
+        return payload_response(
+            request, 'ingredients', self.build_payload, self.get_version
+        )
+
+    def get_version(self):
+        return catalogue.get_version()
 
-class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Recipe.objects
-        .select_related('author')
-        .prefetch_related('ingredients', 'tags')
+    def build_payload(self):
+        return FastJSONRenderer().render(simple_rows(
+            self.get_queryset().using(DEFAULT_DB_ALIAS), self.serializer_class
+        ))
+
+    def build_catalogue(self):
+        version = self.get_version()
+        return FastJSONRenderer().render({
+            'version': version,
+            'ingredients': simple_rows(
+                self.get_queryset().using(DEFAULT_DB_ALIAS),
+                self.serializer_class,
+            ),
+        })
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='catalogue',
+        url_name='catalogue',
     )
+    def catalogue(self, request):
+        if 'since_version' in request.query_params:
+            serializer = CatalogueDeltaSerializer(data=request.query_params)
+            serializer.is_valid(raise_exception=True)
+            version, ingredients, deleted = catalogue.get_changes(
+                serializer.validated_data['since_version'],
+                self.serializer_class.Meta.fields,
+            )
+            return Response({
+                'version': version,
+                'ingredients': ingredients,
+                'deleted': deleted,
+            })
+        digest = get_payload_digest(
+            'ingredient-catalogue', self.build_catalogue, self.get_version
+        )
+        return Response({
+            'hash': digest,
+            'url': self.reverse_action('catalogue-snapshot', args=(digest,)),
+        })
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path=r'catalogue/(?P<digest>[0-9a-f]+)',
+        url_name='catalogue-snapshot',
+    )
+    def catalogue_snapshot(self, request, digest):
+        if digest != get_payload_digest(
+            'ingredient-catalogue', self.build_catalogue, self.get_version
+        ):
+            raise NotFound('Снимок справочника устарел.')
+        response = payload_response(
+            request, 'ingredient-catalogue', self.build_catalogue,
+            self.get_version,
+        )
+        response['ETag'] = f'"{digest}"'
+        patch_cache_control(response, **CATALOGUE_CACHE_CONTROL)
+        return response
+
+
+class RecipeViewSet(viewsets.ModelViewSet):
+    queryset = Recipe.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
     pagination_class = LimitPagination
     permission_classes = (OwnerOrReadOnly,)
+    read_from_replica = True
+    throttle_scopes = {
+        'download_shopping_cart': 'export',
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is not RecipeSerializer:
+            return queryset
+        fields = (
+            get_requested_fields(self.request)
+            or set(RecipeSerializer.Meta.fields)
+        )
+        user = self.request.user
+        if 'author' in fields:
+            queryset = queryset.select_related('author')
+            if user.is_authenticated:
+                queryset = queryset.annotate(author_is_subscribed=Exists(
+                    Follow.objects.filter(user=user, author=OuterRef('author'))
+                ))
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'ingredient_list',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient').order_by('id')
+            ))
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'text' not in fields:
+            queryset = queryset.defer('text')
+        if user.is_authenticated:
+            for annotation, model in (
+                ('is_favorited', Favorite),
+                ('is_in_shopping_cart', ShoppingCart),
+            ):
+                if annotation in fields:
+                    queryset = queryset.annotate(**{annotation: Exists(
+                        model.objects.filter(user=user, recipe=OuterRef('pk'))
+                    )})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        fields = (
+            get_requested_fields(request)
+            or set(RecipeSerializer.Meta.fields)
+        )
+        page = self.paginate_queryset(get_recipe_values(
+            self.filter_queryset(self.get_queryset()), fields
+        ))
+        return self.get_paginated_response(recipe_rows(page, request, fields))
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve', 'get-link'):
+        if self.action in (
+            'list', 'retrieve', 'get-link', 'feed', 'match', 'similar',
+            'recommended',
+        ):
             return RecipeSerializer
         return RecipeCreateSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        recipe_views.add(int(self.kwargs['pk']))
+        return response
+
+    def perform_destroy(self, instance):
+        bulk_delete(Recipe, [instance.pk])
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+        url_path='feed',
+        url_name='feed',
+    )
+    def feed(self, request):
+        paginator = KeysetPagination()
+        keys = paginator.paginate_keys(
+            lambda limit, position: get_feed_keys(
+                request.user, limit, position),
+            request,
+        )
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for _, recipe_id in keys]
+        )
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for _, recipe_id in keys
+             if recipe_id in recipes],
+            many=True,
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(AllowAny,),
+        url_path='match',
+        url_name='match',
+    )
+    def match(self, request):
+        serializer = RecipeMatchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        page = self.paginate_queryset(match_index.match(
+            serializer.validated_data['ingredients'],
+            serializer.validated_data.get('max_missing'),
+        ))
+        return self.get_paginated_response(self.get_ranked_rows(page))
+
+    @action(
+        detail=True,
+        methods=('get',),
+        permission_classes=(AllowAny,),
+        url_path='similar',
+        url_name='similar',
+    )
+    def similar(self, request, pk=None):
+        recipe = get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        page = self.paginate_queryset(SimilarRecipe.objects.filter(
+            recipe=recipe
+        ).order_by('-score', 'neighbour_id').values_list(
+            'neighbour_id', 'score'
+        ))
+        return self.get_paginated_response(self.get_ranked_rows([
+            {'id': neighbour_id, 'similarity': score}
+            for neighbour_id, score in page
+        ]))
+
+    @action(
+        detail=False,
+        methods=('get',),
+        permission_classes=(IsAuthenticated,),
+        url_path='recommended',
+        url_name='recommended',
+    )
+    def recommended(self, request):
+        favorites = Favorite.objects.filter(user=request.user).values('recipe')
+        page = self.paginate_queryset(CoFavoriteRecipe.objects.filter(
+            recipe__in=favorites
+        ).exclude(
+            neighbour__in=favorites
+        ).exclude(
+            neighbour__author=request.user
+        ).values('neighbour').annotate(
+            total=Sum('score')
+        ).order_by('-total', '-neighbour').values_list('neighbour', 'total'))
+        return self.get_paginated_response(self.get_ranked_rows([
+            {'id': neighbour_id, 'score': score}
+            for neighbour_id, score in page
+        ]))
+
+    def get_ranked_rows(self, page):
+        """Рецепты в порядке page с остальными полями его элементов."""
+        fields = (
+            get_requested_fields(self.request)
+            or set(RecipeSerializer.Meta.fields)
+        )
+        rows = {row['id']: row for row in get_recipe_values(
+            self.get_queryset().filter(id__in=[item['id'] for item in page]),
+            fields,
+        )}
+        page = [item for item in page if item['id'] in rows]
+        recipes = recipe_rows(
+            [rows[item['id']] for item in page], self.request, fields
+        )
+        for recipe, item in zip(recipes, page):
+            recipe.update(
+                (name, value) for name, value in item.items() if name != 'id'
+            )
+        return recipes
+
     @action(
         detail=False,
         methods=('get',),
@@ -149,18 +507,35 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='download_shopping_cart',
     )
     def download_shopping_cart(self, request):
+        conversion = UnitConversion.objects.filter(
+            unit=OuterRef('ingredient__measurement_unit')
+        )
         ingredients = RecipeIngredient.objects.filter(
             recipe__shopping_carts__user=request.user
+        ).annotate(
+            name=Coalesce('ingredient__alias_of__name', 'ingredient__name'),
+            unit=Coalesce(
+                Subquery(conversion.values('base_unit')[:1]),
+                'ingredient__measurement_unit',
+            ),
         ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit',
+            'name',
+            'unit',
         ).order_by(
-            'ingredient__name'
+            'name',
+            'unit',
         ).annotate(
-            total=Sum('amount')
+            total=Sum(
+                F('amount') * Coalesce(
+                    Subquery(conversion.values('factor')[:1]), Value(1)
+                ),
+                output_field=UnitConversion._meta.get_field('factor'),
+            )
+        )
+        response = StreamingHttpResponse(
+            self.shopping_cart_in_file(ingredients.iterator()),
+            content_type='text/plain; charset=utf-8',
         )
-        shopping_list = self.shopping_cart_in_file(ingredients)
-        response = FileResponse(shopping_list, content_type='text/plain')
         response['Content-Disposition'] = (
             'attachment; filename="shopping_list.txt"'
         )
@@ -174,22 +549,82 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='get-link',
     )
     def get_link(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        short_link = reverse(short_url, args=[recipe.pk])
-        return Response({'short-link': request.build_absolute_uri(short_link)},
+        recipe = get_object_or_404(Recipe.objects.only('pk'), pk=pk)
+        link = reverse(short_link, args=[get_code(recipe.pk)])
+        return Response({'short-link': request.build_absolute_uri(link)},
                         status=status.HTTP_200_OK)
 
-    def create_obj(self, user, obj_ser, pk):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        serializer = obj_ser(
-            data={
-                'recipe': recipe.id,
-                'user': user.id
-            }
+    def create_obj(self, model, pk):
+        recipe = get_object_or_404(
+            Recipe.objects.only(*ShortRecipeSerializer.Meta.fields), pk=pk
+        )
+        try:
+            with transaction.atomic():
+                model.objects.create(user=self.request.user, recipe=recipe)
+        except IntegrityError:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'"{recipe.name}" уже добавлен в '
+                f'{model._meta.verbose_name}'
+            ]})
+        return Response(
+            ShortRecipeSerializer(recipe).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def delete_obj(self, model, pk):
+        deleted_object, _ = model.objects.filter(
+            recipe_id=pk, user=self.request.user
+        ).delete()
+        if deleted_object:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        return Response(
+            {'detail': 'Рецепта нет в списке.'},
+            status=status.HTTP_400_BAD_REQUEST
         )
+
+    def create_objs(self, model):
+        serializer = RecipeIdsSerializer(data=self.request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(recipe=recipe, user=user)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        user = self.request.user
+        recipes = list(Recipe.objects.filter(
+            id__in=serializer.validated_data['recipes']
+        ).only(*ShortRecipeSerializer.Meta.fields))
+        existing = set(model.objects.filter(
+            user=user, recipe__in=recipes
+        ).values_list('recipe_id', flat=True))
+        added_at = timezone.now()
+        added = [recipe.id for recipe in recipes if recipe.id not in existing]
+        with transaction.atomic():
+            model.objects.bulk_create(
+                (
+                    model(user=user, recipe_id=recipe_id, added_at=added_at)
+                    for recipe_id in added
+                ),
+                ignore_conflicts=True,
+            )
+            record_queryset(
+                model.objects.filter(user=user, recipe_id__in=added),
+                ChangeEvent.Action.SAVE,
+            )
+        if added:
+            update_recipe_scores.delay(
+                model._meta.model_name, added, added_at.isoformat(),
+                False, added_at.isoformat(),
+            )
+        return Response(
+            ShortRecipeSerializer(recipes, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def delete_objs(self, model):
+        serializer = RecipeIdsSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        bulk_delete(model, model.objects.filter(
+            user=self.request.user,
+            recipe_id__in=serializer.validated_data['recipes']
+        ).values_list('pk', flat=True))
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=True,
@@ -199,11 +634,25 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='favorite',
     )
     def favorite(self, request, pk):
-        return self.create_obj(request.user, FavoriteSerializer, pk)
+        return self.create_obj(Favorite, pk)
 
     @favorite.mapping.delete
     def delete_favorite(self, request, pk):
-        return self.delete_obj(self, Favorite, pk)
+        return self.delete_obj(Favorite, pk)
+
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(IsAuthenticated,),
+        url_path='favorite',
+        url_name='favorite-batch',
+    )
+    def favorite_batch(self, request):
+        return self.create_objs(Favorite)
+
+    @favorite_batch.mapping.delete
+    def delete_favorite_batch(self, request):
+        return self.delete_objs(Favorite)
 
     @action(
         detail=True,
@@ -213,39 +662,73 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_name='shopping_cart',
     )
     def shopping_cart(self, request, pk):
-        return self.create_obj(request.user, ShoppingCartSerializer, pk)
+        return self.create_obj(ShoppingCart, pk)
 
     @shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk):
-        return self.delete_obj(self, ShoppingCart, pk)
+        return self.delete_obj(ShoppingCart, pk)
 
-    @staticmethod
-    def delete_obj(self, model, pk):
-        user = self.request.user
-        recipe = get_object_or_404(Recipe, pk=pk)
-        deleted_object, _ = (
-            model.objects.filter(recipe=recipe, user=user).delete()
-        )
-        if deleted_object:
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(
-            {'detail': 'Рецепта нет в списке.'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(IsAuthenticated,),
+        url_path='shopping_cart',
+        url_name='shopping_cart-batch',
+    )
+    def shopping_cart_batch(self, request):
+        return self.create_objs(ShoppingCart)
+
+    @shopping_cart_batch.mapping.delete
+    def delete_shopping_cart_batch(self, request):
+        return self.delete_objs(ShoppingCart)
 
     @staticmethod
     def shopping_cart_in_file(ingredients):
-        shopping_list = ['Список покупок\n']
-        shopping_list += [
-            f'{ingredient["ingredient__name"]} - '
-            f'{ingredient["total"]} '
-            f'({ingredient["ingredient__measurement_unit"]})\n'
-            for ingredient in ingredients
-        ]
-        return shopping_list
+        yield 'Список покупок\n'
+        for ingredient in ingredients:
+            yield (
+                f'{ingredient["name"]} - '
+                f'{ingredient["total"].normalize():f} '
+                f'({ingredient["unit"]})\n'
+            )
+
+
+class ChangeViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+
+    def list(self, request):
+        serializer = ChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data['since']
+        limit = serializer.validated_data['limit']
+        events = list(get_events(since, limit))
+        return Response({
+            'next': events[-1]['position'] if events else since,
+            'results': events,
+        })
 
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (OwnerOrReadOnly,)
+    read_from_replica = True
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return Response(
+                simple_rows(self.get_queryset(), self.serializer_class)
+            )
+        return payload_response(
+            request, 'tags', self.build_payload, self.get_version
+        )
+
+    def get_version(self):
+        return tuple(self.get_queryset().using(DEFAULT_DB_ALIAS).values_list(
+            *self.serializer_class.Meta.fields
+        ))
+
+    def build_payload(self):
+        return FastJSONRenderer().render(simple_rows(
+            self.get_queryset().using(DEFAULT_DB_ALIAS), self.serializer_class
+        ))
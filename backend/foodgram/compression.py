@@ -0,0 +1,117 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'text/',
+)
+
+
+def get_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def get_accepted_encoding(request):
+    """Лучшая из поддерживаемых кодировок, принимаемых клиентом."""
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in get_encodings():
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    return compress_string(content)
+
+
+def compress_stream(sequence, encoding):
+    if encoding == 'gzip':
+        yield from compress_sequence(sequence)
+        return
+    compressor = brotli.Compressor(
+        quality=settings.COMPRESSION_BROTLI_QUALITY
+    )
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def precompress(content):
+    """Тело ответа во всех поддерживаемых кодировках с наибольшим сжатием."""
+    payload = {
+        None: content,
+        'gzip': gzip.compress(content, compresslevel=9, mtime=0),
+    }
+    if brotli:
+        payload['br'] = brotli.compress(content, quality=11)
+    return payload
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в br или gzip по заголовку Accept-Encoding.
+
+    Обычные ответы сжимаются, начиная с COMPRESSION_MIN_SIZE байт,
+    потоковые — по мере отдачи. Ответы с уже заданным Content-Encoding
+    не трогаются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '')
+        if (
+            response.has_header('Content-Encoding')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_accepted_encoding(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,95 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_CACHE_KEY = 'replica-pin:{}'
+PRIMARY_MODELS = ('authtoken.token',)
+
+_replica = ContextVar('replica', default=None)
+
+
+def get_replicas():
+    return settings.REPLICA_DATABASES
+
+
+def get_client_key(request):
+    """Ключ клиента для закрепления чтений за основной базой."""
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return PIN_CACHE_KEY.format(
+        hashlib.sha256(credentials.encode()).hexdigest()
+    )
+
+
+class PrimaryReplicaRouter:
+    """Чтения с реплики, выбранной ReplicaRoutingMiddleware для запроса.
+
+    Токены всегда читаются из основной базы: вход не закрепляет клиента
+    за ней, а реплика может еще не получить только что выданный токен.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica and model._meta.label_lower not in PRIMARY_MODELS:
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает чтение с реплик для безопасных запросов к представлениям
+    с атрибутом read_from_replica.
+
+    Реплика выбирается один раз на запрос, чтобы все его чтения видели
+    одно состояние данных. После изменяющего запроса клиент на
+    REPLICA_PIN_SECONDS читает только из основной базы, чтобы сразу
+    видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        client_key = get_client_key(request)
+        if (
+            client_key
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            cache.set(client_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        replicas = get_replicas()
+        if not replicas or request.method not in SAFE_METHODS:
+            return None
+        view_class = getattr(view_func, 'cls', None)
+        if not getattr(view_class, 'read_from_replica', False):
+            return None
+        client_key = get_client_key(request)
+        if client_key and cache.get(client_key):
+            return None
+        _replica.set(random.choice(replicas))
+        return None
@@ -0,0 +1,99 @@
+"""Пакетное каскадное удаление.
+
+Стандартный Collector загружает в память все зависимые объекты, если на
+их моделях есть обработчики сигналов удаления. Здесь зависимые строки
+удаляются запросами DELETE по пачкам ключей родителей, а вместо
+pre_delete и post_delete рассылается pre_bulk_delete с queryset строк,
+которые сейчас будут удалены, и полем, по которому пришло удаление
+(None для самих удаляемых объектов).
+"""
+from django.db import models, transaction
+from django.dispatch import Signal
+
+BATCH_SIZE = 1000
+SUPPORTED_ON_DELETE = (models.CASCADE, models.SET_NULL, models.DO_NOTHING)
+
+pre_bulk_delete = Signal()
+
+
+def get_relations(model):
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete
+        and (field.one_to_one or field.one_to_many)
+    ]
+
+
+def delete_rows(model, queryset, field=None):
+    pre_bulk_delete.send(sender=model, queryset=queryset, field=field)
+    queryset._raw_delete(queryset.db)
+
+
+def delete_batch(model, pks, field=None):
+    relations = get_relations(model)
+    if any(
+        relation.on_delete not in SUPPORTED_ON_DELETE
+        for relation in relations
+    ):
+        model._base_manager.filter(pk__in=pks).delete()
+        return
+    for relation in relations:
+        related = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': pks}
+        ).order_by()
+        if relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        elif relation.on_delete is models.CASCADE:
+            delete_related(relation.related_model, related, relation.field)
+    delete_rows(model, model._base_manager.filter(pk__in=pks), field)
+
+
+def delete_related(model, queryset, field):
+    if not get_relations(model):
+        delete_rows(model, queryset, field)
+        return
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not pks:
+            return
+        delete_batch(model, pks, field)
+
+
+def bulk_delete(model, pks):
+    """Удаляет объекты model и зависимые от них строки пачками."""
+    pks = list(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        with transaction.atomic():
+            delete_batch(model, pks[start:start + BATCH_SIZE])
+
+
+class BulkDeleteAdminMixin:
+    """Удаление из админки через bulk_delete.
+
+    Страница подтверждения показывает число зависимых строк первого
+    уровня вместо полного дерева объектов.
+    """
+
+    def delete_model(self, request, obj):
+        bulk_delete(self.model, [obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        bulk_delete(self.model, queryset.values_list('pk', flat=True))
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        pks = [obj.pk for obj in objs]
+        model_count = {self.model._meta.verbose_name_plural: len(objs)}
+        for relation in get_relations(self.model):
+            if relation.on_delete is not models.CASCADE:
+                continue
+            count = relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': pks}
+            ).count()
+            if count:
+                name = relation.related_model._meta.verbose_name_plural
+                model_count[name] = model_count.get(name, 0) + count
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.model._meta.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
@@ -0,0 +1,33 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_MIN = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор для больших таблиц админки.
+
+    Без фильтров берёт оценку числа строк из статистики PostgreSQL,
+    с фильтрами считает строки без аннотаций списка.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_MIN:
+                return row[0]
+        if queryset.query.annotations:
+            queryset = queryset.model._default_manager.filter(
+                pk__in=queryset.values('pk')
+            )
+        return queryset.count()
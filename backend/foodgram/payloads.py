@@ -0,0 +1,48 @@
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from foodgram.compression import get_accepted_encoding, precompress
+
+PAYLOAD_DIGEST_LENGTH = 16
+
+_payloads = {}
+
+
+def load_payload(name, build, get_version):
+    """Тело ответа name во всех кодировках и его хэш из памяти процесса.
+
+    Версию тела get_version читает из базы на каждом запросе, так что
+    изменение из любого процесса приводит к пересборке во всех остальных.
+    """
+    version = get_version()
+    cached = _payloads.get(name)
+    if cached is None or cached[0] != version:
+        content = build()
+        cached = _payloads[name] = (
+            version,
+            precompress(content),
+            hashlib.sha256(content).hexdigest()[:PAYLOAD_DIGEST_LENGTH],
+        )
+    return cached[1:]
+
+
+def get_payload(name, build, get_version):
+    return load_payload(name, build, get_version)[0]
+
+
+def get_payload_digest(name, build, get_version):
+    return load_payload(name, build, get_version)[1]
+
+
+def payload_response(request, name, build, get_version,
+                     content_type='application/json'):
+    """Ответ с заранее сжатым телом в принимаемой клиентом кодировке."""
+    payload = get_payload(name, build, get_version)
+    encoding = get_accepted_encoding(request)
+    response = HttpResponse(payload[encoding], content_type=content_type)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
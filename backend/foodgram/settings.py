@@ -26,16 +26,19 @@ INSTALLED_APPS = [
 
     'api.apps.ApiConfig',
     'recipes.apps.RecipesConfig',
+    'tasks.apps.TasksConfig',
     'users.apps.UsersConfig',
     'debug_toolbar',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'foodgram.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'foodgram.db_routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -85,6 +88,44 @@ POSTGRES_DB = {
 
 DATABASES = POSTGRES_DB if os.getenv('USE_POSTGRES_DB', 'False') == 'True' else SQLITE_DB
 
+if DATABASES is POSTGRES_DB:
+    for number, host in enumerate(os.getenv('DB_REPLICA_HOSTS', '').split(), start=1):
+        DATABASES[f'replica_{number}'] = {
+            **POSTGRES_DB['default'],
+            'HOST': host,
+            'TEST': {'MIRROR': 'default'},
+        }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ('foodgram.db_routers.PrimaryReplicaRouter',)
+
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+
+# MAX_ENTRIES понимают только кэши Django с вытеснением, клиенту
+# memcached OPTIONS передаются как аргументы.
+CULLING_CACHE_BACKENDS = ('db', 'filebased', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        } if CACHE_BACKEND.split('.')[-2] in CULLING_CACHE_BACKENDS else {},
+    }
+}
+
+TASKS_EAGER = os.getenv('TASKS_EAGER', 'False') == 'True'
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+COUNTERS_FLUSH_INTERVAL = int(os.getenv('COUNTERS_FLUSH_INTERVAL', 10))
+COUNTERS_MAX_PENDING = int(os.getenv('COUNTERS_MAX_PENDING', 1000))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -121,6 +162,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
+    'LOGOUT_ON_PASSWORD_CHANGE': True,
     'PERMISSIONS': {
         'user': ['rest_framework.permissions.IsAuthenticatedOrReadOnly'],
         'user_list': ['rest_framework.permissions.AllowAny'],
@@ -134,9 +176,24 @@ DJOSER = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.SlidingWindowThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.getenv('THROTTLE_READ_RATE', '600/min'),
+        'write': os.getenv('THROTTLE_WRITE_RATE', '120/min'),
+        'export': os.getenv('THROTTLE_EXPORT_RATE', '10/min'),
+        'anon_read': os.getenv('THROTTLE_ANON_READ_RATE', '300/min'),
+        'anon_write': os.getenv('THROTTLE_ANON_WRITE_RATE', '30/min'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
 }
@@ -4,12 +4,13 @@ from django.contrib import admin
 from django.urls import include, path
 
 from api.urls import urls as api_urls
-from api.views import short_url
+from recipes.views import short_link, short_url
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(api_urls)),
-    path('s/<int:pk>/', short_url, name='short_url')
+    path('s/<int:pk>/', short_url, name='short_url'),
+    path('s/<str:code>/', short_link, name='short_link'),
 ]
 
 if settings.DEBUG:
@@ -1,19 +1,23 @@
 from django.contrib import admin
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.safestring import mark_safe
 
+from foodgram.deletion import BulkDeleteAdminMixin
+from foodgram.paginators import EstimatedCountPaginator
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+                            ShoppingCart, ShortLink, Tag, UnitConversion)
 
 
 class RecipeIngredientInLine(admin.TabularInline):
     model = RecipeIngredient
     extra = 0
     min_num = 1
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(BulkDeleteAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'name',
@@ -22,20 +26,35 @@ class RecipeAdmin(admin.ModelAdmin):
         'added_in_favorite',
         'get_ingredients',
         'get_tags',
+        'views',
         'mini_image'
     )
     search_fields = (
+        'name',
         'author__username',
-        'name'
     )
     list_filter = ('tags',)
     filter_horizontal = ('tags',)
+    autocomplete_fields = ('author',)
+    readonly_fields = (
+        'calories', 'proteins', 'fats', 'carbohydrates', 'cost', 'views'
+    )
     inlines = (RecipeIngredientInLine,)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.annotate(added_in_favorite=Count('favorites'))
-        return queryset
+        favorites_count = Favorite.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            count=Count('id')
+        ).values('count')
+        return queryset.select_related('author').prefetch_related(
+            'ingredients', 'tags'
+        ).annotate(
+            added_in_favorite=Coalesce(Subquery(favorites_count), 0)
+        )
 
     @admin.display(description='Ингредиенты')
     def get_ingredients(self, obj):
@@ -45,7 +64,8 @@ class RecipeAdmin(admin.ModelAdmin):
     def get_tags(self, obj):
         return ',\n'.join(str(p) for p in obj.tags.all())
 
-    @admin.display(description='В избранном')
+    @admin.display(description='В избранном',
+                   ordering='added_in_favorite')
     def added_in_favorite(self, obj):
         return obj.added_in_favorite
 
@@ -69,16 +89,61 @@ class TagAdmin(admin.ModelAdmin):
 class IngredientAdmin(admin.ModelAdmin):
     list_display = (
         'name',
-        'measurement_unit'
+        'measurement_unit',
+        'calories',
+        'price',
+        'alias_of',
     )
+    list_select_related = ('alias_of',)
     search_fields = (
         'name',
     )
+    autocomplete_fields = ('alias_of',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(UnitConversion)
+class UnitConversionAdmin(admin.ModelAdmin):
+    list_display = (
+        'unit',
+        'base_unit',
+        'factor',
+    )
+    search_fields = (
+        'unit',
+        'base_unit',
+    )
+
+
+@admin.register(ShortLink)
+class ShortLinkAdmin(admin.ModelAdmin):
+    list_display = (
+        'code',
+        'recipe',
+        'clicks',
+        'created_at',
+    )
+    list_select_related = ('recipe',)
+    search_fields = (
+        'code',
+        'recipe__name',
+    )
+    readonly_fields = ('recipe', 'code', 'clicks', 'created_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(Favorite, ShoppingCart)
 class FavoriteAndShoppingCartAdmin(admin.ModelAdmin):
+    list_select_related = ('user', 'recipe')
     search_fields = (
         'user__username',
         'recipe__name'
     )
+    autocomplete_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,10 @@
+"""Счетчики просмотров рецептов.
+
+Просмотры копятся в памяти процесса и записываются пачками, чтобы
+популярные рецепты не превращались в горячие строки.
+"""
+from foodgram.counters import BufferedCounter
+
+from recipes.models import Recipe
+
+recipe_views = BufferedCounter(Recipe, 'views')
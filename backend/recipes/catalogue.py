@@ -0,0 +1,52 @@
+"""Версии справочника ингредиентов для дельт к снимку.
+
+Каждое изменение ингредиента пишется в IngredientChange, а позицию
+записи выдает assign_positions после фиксации, как в журнале изменений.
+Версия справочника - последняя выданная позиция. Изменение из долгой
+транзакции, например загрузки CSV, получит позицию больше уже выданных
+версий, поэтому клиент получит его следующей дельтой.
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from recipes.changes import (assign_sequence, get_sequence_position,
+                             schedule_positions)
+from recipes.constants import CATALOGUE_SEQUENCER
+from recipes.models import Ingredient, IngredientChange
+
+
+def assign_positions():
+    return assign_sequence(IngredientChange, CATALOGUE_SEQUENCER)
+
+
+def assign_all_positions():
+    while assign_positions():
+        pass
+
+
+def record_changes(ingredient_ids, deleted=False):
+    schedule_positions(assign_all_positions)
+    IngredientChange.objects.bulk_create(
+        IngredientChange(ingredient_id=ingredient_id, deleted=deleted)
+        for ingredient_id in ingredient_ids
+    )
+
+
+def get_version():
+    return get_sequence_position(CATALOGUE_SEQUENCER)
+
+
+def get_changes(since_version, fields):
+    """Ингредиенты, измененные после since_version, и ID удаленных.
+
+    Версия берется до чтения строк: изменение, попавшее между запросами,
+    придет повторно со следующей дельтой, но не потеряется.
+    """
+    version = get_version()
+    changed = set(IngredientChange.objects.using(DEFAULT_DB_ALIAS).filter(
+        position__gt=since_version, position__lte=version
+    ).values_list('ingredient_id', flat=True).order_by())
+    ingredients = list(Ingredient.objects.using(DEFAULT_DB_ALIAS).filter(
+        id__in=changed
+    ).values(*fields))
+    deleted = changed - {ingredient['id'] for ingredient in ingredients}
+    return version, ingredients, sorted(deleted)
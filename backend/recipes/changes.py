@@ -0,0 +1,170 @@
+"""Журнал изменений (outbox) для поиска, кэшей и лент.
+
+События о сохранении и удалении рецептов, их ингредиентов, избранного,
+списков покупок и подписок пишутся в ту же транзакцию, что и сами
+изменения. Номер события выдается при вставке, поэтому долгая транзакция
+может зафиксировать событие с номером меньше уже прочитанных. Читатели
+идут по позиции, которую assign_positions выдает уже зафиксированным
+событиям под блокировкой: событие, зафиксированное позже, всегда
+получает позицию больше всех выданных ранее. Позиции выдает обработчик
+задач раз в CHANGES_SEQUENCE_INTERVAL секунд, а не запросы на чтение.
+
+Старые события сжимаются: для каждого объекта остается только последнее,
+а события удаления хранятся CHANGES_RETENTION_DAYS дней.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from recipes.constants import (CHANGES_BATCH_SIZE, CHANGES_COMPACT_AFTER_DAYS,
+                               CHANGES_RETENTION_DAYS, CHANGES_SEQUENCER)
+from recipes.models import (ChangeConsumer, ChangeEvent, Favorite, Recipe,
+                            RecipeIngredient, ShoppingCart)
+from users.models import Follow
+
+TRACKED_FIELDS = {
+    Recipe: ('author_id',),
+    RecipeIngredient: ('recipe_id', 'ingredient_id', 'amount'),
+    Favorite: ('user_id', 'recipe_id'),
+    ShoppingCart: ('user_id', 'recipe_id'),
+    Follow: ('user_id', 'author_id'),
+}
+EVENT_FIELDS = (
+    'id', 'position', 'topic', 'action', 'object_id', 'data', 'created_at'
+)
+
+
+def make_event(model, action, pk, values):
+    return ChangeEvent(
+        topic=model._meta.model_name,
+        action=action,
+        object_id=pk,
+        data=dict(zip(TRACKED_FIELDS[model], values)),
+    )
+
+
+def record_objects(model, action, objects):
+    schedule_positions(assign_all_positions)
+    ChangeEvent.objects.bulk_create(
+        make_event(model, action, obj.pk, (
+            getattr(obj, field) for field in TRACKED_FIELDS[model]
+        ))
+        for obj in objects
+    )
+
+
+def record_queryset(queryset, action):
+    """Записывает события для всех строк queryset пачками."""
+    model = queryset.model
+    schedule_positions(assign_all_positions)
+    rows = queryset.order_by().values_list(
+        'pk', *TRACKED_FIELDS[model]
+    ).iterator(chunk_size=CHANGES_BATCH_SIZE)
+    while True:
+        batch = list(islice(rows, CHANGES_BATCH_SIZE))
+        if not batch:
+            return
+        ChangeEvent.objects.bulk_create(
+            make_event(model, action, pk, values) for pk, *values in batch
+        )
+
+
+def assign_sequence(model, sequencer_name, limit=CHANGES_BATCH_SIZE):
+    """Выдает позиции зафиксированным записям журнала model.
+
+    Последняя выданная позиция хранится в служебном потребителе
+    sequencer_name, строка которого блокируется на время выдачи. Все
+    запросы идут в основную базу: реплика может еще не знать о выданных
+    позициях. Возвращает число записей, получивших позицию.
+    """
+    entries = model.objects.using(DEFAULT_DB_ALIAS)
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        sequencer, _ = ChangeConsumer.objects.using(
+            DEFAULT_DB_ALIAS
+        ).select_for_update().get_or_create(name=sequencer_name)
+        ids = list(entries.filter(
+            position__isnull=True
+        ).order_by('id').values_list('id', flat=True)[:limit])
+        if not ids:
+            return 0
+        offset = sequencer.position + 1 - ids[0]
+        entries.filter(id__in=ids, position__isnull=True).update(
+            position=F('id') + offset
+        )
+        sequencer.position = ids[-1] + offset
+        sequencer.save(update_fields=('position', 'updated_at'))
+    return len(ids)
+
+
+def get_sequence_position(sequencer_name):
+    """Последняя выданная позиция журнала."""
+    return ChangeConsumer.objects.using(DEFAULT_DB_ALIAS).filter(
+        name=sequencer_name
+    ).values_list('position', flat=True).first() or 0
+
+
+def schedule_positions(assign):
+    """Без обработчика задач позиции выдаются после фиксации записи."""
+    if settings.TASKS_EAGER:
+        transaction.on_commit(assign)
+
+
+def assign_positions(limit=CHANGES_BATCH_SIZE):
+    return assign_sequence(ChangeEvent, CHANGES_SEQUENCER, limit)
+
+
+def assign_all_positions():
+    while assign_positions():
+        pass
+
+
+def get_last_position():
+    return get_sequence_position(CHANGES_SEQUENCER)
+
+
+def get_events(since, limit=CHANGES_BATCH_SIZE):
+    return ChangeEvent.objects.filter(
+        position__gt=since
+    ).order_by('position').values(*EVENT_FIELDS)[:limit]
+
+
+def consume(name, handle, batch_size=CHANGES_BATCH_SIZE):
+    """Передает handle новые события потребителя name пачками.
+
+    Позиция потребителя сдвигается в одной транзакции с обработкой
+    пачки. Возвращает число обработанных событий.
+    """
+    total = 0
+    while True:
+        assign_positions(batch_size)
+        with transaction.atomic():
+            consumer, _ = ChangeConsumer.objects.select_for_update(
+            ).get_or_create(name=name)
+            events = list(get_events(consumer.position, batch_size))
+            if not events:
+                return total
+            handle(events)
+            consumer.position = events[-1]['position']
+            consumer.save(update_fields=('position', 'updated_at'))
+        total += len(events)
+
+
+def compact_events():
+    """Удаляет устаревшие события, возвращает их число."""
+    now = timezone.now()
+    superseded = ChangeEvent.objects.filter(
+        created_at__lt=now - timedelta(days=CHANGES_COMPACT_AFTER_DAYS)
+    ).filter(Exists(ChangeEvent.objects.filter(
+        topic=OuterRef('topic'),
+        object_id=OuterRef('object_id'),
+        position__gt=OuterRef('position'),
+    ))).delete()[0]
+    expired = ChangeEvent.objects.filter(
+        action=ChangeEvent.Action.DELETE,
+        created_at__lt=now - timedelta(days=CHANGES_RETENTION_DAYS),
+    ).delete()[0]
+    return superseded + expired
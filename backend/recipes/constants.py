@@ -7,3 +7,43 @@ MAX_LENGTH_MEASUREMENT_UNIT = 64
 MAX_LENGTH_RECIPE_NAME = 256
 MAX_LEN_STR_DEF = 20
 MAX_LENGTH_TAG = 32
+FEED_BACKFILL_SIZE = 50
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_PULL_FOLLOWERS_MIN = 10000
+FEED_PURGE_BATCH_SIZE = 1000
+POPULAR_HALF_LIFE_DAYS = 30
+TRENDING_HALF_LIFE_DAYS = 1
+SCORES_BATCH_SIZE = 1000
+EVENT_WEIGHTS = {
+    'favorite': 2.0,
+    'shoppingcart': 1.0,
+}
+MATCH_BUILD_CHUNK_SIZE = 10000
+MATCH_JOURNAL_MAX_LAG = 1000
+SIMILAR_BATCH_SIZE = 32
+SIMILAR_REVERSE_CANDIDATES = 200
+SIMILAR_TAG_WEIGHT = 0.5
+SIMILAR_TOP_K = 20
+SIMILAR_WATERMARK_OVERLAP_MINUTES = 5
+COFAVORITE_CHUNK_SIZE = 512
+COFAVORITE_TOP_N = 50
+COFAVORITE_USER_CHUNK_SIZE = 10000
+COST_MAX_DIGITS = 12
+COST_DECIMAL_PLACES = 2
+TOTALS_BATCH_SIZE = 1000
+UNIT_FACTOR_MAX_DIGITS = 12
+UNIT_FACTOR_DECIMAL_PLACES = 4
+SHORT_LINK_LENGTH = 6
+SHORT_LINK_MULTIPLIER = 2654435761
+SHORT_LINK_CACHE_SIZE = 10000
+SHORT_LINK_CACHE_TIMEOUT = 60 * 5
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_COMMIT_LAG_SECONDS = 60
+MAX_LENGTH_CHANGE_TOPIC = 32
+MAX_LENGTH_CONSUMER_NAME = 64
+CHANGES_BATCH_SIZE = 1000
+CHANGES_SEQUENCER = ':sequencer'
+CATALOGUE_SEQUENCER = ':catalogue'
+CHANGES_SEQUENCE_INTERVAL = 1
+CHANGES_COMPACT_AFTER_DAYS = 7
+CHANGES_RETENTION_DAYS = 30
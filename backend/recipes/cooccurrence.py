@@ -0,0 +1,130 @@
+"""Рецепты, которые добавляют в избранное вместе.
+
+Матрица пользователи x рецепты строится по избранному и, по желанию,
+по спискам покупок с весами EVENT_WEIGHTS. Она читается полосами по
+COFAVORITE_USER_CHUNK_SIZE id пользователей, так что таблицы избранного
+целиком в памяти не бывают. Совместная встречаемость X.T @ X считается
+полосами по COFAVORITE_CHUNK_SIZE рецептов: для полосы читаются только
+пользователи, отметившие ее рецепты, строки нормируются как косинусная
+мера, и лучшие соседи записываются до перехода к следующей полосе.
+"""
+import numpy as np
+from django.db.models import Max, Q
+from django.utils import timezone
+from scipy import sparse
+
+from recipes.constants import (COFAVORITE_CHUNK_SIZE, COFAVORITE_TOP_N,
+                               COFAVORITE_USER_CHUNK_SIZE, EVENT_WEIGHTS)
+from recipes.models import CoFavoriteRecipe, Favorite, Recipe, ShoppingCart
+from recipes.similarity import save_neighbours, select_top
+
+
+def load_pairs(model, start, end, users):
+    pairs = np.fromiter(
+        (
+            value for pair in model.objects.filter(
+                users, user_id__gte=start, user_id__lt=end
+            ).order_by().values_list('user_id', 'recipe_id').iterator()
+            for value in pair
+        ),
+        dtype=np.int64,
+    )
+    return pairs[0::2], pairs[1::2]
+
+
+def load_block(models, recipe_ids, start, end, users=Q()):
+    """Матрица пользователи с id из [start, end) x рецепты recipe_ids.
+
+    Строки пользователей вне условия users остаются пустыми, а строки
+    рецептов, удаленных после чтения recipe_ids, пропускаются.
+    """
+    rows, columns, weights = [], [], []
+    for model in models:
+        user_ids, pair_recipe_ids = load_pairs(model, start, end, users)
+        positions = np.searchsorted(recipe_ids, pair_recipe_ids).clip(
+            max=len(recipe_ids) - 1
+        )
+        known = recipe_ids[positions] == pair_recipe_ids
+        rows.append(user_ids[known] - start)
+        columns.append(positions[known])
+        weights.append(np.full(
+            np.count_nonzero(known), EVENT_WEIGHTS[model._meta.model_name]
+        ))
+    return sparse.csr_matrix(
+        (
+            np.concatenate(weights),
+            (np.concatenate(rows), np.concatenate(columns)),
+        ),
+        shape=(end - start, len(recipe_ids)),
+    )
+
+
+def get_user_starts(models):
+    last_user_id = max(
+        model.objects.aggregate(last=Max('user_id'))['last'] or 0
+        for model in models
+    )
+    return range(0, last_user_id + 1, COFAVORITE_USER_CHUNK_SIZE)
+
+
+def count_norms(models, recipe_ids):
+    """Нормы столбцов X, то есть корни диагонали X.T @ X."""
+    squares = np.zeros(len(recipe_ids))
+    if not len(recipe_ids):
+        return squares
+    for start in get_user_starts(models):
+        block = load_block(
+            models, recipe_ids, start, start + COFAVORITE_USER_CHUNK_SIZE
+        )
+        squares += np.asarray(block.multiply(block).sum(axis=0)).ravel()
+    return np.sqrt(squares)
+
+
+def count_strip(models, recipe_ids, batch):
+    """Строки batch матрицы X.T @ X.
+
+    Вклад в них есть только у пользователей, отметивших рецепты batch.
+    """
+    strip_ids = recipe_ids[batch].tolist()
+    users = Q()
+    for model in models:
+        users |= Q(user_id__in=model.objects.filter(
+            recipe_id__in=strip_ids
+        ).values('user_id'))
+    common = sparse.csr_matrix((len(batch), len(recipe_ids)))
+    for start in get_user_starts(models):
+        block = load_block(
+            models, recipe_ids, start, start + COFAVORITE_USER_CHUNK_SIZE,
+            users,
+        )
+        common = common + (block[:, batch].T @ block)
+    return common.tocoo()
+
+
+def compute_cofavorites(with_cart=False):
+    """Пересобирает таблицу CoFavoriteRecipe, возвращает число рецептов."""
+    moment = timezone.now()
+    models = (Favorite, ShoppingCart) if with_cart else (Favorite,)
+    recipe_ids = np.fromiter(
+        Recipe.objects.order_by('id').values_list('id', flat=True).iterator(),
+        dtype=np.int64,
+    )
+    norms = count_norms(models, recipe_ids)
+    positions = np.flatnonzero(norms)
+    for start in range(0, len(positions), COFAVORITE_CHUNK_SIZE):
+        batch = positions[start:start + COFAVORITE_CHUNK_SIZE]
+        strip = count_strip(models, recipe_ids, batch)
+        save_neighbours(
+            CoFavoriteRecipe,
+            recipe_ids,
+            list(select_top(
+                batch,
+                strip.row,
+                strip.col,
+                strip.data / (norms[batch][strip.row] * norms[strip.col]),
+                COFAVORITE_TOP_N,
+            )),
+            moment,
+        )
+    CoFavoriteRecipe.objects.filter(updated_at__lt=moment).delete()
+    return len(positions)
@@ -0,0 +1,166 @@
+"""Выгрузка таблиц для аналитики.
+
+Строки читаются итератором (на PostgreSQL это курсор на сервере) и
+пишутся пачками по EXPORT_CHUNK_SIZE в сжатый CSV или Parquet, так что
+расход памяти не зависит от размера таблиц. Повторная выгрузка берет
+только строки после запомненной позиции: по id для таблиц, строки
+которых не меняются, и по (время изменения, id) для остальных.
+"""
+import csv
+import gzip
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
+
+from recipes.constants import EXPORT_CHUNK_SIZE, EXPORT_COMMIT_LAG_SECONDS
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from users.models import Follow
+
+User = get_user_model()
+
+# Таблица: (модель, поля, поле времени изменения или None).
+TABLES = {
+    # Времени изменения нет. last_login и is_active выгружаются на момент
+    # первой выгрузки строки, свежие значения дает только --full.
+    'users': (User, (
+        'id', 'username', 'date_joined', 'last_login', 'is_active',
+    ), None),
+    # views и пищевая ценность пишутся UPDATE без изменения modified,
+    # их свежие значения дает только --full.
+    'recipes': (Recipe, (
+        'id', 'author_id', 'name', 'cooking_time', 'pub_date', 'modified',
+        'calories', 'proteins', 'fats', 'carbohydrates', 'cost', 'views',
+    ), 'modified'),
+    # При правке рецепта строки удаляются и создаются с новыми id.
+    'recipe_ingredients': (RecipeIngredient, (
+        'id', 'recipe_id', 'ingredient_id', 'amount',
+    ), None),
+    # Избранное, списки покупок и подписки только создаются и удаляются.
+    'favorites': (Favorite, (
+        'id', 'user_id', 'recipe_id', 'added_at',
+    ), None),
+    'shopping_carts': (ShoppingCart, (
+        'id', 'user_id', 'recipe_id', 'added_at',
+    ), None),
+    'follows': (Follow, ('id', 'user_id', 'author_id'), None),
+}
+
+
+class CSVWriter:
+    extension = 'csv.gz'
+
+    def __init__(self, path, model, fields):
+        self.file = gzip.open(path, 'wt', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(fields)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    extension = 'parquet'
+
+    def __init__(self, path, model, fields):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([
+            (name, self.get_type(model._meta.get_field(name)))
+            for name in fields
+        ])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def get_type(self, field):
+        if field.is_relation:
+            field = field.target_field
+        internal_type = field.get_internal_type()
+        if internal_type == 'DecimalField':
+            return self.pyarrow.decimal128(
+                field.max_digits, field.decimal_places
+            )
+        if internal_type == 'DateTimeField':
+            return self.pyarrow.timestamp('us', tz='UTC')
+        if internal_type == 'FloatField':
+            return self.pyarrow.float64()
+        if internal_type == 'BooleanField':
+            return self.pyarrow.bool_()
+        if internal_type in ('CharField', 'TextField'):
+            return self.pyarrow.string()
+        return self.pyarrow.int64()
+
+    def write(self, rows):
+        self.writer.write_batch(self.pyarrow.record_batch(
+            [
+                self.pyarrow.array(column, type=column_type)
+                for column, column_type in zip(zip(*rows), self.schema.types)
+            ],
+            schema=self.schema,
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def get_rows(name, since, database):
+    """Строки таблицы после позиции since и поля позиции."""
+    model, fields, changed_field = TABLES[name]
+    rows = model._base_manager.using(database)
+    if changed_field is None:
+        rows = rows.filter(id__gt=since or 0)
+        keys = ('id',)
+    else:
+        # Время изменения выставляется до фиксации транзакции, поэтому
+        # свежие строки ждут, пока не зафиксируются все более ранние.
+        rows = rows.filter(**{
+            f'{changed_field}__lt': timezone.now() - timedelta(
+                seconds=EXPORT_COMMIT_LAG_SECONDS
+            ),
+        })
+        if since is not None:
+            changed, last_id = since
+            rows = rows.filter(
+                Q(**{f'{changed_field}__gt': changed})
+                | Q(**{changed_field: changed, 'id__gt': last_id})
+            )
+        keys = (changed_field, 'id')
+    return rows.order_by(*keys).values_list(*fields, *keys), len(keys)
+
+
+def export_table(name, writer_class, path, since=None, database=None):
+    """Пишет строки таблицы name после позиции since в файл path.
+
+    Позиция - id или пара (время изменения, id), None - с начала.
+    Возвращает число строк и позицию последней выгруженной строки.
+    """
+    model, fields, _ = TABLES[name]
+    rows, size = get_rows(name, since, database)
+    rows = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    writer = writer_class(path, model, fields)
+    count, position = 0, since
+    try:
+        while True:
+            batch = list(islice(rows, EXPORT_CHUNK_SIZE))
+            if not batch:
+                break
+            writer.write([row[:-size] for row in batch])
+            count += len(batch)
+            position = batch[-1][-size:]
+    finally:
+        writer.close()
+    if count and size == 1:
+        position = position[0]
+    return count, position
@@ -0,0 +1,125 @@
+import heapq
+from itertools import islice
+
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from recipes.constants import (FEED_BACKFILL_SIZE, FEED_FANOUT_BATCH_SIZE,
+                               FEED_PULL_FOLLOWERS_MIN, FEED_PURGE_BATCH_SIZE)
+from recipes.models import FeedItem, Recipe
+from users.models import Follow
+
+
+def is_pull_author(author_id):
+    return Follow.objects.filter(
+        author_id=author_id
+    ).count() >= FEED_PULL_FOLLOWERS_MIN
+
+
+def get_pull_author_ids(user):
+    followers_count = Follow.objects.filter(
+        author=OuterRef('author')
+    ).values('author').annotate(count=Count('id')).values('count')
+    return list(
+        Follow.objects.filter(user=user).annotate(
+            followers_count=Subquery(followers_count)
+        ).filter(
+            followers_count__gte=FEED_PULL_FOLLOWERS_MIN
+        ).values_list('author_id', flat=True)
+    )
+
+
+def push_recipe(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if recipe is None or is_pull_author(recipe.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=recipe.author_id
+    ).values_list('user_id', flat=True).iterator(
+        chunk_size=FEED_FANOUT_BATCH_SIZE
+    )
+    while True:
+        batch = list(islice(follower_ids, FEED_FANOUT_BATCH_SIZE))
+        if not batch:
+            break
+        FeedItem.objects.bulk_create(
+            (
+                FeedItem(
+                    user_id=user_id,
+                    recipe_id=recipe.id,
+                    pub_date=recipe.pub_date
+                ) for user_id in batch
+            ),
+            ignore_conflicts=True,
+        )
+
+
+def backfill_author(user_id, author_id):
+    if is_pull_author(author_id):
+        return
+    recipes = Recipe.objects.filter(
+        author_id=author_id
+    ).order_by('-pub_date').values_list('id', 'pub_date')
+    FeedItem.objects.bulk_create(
+        (
+            FeedItem(user_id=user_id, recipe_id=recipe_id, pub_date=pub_date)
+            for recipe_id, pub_date in recipes[:FEED_BACKFILL_SIZE]
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def remove_author(user_id, author_id):
+    FeedItem.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id
+    ).delete()
+
+
+def purge_recipe(recipe_id):
+    items = FeedItem.objects.filter(recipe_id=recipe_id).order_by()
+    while True:
+        ids = list(items.values_list('id', flat=True)[:FEED_PURGE_BATCH_SIZE])
+        if not ids:
+            break
+        FeedItem.objects.filter(id__in=ids).delete()
+
+
+def get_feed_keys(user, limit, position=None):
+    """Ключи (pub_date, id) рецептов ленты, новые первыми.
+
+    Рецепты обычных авторов читаются из ленты пользователя, рецепты
+    авторов с большим числом подписчиков подтягиваются при чтении.
+    """
+    pushed = FeedItem.objects.filter(user=user)
+    pull_author_ids = get_pull_author_ids(user)
+    pulled = Recipe.objects.filter(author_id__in=pull_author_ids)
+    if position is not None:
+        pub_date, recipe_id = position
+        pushed = pushed.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, recipe_id__lt=recipe_id)
+        )
+        pulled = pulled.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, id__lt=recipe_id)
+        )
+    sources = [
+        pushed.order_by('-pub_date', '-recipe_id').values_list(
+            'pub_date', 'recipe_id'
+        )[:limit]
+    ]
+    if pull_author_ids:
+        sources.append(
+            pulled.order_by('-pub_date', '-id').values_list(
+                'pub_date', 'id'
+            )[:limit]
+        )
+    keys = []
+    for key in heapq.merge(*sources, reverse=True):
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        if len(keys) == limit:
+            break
+    return keys
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes.changes import compact_events
+
+
+class Command(BaseCommand):
+    help = 'Сжимает журнал изменений.'
+
+    def handle(self, *args, **options):
+        count = compact_events()
+        self.stdout.write(f'Удалено событий: {count}.')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from recipes.cooccurrence import compute_cofavorites
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рецепты, которые добавляют в избранное вместе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--with-cart',
+            action='store_true',
+            help='Учитывать также списки покупок',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Пересчёт начат.')
+        count = compute_cofavorites(with_cart=options['with_cart'])
+        self.stdout.write(f'Пересчёт завершён, рецептов: {count}.')
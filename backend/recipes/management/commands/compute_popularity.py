@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.popularity import recompute_scores
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги популярности рецептов.'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Пересчёт начат.')
+        count = recompute_scores()
+        self.stdout.write(f'Пересчёт завершён, рецептов: {count}.')
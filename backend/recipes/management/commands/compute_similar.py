@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import compute_similar
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает списки похожих рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать все рецепты, а не только измененные',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Пересчёт начат.')
+        count = compute_similar(full=options['full'])
+        self.stdout.write(f'Пересчёт завершён, рецептов: {count}.')
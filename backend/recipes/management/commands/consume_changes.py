@@ -0,0 +1,44 @@
+import json
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from recipes.changes import consume
+from recipes.constants import CHANGES_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит новые события журнала изменений построчно в JSON '
+        'и запоминает позицию потребителя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default='default',
+                            help='Название потребителя')
+        parser.add_argument('--batch', type=int, default=CHANGES_BATCH_SIZE,
+                            help='Событий за одно чтение')
+        parser.add_argument('--follow', action='store_true',
+                            help='Ждать новые события')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Пауза при отсутствии событий, с')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        while self.running:
+            count = consume(options['name'], self.write, options['batch'])
+            if not options['follow']:
+                break
+            if not count:
+                time.sleep(options['sleep'])
+
+    def write(self, events):
+        for event in events:
+            self.stdout.write(json.dumps(event, cls=DjangoJSONEncoder))
+        self.stdout.flush()
+
+    def stop(self, signum, frame):
+        self.running = False
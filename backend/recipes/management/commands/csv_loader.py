@@ -1,10 +1,21 @@
 import csv
 import logging
+from decimal import Decimal
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from recipes.catalogue import record_changes
 from recipes.models import Ingredient
+from recipes.tasks import update_ingredient_totals
+
+OPTIONAL_COLUMNS = (
+    ('calories', float),
+    ('proteins', float),
+    ('fats', float),
+    ('carbohydrates', float),
+    ('price', Decimal),
+)
 
 
 class Command(BaseCommand):
@@ -13,23 +24,59 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         self.stdout.write('Загрузка начата.')
+        existing = {
+            (ingredient.name, ingredient.measurement_unit): ingredient
+            for ingredient in Ingredient.objects.all()
+        }
         with open(
-                f'{settings.BASE_DIR}/data/ingredients.csv',
+                options['path'] or f'{settings.BASE_DIR}/data/ingredients.csv',
                 'r',
                 encoding='utf-8',
         ) as file:
             reader = csv.reader(file)
             data = []
+            updated = []
 
             for row in reader:
                 name_csv = 0
                 measurement_unit_csv = 1
                 try:
-                    data.append(Ingredient(
-                        name=row[name_csv],
-                        measurement_unit=row[measurement_unit_csv],
-                    ))
+                    values = {
+                        field: convert(row[column]) if row[column] else None
+                        for column, (field, convert) in enumerate(
+                            OPTIONAL_COLUMNS[:len(row) - 2], start=2
+                        )
+                    }
+                    ingredient = existing.get(
+                        (row[name_csv], row[measurement_unit_csv])
+                    )
+                    if ingredient is None:
+                        data.append(Ingredient(
+                            name=row[name_csv],
+                            measurement_unit=row[measurement_unit_csv],
+                            **values,
+                        ))
+                    elif any(
+                        getattr(ingredient, field) != value
+                        for field, value in values.items()
+                    ):
+                        for field, value in values.items():
+                            setattr(ingredient, field, value)
+                        updated.append(ingredient)
                 except Exception as error:
                     logging.exception(f'Ошибка в строке {row}: {error}')
+            last_id = Ingredient.objects.order_by('-id').values_list(
+                'id', flat=True
+            ).first() or 0
             Ingredient.objects.bulk_create(data)
+            Ingredient.objects.bulk_update(
+                updated, [field for field, _ in OPTIONAL_COLUMNS]
+            )
+            if updated:
+                update_ingredient_totals.delay(
+                    *(ingredient.id for ingredient in updated)
+                )
+            record_changes(Ingredient.objects.filter(
+                id__gt=last_id
+            ).values_list('id', flat=True))
             self.stdout.write('Загрузка завершена.')
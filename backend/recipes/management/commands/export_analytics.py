@@ -0,0 +1,113 @@
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.dateparse import parse_datetime
+from foodgram.db_routers import get_replicas
+
+from recipes.export import TABLES, WRITERS, export_table
+
+STATE_FILE = 'watermarks.json'
+
+
+def load_position(name, value):
+    """Позиция из файла состояния: id или [время изменения, id]."""
+    if TABLES[name][2] is None:
+        return value or 0
+    if not isinstance(value, list):
+        # Позиция по id от прежних выгрузок: выгрузить таблицу заново.
+        return None
+    return parse_datetime(value[0]), value[1]
+
+
+def dump_position(position):
+    if isinstance(position, int):
+        return position
+    changed, last_id = position
+    return [changed.isoformat(), last_id]
+
+
+def get_label(position, first=False):
+    if position is None:
+        return '0'
+    if isinstance(position, int):
+        return str(position + 1 if first else position)
+    changed, last_id = position
+    return f'{changed:%Y%m%dT%H%M%S%f}_{last_id}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы для аналитики в сжатый CSV или Parquet. '
+        'Для Parquet нужен пакет pyarrow.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=Path,
+            default=settings.BASE_DIR / 'exports',
+            help='Каталог для файлов выгрузки',
+        )
+        parser.add_argument(
+            '--format',
+            choices=tuple(WRITERS),
+            default='csv',
+            help='Формат файлов',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=tuple(TABLES),
+            default=tuple(TABLES),
+            help='Выгружаемые таблицы',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Выгрузить таблицы целиком, а не только новые строки',
+        )
+        parser.add_argument(
+            '--database',
+            help='База для чтения, по умолчанию первая реплика',
+        )
+
+    def handle(self, *args, **options):
+        writer_class = WRITERS[options['format']]
+        if options['format'] == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError('Для формата parquet установите pyarrow.')
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        state_path = output / STATE_FILE
+        state = (
+            json.loads(state_path.read_text())
+            if state_path.exists() else {}
+        )
+        database = options['database'] or next(
+            iter(get_replicas()), DEFAULT_DB_ALIAS
+        )
+        for name in options['tables']:
+            since = load_position(
+                name, None if options['full'] else state.get(name)
+            )
+            part_path = output / f'{name}.{writer_class.extension}.part'
+            count, position = export_table(
+                name, writer_class, part_path, since, database
+            )
+            if not count:
+                part_path.unlink()
+                self.stdout.write(f'{name}: новых строк нет.')
+                continue
+            os.replace(part_path, output / (
+                f'{name}-{get_label(since, first=True)}-'
+                f'{get_label(position)}.{writer_class.extension}'
+            ))
+            state[name] = dump_position(position)
+            state_path.write_text(json.dumps(state, indent=2))
+            self.stdout.write(f'{name}: выгружено строк: {count}.')
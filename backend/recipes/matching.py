@@ -0,0 +1,230 @@
+"""Подбор рецептов по имеющимся ингредиентам.
+
+Каждый процесс держит в памяти обратный индекс: ингредиент -> отсортированный
+массив позиций рецептов. Перед поиском индекс догоняет журнал изменений в
+базе (recipes.changes), перечитывая только изменившиеся рецепты, так что
+видит изменения из любого процесса.
+"""
+import threading
+from itertools import chain
+
+import numpy as np
+from django.db import DEFAULT_DB_ALIAS
+
+from recipes.changes import get_last_position
+from recipes.constants import MATCH_BUILD_CHUNK_SIZE, MATCH_JOURNAL_MAX_LAG
+from recipes.models import ChangeEvent, Recipe, RecipeIngredient
+
+EMPTY = np.empty(0, dtype=np.int32)
+RECIPE_TOPIC = Recipe._meta.model_name
+INGREDIENTS_TOPIC = RecipeIngredient._meta.model_name
+
+
+def load_changed_ids(since, until):
+    """ID рецептов из событий журнала в позициях (since, until].
+
+    None, если событий больше MATCH_JOURNAL_MAX_LAG.
+    """
+    events = list(ChangeEvent.objects.using(DEFAULT_DB_ALIAS).filter(
+        position__gt=since,
+        position__lte=until,
+        topic__in=(RECIPE_TOPIC, INGREDIENTS_TOPIC),
+    ).values_list('topic', 'object_id', 'data')[:MATCH_JOURNAL_MAX_LAG + 1])
+    if len(events) > MATCH_JOURNAL_MAX_LAG:
+        return None
+    return [
+        object_id if topic == RECIPE_TOPIC else data['recipe_id']
+        for topic, object_id, data in events
+    ]
+
+
+def load_pairs(recipe_ids=None):
+    """Уникальные пары (рецепт, ингредиент), отсортированные по рецепту."""
+    queryset = RecipeIngredient.objects.using(DEFAULT_DB_ALIAS).order_by()
+    if recipe_ids is not None:
+        queryset = queryset.filter(recipe_id__in=recipe_ids)
+    pairs = np.fromiter(
+        chain.from_iterable(queryset.values_list(
+            'recipe_id', 'ingredient_id'
+        ).iterator(chunk_size=MATCH_BUILD_CHUNK_SIZE)),
+        dtype=np.int64,
+    )
+    keys = np.unique((pairs[0::2] << 32) | pairs[1::2])
+    return keys >> 32, keys & 0xFFFFFFFF
+
+
+def group_positions(positions, ingredient_ids):
+    """Позиции рецептов, сгруппированные по ингредиентам."""
+    order = np.lexsort((positions, ingredient_ids))
+    ingredient_ids = ingredient_ids[order]
+    positions = positions[order].astype(np.int32)
+    keys, starts = np.unique(ingredient_ids, return_index=True)
+    return zip(keys.tolist(), np.split(positions, starts[1:]))
+
+
+class Matches:
+    """Ранжированные совпадения с ленивой сортировкой по срезам.
+
+    Рецепты упорядочены по числу недостающих ингредиентов, затем по доле
+    имеющихся ингредиентов, затем от новых к старым.
+    """
+
+    def __init__(self, recipe_ids, matched, missing):
+        self.recipe_ids = recipe_ids
+        self.matched = matched
+        self.missing = missing
+
+    def __len__(self):
+        return len(self.recipe_ids)
+
+    def top(self, stop):
+        """Индексы первых stop совпадений и доли имеющихся ингредиентов."""
+        index = np.arange(len(self))
+        if stop < len(self):
+            index = np.flatnonzero(
+                self.missing <= np.partition(self.missing, stop - 1)[stop - 1]
+            )
+        missing = self.missing[index]
+        coverage = self.matched[index] / (self.matched[index] + missing)
+        order = np.lexsort((-self.recipe_ids[index], -coverage, missing))
+        return index[order][:stop], coverage[order][:stop]
+
+    def __getitem__(self, item):
+        start, stop, _ = item.indices(len(self))
+        index, coverage = self.top(stop)
+        return [
+            {
+                'id': int(self.recipe_ids[i]),
+                'coverage': float(share),
+                'missing_count': int(self.missing[i]),
+            }
+            for i, share in zip(index[start:], coverage[start:])
+        ]
+
+
+class MatchIndex:
+    """Обратный индекс ингредиентов рецептов.
+
+    Ингредиенты рецептов хранятся рядом с индексом: после построения -
+    сплошным массивом по позициям рецептов, для перечитанных с тех пор
+    рецептов - в словаре, так что удаление рецепта из индекса затрагивает
+    только массивы его ингредиентов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.position = None
+        self.recipe_ids = np.empty(0, dtype=np.int64)
+        self.sizes = EMPTY
+        self.postings = {}
+        self.ingredients = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.changed = {}
+
+    def build(self, position):
+        recipe_ids, ingredient_ids = load_pairs()
+        self.recipe_ids, positions = np.unique(recipe_ids, return_inverse=True)
+        self.sizes = np.bincount(
+            positions, minlength=len(self.recipe_ids)
+        ).astype(np.int32)
+        self.postings = dict(group_positions(positions, ingredient_ids))
+        self.ingredients = ingredient_ids
+        self.offsets = np.concatenate(([0], np.cumsum(self.sizes)))
+        self.changed = {}
+        self.position = position
+
+    def get_ingredients(self, position):
+        ingredients = self.changed.get(position)
+        if ingredients is None:
+            ingredients = self.ingredients[
+                self.offsets[position]:self.offsets[position + 1]
+            ]
+        return ingredients
+
+    def remove(self, positions):
+        removed = [
+            (position, ingredient_id)
+            for position in positions.tolist()
+            for ingredient_id in self.get_ingredients(position).tolist()
+        ]
+        if removed:
+            for ingredient_id, dropped in group_positions(
+                *map(np.array, zip(*removed))
+            ):
+                self.postings[ingredient_id] = np.setdiff1d(
+                    self.postings[ingredient_id], dropped, assume_unique=True
+                )
+        self.sizes[positions] = 0
+
+    def apply(self, changed_ids):
+        """Перечитывает ингредиенты изменившихся рецептов."""
+        changed_ids = np.unique(np.fromiter(changed_ids, dtype=np.int64))
+        recipe_ids, ingredient_ids = load_pairs(changed_ids.tolist())
+        new_ids = np.setdiff1d(recipe_ids, self.recipe_ids)
+        if (
+            len(new_ids) and len(self.recipe_ids)
+            and new_ids[0] < self.recipe_ids[-1]
+        ):
+            return False
+        found = np.searchsorted(self.recipe_ids, changed_ids)
+        known = found < len(self.recipe_ids)
+        known[known] = self.recipe_ids[found[known]] == changed_ids[known]
+        self.remove(found[known])
+        if len(new_ids):
+            self.recipe_ids = np.concatenate((self.recipe_ids, new_ids))
+            self.sizes = np.concatenate(
+                (self.sizes, np.zeros(len(new_ids), dtype=np.int32))
+            )
+        for position in found[known].tolist():
+            self.changed[position] = EMPTY
+        positions = np.searchsorted(self.recipe_ids, recipe_ids)
+        np.add.at(self.sizes, positions, 1)
+        keys, starts = np.unique(positions, return_index=True)
+        self.changed.update(
+            zip(keys.tolist(), np.split(ingredient_ids, starts[1:]))
+        )
+        for ingredient_id, added in group_positions(positions, ingredient_ids):
+            self.postings[ingredient_id] = np.union1d(
+                self.postings.get(ingredient_id, EMPTY), added
+            ).astype(np.int32)
+        return True
+
+    def refresh(self):
+        """Догоняет журнал изменений или перестраивает индекс целиком."""
+        position = get_last_position()
+        if self.position is None:
+            self.build(position)
+            return
+        if position == self.position:
+            return
+        changed_ids = load_changed_ids(self.position, position)
+        if changed_ids is None or not self.apply(changed_ids):
+            self.build(position)
+            return
+        self.position = position
+
+    def match(self, ingredient_ids, max_missing=None):
+        with self.lock:
+            self.refresh()
+            postings = [
+                self.postings[ingredient_id]
+                for ingredient_id in set(ingredient_ids)
+                if ingredient_id in self.postings
+            ]
+            if not postings:
+                return Matches(*(np.empty(0, dtype=np.int64),) * 3)
+            counts = np.bincount(
+                np.concatenate(postings), minlength=len(self.sizes)
+            )
+            candidates = np.flatnonzero(counts)
+            matched = counts[candidates].astype(np.int32)
+            missing = self.sizes[candidates] - matched
+            if max_missing is not None:
+                keep = missing <= max_missing
+                candidates = candidates[keep]
+                matched = matched[keep]
+                missing = missing[keep]
+            return Matches(self.recipe_ids[candidates], matched, missing)
+
+
+match_index = MatchIndex()
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.4 on 2026-10-19 07:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_feeditem'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='feeditem',
+            options={'ordering': ('-pub_date', '-recipe_id'), 'verbose_name': 'запись ленты', 'verbose_name_plural': 'Ленты подписок'},
+        ),
+        migrations.AlterField(
+            model_name='feeditem',
+            name='recipe',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='feed_items', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:03
+
+from django.db import migrations, models
+
+
+def record_existing(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientChange = apps.get_model('recipes', 'IngredientChange')
+    db_alias = schema_editor.connection.alias
+    IngredientChange.objects.using(db_alias).bulk_create(
+        IngredientChange(ingredient_id=ingredient_id)
+        for ingredient_id in Ingredient.objects.using(
+            db_alias
+        ).order_by('id').values_list(
+            'id', flat=True
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ingredient_id', models.PositiveIntegerField(db_index=True, verbose_name='ID ингредиента')),
+                ('deleted', models.BooleanField(default=False, verbose_name='Удален')),
+            ],
+            options={
+                'verbose_name': 'изменение ингредиента',
+                'verbose_name_plural': 'Изменения ингредиентов',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.RunPython(record_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_similarrecipe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoFavoriteRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата расчета')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe', verbose_name='Соседний рецепт')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'рецепт, добавляемый вместе',
+                'verbose_name_plural': 'Рецепты, добавляемые вместе',
+                'ordering': ('recipe', '-score'),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='cofavoriterecipe',
+            index=models.Index(fields=['recipe', '-score'], name='cofavorite_recipe_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cofavoriterecipe',
+            constraint=models.UniqueConstraint(fields=('recipe', 'neighbour'), name='unique cofavorite recipe'),
+        ),
+    ]
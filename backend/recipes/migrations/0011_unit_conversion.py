@@ -0,0 +1,53 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CONVERSIONS = (
+    ('кг', 'г', '1000'),
+    ('л', 'мл', '1000'),
+    ('стакан', 'мл', '250'),
+    ('ст. л.', 'мл', '15'),
+    ('ч. л.', 'мл', '5'),
+    ('капля', 'мл', '0.05'),
+)
+
+
+def add_conversions(apps, schema_editor):
+    UnitConversion = apps.get_model('recipes', 'UnitConversion')
+    UnitConversion.objects.using(
+        schema_editor.connection.alias
+    ).bulk_create(
+        UnitConversion(unit=unit, base_unit=base_unit, factor=factor)
+        for unit, base_unit, factor in CONVERSIONS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_nutrition_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitConversion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(max_length=64, unique=True, verbose_name='Единица измерения')),
+                ('base_unit', models.CharField(max_length=64, verbose_name='Базовая единица')),
+                ('factor', models.DecimalField(decimal_places=4, help_text='Количество базовых единиц в одной единице', max_digits=12, verbose_name='Множитель')),
+            ],
+            options={
+                'verbose_name': 'перевод единиц',
+                'verbose_name_plural': 'Перевод единиц',
+                'ordering': ('unit',),
+            },
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='alias_of',
+            field=models.ForeignKey(blank=True, help_text='В списке покупок суммируется с основным ингредиентом', limit_choices_to={'alias_of__isnull': True}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aliases', to='recipes.ingredient', verbose_name='Основной ингредиент'),
+        ),
+        migrations.RunPython(add_conversions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_unit_conversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShortLink',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='short_link', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('code', models.CharField(max_length=12, unique=True, verbose_name='Код')),
+                ('clicks', models.PositiveBigIntegerField(default=0, verbose_name='Переходы')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'короткая ссылка',
+                'verbose_name_plural': 'Короткие ссылки',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_shortlink'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='views',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, verbose_name='Просмотры'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.4 on 2026-10-19 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Название')),
+                ('position', models.PositiveBigIntegerField(default=0, verbose_name='Последнее прочитанное событие')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата чтения')),
+            ],
+            options={
+                'verbose_name': 'потребитель изменений',
+                'verbose_name_plural': 'Потребители изменений',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('topic', models.CharField(max_length=32, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('action', models.CharField(choices=[('save', 'Сохранение'), ('delete', 'Удаление')], max_length=6, verbose_name='Действие')),
+                ('data', models.JSONField(default=dict, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата события')),
+            ],
+            options={
+                'verbose_name': 'событие изменения',
+                'verbose_name_plural': 'События изменений',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['topic', 'object_id', '-id'], name='change_event_object_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.4 on 2026-10-19 09:01
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def position_existing(apps, schema_editor):
+    """Прочитанные по номеру события сохраняют номер как позицию."""
+    ChangeConsumer = apps.get_model('recipes', 'ChangeConsumer')
+    ChangeEvent = apps.get_model('recipes', 'ChangeEvent')
+    db_alias = schema_editor.connection.alias
+    ChangeEvent.objects.using(db_alias).update(position=F('id'))
+    ChangeConsumer.objects.using(db_alias).update_or_create(
+        name=':sequencer',
+        defaults={'position': ChangeEvent.objects.using(db_alias).aggregate(
+            position=Max('id')
+        )['position'] or 0},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_change_events'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='changeevent',
+            name='change_event_object_idx',
+        ),
+        migrations.AddField(
+            model_name='changeevent',
+            name='position',
+            field=models.PositiveBigIntegerField(null=True, unique=True, verbose_name='Позиция в журнале'),
+        ),
+        migrations.RunPython(position_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['topic', 'object_id', '-position'], name='change_event_object_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.4 on 2026-10-19 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_change_event_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipescore',
+            name='popular_debt',
+            field=models.FloatField(blank=True, null=True, verbose_name='Долг популярности'),
+        ),
+        migrations.AddField(
+            model_name='recipescore',
+            name='trending_debt',
+            field=models.FloatField(blank=True, null=True, verbose_name='Долг тренда'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.4 on 2026-10-19 10:01
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def position_existing(apps, schema_editor):
+    """Версии, уже выданные клиентам, сохраняются как позиции."""
+    ChangeConsumer = apps.get_model('recipes', 'ChangeConsumer')
+    IngredientChange = apps.get_model('recipes', 'IngredientChange')
+    db_alias = schema_editor.connection.alias
+    IngredientChange.objects.using(db_alias).update(position=F('id'))
+    ChangeConsumer.objects.using(db_alias).update_or_create(
+        name=':catalogue',
+        defaults={'position': IngredientChange.objects.using(
+            db_alias
+        ).aggregate(position=Max('id'))['position'] or 0},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipe_score_debt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredientchange',
+            name='position',
+            field=models.PositiveBigIntegerField(null=True, unique=True, verbose_name='Позиция в журнале'),
+        ),
+        migrations.RunPython(position_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_ingredient_change_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipescore',
+            name='recomputed',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Пересчитан'),
+        ),
+    ]
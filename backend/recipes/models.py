@@ -1,12 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from recipes.constants import (COOKING_TIME_MAX, COOKING_TIME_MIN,
+                               COST_DECIMAL_PLACES, COST_MAX_DIGITS,
                                INGREDIENT_AMOUNT_MAX, INGREDIENT_AMOUNT_MIN,
-                               MAX_LEN_STR_DEF, MAX_LENGTH_INGREDIENT_NAME,
+                               MAX_LEN_STR_DEF, MAX_LENGTH_CHANGE_TOPIC,
+                               MAX_LENGTH_CONSUMER_NAME,
+                               MAX_LENGTH_INGREDIENT_NAME,
                                MAX_LENGTH_MEASUREMENT_UNIT,
-                               MAX_LENGTH_RECIPE_NAME, MAX_LENGTH_TAG)
+                               MAX_LENGTH_RECIPE_NAME, MAX_LENGTH_TAG,
+                               SHORT_LINK_LENGTH, UNIT_FACTOR_DECIMAL_PLACES,
+                               UNIT_FACTOR_MAX_DIGITS)
 
 User = get_user_model()
 
@@ -41,6 +47,35 @@ class Ingredient(models.Model):
         max_length=MAX_LENGTH_MEASUREMENT_UNIT,
         verbose_name='Единица измерения'
     )
+    calories = models.FloatField(
+        'Калории на единицу', null=True, blank=True
+    )
+    proteins = models.FloatField(
+        'Белки на единицу', null=True, blank=True
+    )
+    fats = models.FloatField(
+        'Жиры на единицу', null=True, blank=True
+    )
+    carbohydrates = models.FloatField(
+        'Углеводы на единицу', null=True, blank=True
+    )
+    price = models.DecimalField(
+        'Цена за единицу',
+        max_digits=COST_MAX_DIGITS,
+        decimal_places=COST_DECIMAL_PLACES,
+        null=True,
+        blank=True,
+    )
+    alias_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='aliases',
+        limit_choices_to={'alias_of__isnull': True},
+        verbose_name='Основной ингредиент',
+        help_text='В списке покупок суммируется с основным ингредиентом',
+    )
 
     class Meta:
         ordering = ('name',)
@@ -53,10 +88,47 @@ class Ingredient(models.Model):
             ),
         )
 
+    def clean(self):
+        if self.alias_of_id is None:
+            return
+        if self.alias_of_id == self.id or self.alias_of.alias_of_id:
+            raise ValidationError({
+                'alias_of': 'Выберите ингредиент, не являющийся синонимом.'
+            })
+        if self.id and self.aliases.exists():
+            raise ValidationError({
+                'alias_of': 'У ингредиента есть синонимы.'
+            })
+
     def __str__(self):
         return self.name[:MAX_LEN_STR_DEF]
 
 
+class UnitConversion(models.Model):
+    unit = models.CharField(
+        'Единица измерения',
+        max_length=MAX_LENGTH_MEASUREMENT_UNIT,
+        unique=True,
+    )
+    base_unit = models.CharField(
+        'Базовая единица', max_length=MAX_LENGTH_MEASUREMENT_UNIT
+    )
+    factor = models.DecimalField(
+        'Множитель',
+        max_digits=UNIT_FACTOR_MAX_DIGITS,
+        decimal_places=UNIT_FACTOR_DECIMAL_PLACES,
+        help_text='Количество базовых единиц в одной единице',
+    )
+
+    class Meta:
+        ordering = ('unit',)
+        verbose_name = 'перевод единиц'
+        verbose_name_plural = 'Перевод единиц'
+
+    def __str__(self):
+        return f'1 {self.unit} = {self.factor.normalize():f} {self.base_unit}'
+
+
 class Recipe(models.Model):
     name = models.CharField(
         'Название', max_length=MAX_LENGTH_RECIPE_NAME,
@@ -90,6 +162,26 @@ class Recipe(models.Model):
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True
     )
+    modified = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True
+    )
+    calories = models.FloatField(
+        'Калорийность', null=True, blank=True, db_index=True
+    )
+    proteins = models.FloatField('Белки', null=True, blank=True)
+    fats = models.FloatField('Жиры', null=True, blank=True)
+    carbohydrates = models.FloatField('Углеводы', null=True, blank=True)
+    cost = models.DecimalField(
+        'Стоимость',
+        max_digits=COST_MAX_DIGITS,
+        decimal_places=COST_DECIMAL_PLACES,
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+    views = models.PositiveBigIntegerField(
+        'Просмотры', default=0, db_index=True
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -155,6 +247,9 @@ class UserRecipe(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Рецепт',
     )
+    added_at = models.DateTimeField(
+        'Дата добавления', auto_now_add=True
+    )
 
     class Meta:
         abstract = True
@@ -183,3 +278,225 @@ class Favorite(UserRecipe):
         default_related_name = 'favorites'
         verbose_name = 'избранное'
         verbose_name_plural = 'Избранное'
+
+
+class FeedItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        verbose_name='Пользователь',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='feed_items',
+        verbose_name='Рецепт',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ('-pub_date', '-recipe_id')
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique feed item'),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='feed_user_pub_date_idx'),
+        )
+
+    def __str__(self):
+        return f'"{self.recipe}" в ленте "{self.user}"'
+
+
+class RecipeScore(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Рецепт',
+    )
+    popular = models.FloatField(
+        'Популярность', null=True, blank=True, db_index=True
+    )
+    trending = models.FloatField(
+        'Тренд', null=True, blank=True, db_index=True
+    )
+    popular_debt = models.FloatField(
+        'Долг популярности', null=True, blank=True
+    )
+    trending_debt = models.FloatField('Долг тренда', null=True, blank=True)
+    recomputed = models.DateTimeField('Пересчитан', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+
+    def __str__(self):
+        return f'Рейтинг "{self.recipe}"'
+
+
+class IngredientChange(models.Model):
+    """Журнал изменений справочника ингредиентов.
+
+    Позиция, выданная после фиксации записи, служит версией справочника.
+    """
+
+    ingredient_id = models.PositiveIntegerField(
+        'ID ингредиента', db_index=True
+    )
+    deleted = models.BooleanField('Удален', default=False)
+    position = models.PositiveBigIntegerField(
+        'Позиция в журнале', null=True, unique=True
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'изменение ингредиента'
+        verbose_name_plural = 'Изменения ингредиентов'
+
+    def __str__(self):
+        return f'{self.id}: {self.ingredient_id}'
+
+
+class RecipeNeighbour(models.Model):
+    """Рецепт из списка ближайших соседей другого рецепта."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рецепт',
+    )
+    neighbour = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Соседний рецепт',
+    )
+    score = models.FloatField('Оценка')
+    updated_at = models.DateTimeField('Дата расчета')
+
+    class Meta:
+        abstract = True
+        ordering = ('recipe', '-score')
+
+    def __str__(self):
+        return f'{self.recipe} -> {self.neighbour}'
+
+
+class SimilarRecipe(RecipeNeighbour):
+
+    class Meta(RecipeNeighbour.Meta):
+        verbose_name = 'похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipe', 'neighbour'),
+                name='unique similar recipe'),
+        )
+
+
+class CoFavoriteRecipe(RecipeNeighbour):
+
+    class Meta(RecipeNeighbour.Meta):
+        verbose_name = 'рецепт, добавляемый вместе'
+        verbose_name_plural = 'Рецепты, добавляемые вместе'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipe', 'neighbour'),
+                name='unique cofavorite recipe'),
+        )
+        indexes = (
+            models.Index(
+                fields=('recipe', '-score'),
+                name='cofavorite_recipe_score_idx'),
+        )
+
+
+class ShortLink(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='short_link',
+        verbose_name='Рецепт',
+    )
+    code = models.CharField(
+        'Код', max_length=SHORT_LINK_LENGTH * 2, unique=True
+    )
+    clicks = models.PositiveBigIntegerField('Переходы', default=0)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'короткая ссылка'
+        verbose_name_plural = 'Короткие ссылки'
+
+    def __str__(self):
+        return self.code
+
+
+class ChangeEvent(models.Model):
+    """Событие журнала изменений для внешних потребителей.
+
+    Курсором чтения служит позиция, которую событие получает после
+    фиксации своей транзакции.
+    """
+
+    class Action(models.TextChoices):
+        SAVE = 'save', 'Сохранение'
+        DELETE = 'delete', 'Удаление'
+
+    id = models.BigAutoField(primary_key=True)
+    topic = models.CharField('Тип объекта', max_length=MAX_LENGTH_CHANGE_TOPIC)
+    object_id = models.PositiveBigIntegerField('ID объекта')
+    action = models.CharField(
+        'Действие',
+        max_length=max(len(value) for value in Action.values),
+        choices=Action.choices,
+    )
+    data = models.JSONField('Данные', default=dict)
+    created_at = models.DateTimeField(
+        'Дата события', auto_now_add=True, db_index=True
+    )
+    position = models.PositiveBigIntegerField(
+        'Позиция в журнале', null=True, unique=True
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'событие изменения'
+        verbose_name_plural = 'События изменений'
+        indexes = (
+            models.Index(
+                fields=('topic', 'object_id', '-position'),
+                name='change_event_object_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.id}: {self.action} {self.topic} {self.object_id}'
+
+
+class ChangeConsumer(models.Model):
+    name = models.CharField(
+        'Название', max_length=MAX_LENGTH_CONSUMER_NAME, unique=True
+    )
+    position = models.PositiveBigIntegerField(
+        'Последнее прочитанное событие', default=0
+    )
+    updated_at = models.DateTimeField('Дата чтения', auto_now=True)
+
+    class Meta:
+        ordering = ('name',)
+        verbose_name = 'потребитель изменений'
+        verbose_name_plural = 'Потребители изменений'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,56 @@
+"""Итоговые калорийность, БЖУ и стоимость рецептов.
+
+Итоги хранятся в полях Recipe и пересчитываются одним UPDATE
+с подзапросами: сумма amount * значение на единицу по ингредиентам,
+для которых значение известно.
+"""
+from django.db.models import (DecimalField, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum)
+
+from recipes.constants import (COST_DECIMAL_PLACES, COST_MAX_DIGITS,
+                               TOTALS_BATCH_SIZE)
+from recipes.models import Recipe, RecipeIngredient
+
+TOTALS = {
+    'calories': ('calories', FloatField()),
+    'proteins': ('proteins', FloatField()),
+    'fats': ('fats', FloatField()),
+    'carbohydrates': ('carbohydrates', FloatField()),
+    'cost': ('price', DecimalField(
+        max_digits=COST_MAX_DIGITS, decimal_places=COST_DECIMAL_PLACES
+    )),
+}
+
+
+def get_total(ingredient_field, output_field):
+    return Subquery(
+        RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(total=Sum(ExpressionWrapper(
+            F('amount') * F(f'ingredient__{ingredient_field}'),
+            output_field=output_field,
+        ))).values('total'),
+        output_field=output_field,
+    )
+
+
+def update_totals(recipe_ids):
+    return Recipe.objects.filter(id__in=recipe_ids).update(**{
+        field: get_total(*source) for field, source in TOTALS.items()
+    })
+
+
+def update_ingredient_totals(ingredient_ids):
+    """Пересчитывает итоги всех рецептов с этими ингредиентами."""
+    recipe_ids = RecipeIngredient.objects.filter(
+        ingredient_id__in=ingredient_ids
+    ).order_by('recipe_id').values_list('recipe_id', flat=True).distinct()
+    last_id = 0
+    while True:
+        batch = list(recipe_ids.filter(
+            recipe_id__gt=last_id
+        )[:TOTALS_BATCH_SIZE])
+        if not batch:
+            return
+        update_totals(batch)
+        last_id = batch[-1]
@@ -0,0 +1,168 @@
+"""Рейтинги рецептов с экспоненциальным затуханием.
+
+Вклад события с весом w в момент t равен w * 2 ** ((t - EPOCH) / T),
+где T - период полураспада. Оценки всех рецептов затухают одинаково,
+поэтому порядок по такой сумме совпадает с порядком по затухшей
+сумме на текущий момент, а новые события просто прибавляются.
+Суммы хранятся в логарифмах, чтобы не переполнять float. Удаление,
+обработанное раньше своего добавления, не может увести сумму ниже нуля,
+поэтому остаток запоминается как долг и гасится следующими событиями.
+Пересчет запоминает в рейтинге момент, на который прочитал события,
+и задачи с событиями не позже него уже учтены пересчетом.
+"""
+import math
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.constants import (EVENT_WEIGHTS, POPULAR_HALF_LIFE_DAYS,
+                               SCORES_BATCH_SIZE, TRENDING_HALF_LIFE_DAYS)
+from recipes.models import Favorite, Recipe, RecipeScore, ShoppingCart
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HALF_LIVES = {
+    'popular': timedelta(days=POPULAR_HALF_LIFE_DAYS).total_seconds(),
+    'trending': timedelta(days=TRENDING_HALF_LIFE_DAYS).total_seconds(),
+}
+SCORE_FIELDS = (*HALF_LIVES, *(f'{field}_debt' for field in HALF_LIVES))
+PRECISION = 1e-9
+
+
+def log_weight(kind, moment, half_life):
+    return (
+        math.log(EVENT_WEIGHTS[kind])
+        + math.log(2) * (moment - EPOCH).total_seconds() / half_life
+    )
+
+
+def log_add(total, value):
+    if total is None:
+        return value
+    high, low = max(total, value), min(total, value)
+    return high + math.log1p(math.exp(low - high))
+
+
+def log_sub(total, value):
+    if total is None or value >= total - PRECISION:
+        return None
+    return total + math.log1p(-math.exp(value - total))
+
+
+def log_shift(high, low, value):
+    """Прибавляет value к разности exp(high) - exp(low).
+
+    Из пары high и low задано не больше одного значения.
+    """
+    if low is None:
+        return log_add(high, value), None
+    rest = log_sub(value, low)
+    if rest is not None:
+        return rest, None
+    return None, log_sub(low, value)
+
+
+def apply_event(score, kind, moment, removed=False):
+    for field, half_life in HALF_LIVES.items():
+        debt_field = f'{field}_debt'
+        value = log_weight(kind, moment, half_life)
+        total, debt = getattr(score, field), getattr(score, debt_field)
+        if removed:
+            debt, total = log_shift(debt, total, value)
+        else:
+            total, debt = log_shift(total, debt, value)
+        setattr(score, field, total)
+        setattr(score, debt_field, debt)
+
+
+def is_counted(score, occurred):
+    """Событие, случившееся в момент occurred, учтено пересчетом."""
+    return (
+        occurred is not None and score.recomputed is not None
+        and occurred <= score.recomputed
+    )
+
+
+def lock_scores(recipe_ids):
+    """Блокирует рейтинги рецептов, создавая недостающие.
+
+    Рейтинги удаленных рецептов не создаются заново.
+    """
+    RecipeScore.objects.bulk_create(
+        (
+            RecipeScore(recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                id__in=recipe_ids
+            ).values_list('id', flat=True)
+        ),
+        ignore_conflicts=True,
+    )
+    return RecipeScore.objects.select_for_update().in_bulk(recipe_ids)
+
+
+def update_scores(kind, recipe_ids, moment, removed=False, occurred=None):
+    """Применяет событие с весом на момент moment.
+
+    occurred - когда событие произошло: для добавления это moment, для
+    удаления - время удаления. Без него событие применяется всегда.
+    """
+    with transaction.atomic():
+        scores = lock_scores(recipe_ids)
+        for score in scores.values():
+            if not is_counted(score, occurred):
+                apply_event(score, kind, moment, removed)
+        RecipeScore.objects.bulk_update(scores.values(), SCORE_FIELDS)
+
+
+def remove_events(kind, events, occurred=None):
+    """Вычитает из рейтингов события (recipe_id, moment), удаленные
+    в момент occurred."""
+    with transaction.atomic():
+        scores = lock_scores({recipe_id for recipe_id, _ in events})
+        for recipe_id, moment in events:
+            score = scores.get(recipe_id)
+            if score is not None and not is_counted(score, occurred):
+                apply_event(score, kind, moment, removed=True)
+        RecipeScore.objects.bulk_update(scores.values(), SCORE_FIELDS)
+
+
+def recompute_scores():
+    """Пересчитывает рейтинги по избранному и спискам покупок.
+
+    Рецепты обходятся пачками по id. Рейтинги пачки обновляются на
+    месте под блокировкой, так что update_scores из задач ждут
+    пересчета, а не пишут в удаленные строки. Момент чтения событий
+    запоминается в recomputed, и задачи, поставленные до пересчета,
+    не учитывают свои события второй раз.
+    """
+    count, last_id = 0, 0
+    while True:
+        recipe_ids = list(
+            Recipe.objects.filter(id__gt=last_id).order_by('id').values_list(
+                'id', flat=True
+            )[:SCORES_BATCH_SIZE]
+        )
+        if not recipe_ids:
+            return count
+        last_id = recipe_ids[-1]
+        with transaction.atomic():
+            scores = lock_scores(recipe_ids)
+            recomputed = timezone.now()
+            for score in scores.values():
+                for field in SCORE_FIELDS:
+                    setattr(score, field, None)
+                score.recomputed = recomputed
+            for model in (Favorite, ShoppingCart):
+                events = model.objects.filter(
+                    recipe_id__in=list(scores)
+                ).order_by().values_list('recipe_id', 'added_at')
+                for recipe_id, added_at in events:
+                    apply_event(
+                        scores[recipe_id], model._meta.model_name, added_at
+                    )
+            RecipeScore.objects.bulk_update(
+                scores.values(), (*SCORE_FIELDS, 'recomputed')
+            )
+        count += sum(
+            score.popular is not None for score in scores.values()
+        )
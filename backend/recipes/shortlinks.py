@@ -0,0 +1,100 @@
+"""Короткие ссылки на рецепты.
+
+Код получается из id рецепта перемешиванием и записью в base62, поэтому
+не выдает порядок создания рецептов. Первый символ кода всегда буква,
+чтобы коды не пересекались со старыми ссылками вида /s/<id>/.
+"""
+import string
+import threading
+import time
+from collections import OrderedDict
+
+from django.http import Http404
+from foodgram.counters import BufferedCounter
+
+from recipes.constants import (SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TIMEOUT,
+                               SHORT_LINK_LENGTH, SHORT_LINK_MULTIPLIER)
+from recipes.models import Recipe, ShortLink
+
+LETTERS = string.ascii_letters
+ALPHABET = string.ascii_letters + string.digits
+CODE_SPACE = len(LETTERS) * len(ALPHABET) ** (SHORT_LINK_LENGTH - 1)
+
+
+def encode(number):
+    """Код длиной не меньше SHORT_LINK_LENGTH, свой для каждого числа."""
+    high, low = divmod(number, CODE_SPACE)
+    value, first = divmod(
+        low * SHORT_LINK_MULTIPLIER % CODE_SPACE + high * CODE_SPACE,
+        len(LETTERS),
+    )
+    chars = [LETTERS[first]]
+    while value or len(chars) < SHORT_LINK_LENGTH:
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return ''.join(chars)
+
+
+class LinkCache:
+    """LRU-кэш ссылка -> id рецепта в памяти процесса."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, recipe_id):
+        with self.lock:
+            self.entries[key] = (recipe_id, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+links = LinkCache(SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TIMEOUT)
+clicks = BufferedCounter(ShortLink, 'clicks')
+
+
+def get_code(recipe_id):
+    """Код ссылки на рецепт, ссылка создается при первом запросе."""
+    return ShortLink.objects.get_or_create(
+        recipe_id=recipe_id, defaults={'code': encode(recipe_id)}
+    )[0].code
+
+
+def resolve(key):
+    """id рецепта по коду или по id из старой ссылки.
+
+    Переход засчитывается ссылке рецепта. Для старой ссылки на рецепт,
+    у которого еще нет короткой ссылки, она создается, чтобы переходы не
+    терялись.
+    """
+    recipe_id = links.get(key)
+    if recipe_id is None:
+        if isinstance(key, int):
+            queryset = Recipe.objects.filter(pk=key).values_list('pk')
+        else:
+            queryset = ShortLink.objects.filter(code=key).values_list(
+                'recipe_id'
+            )
+        found = queryset.first()
+        if found is None:
+            raise Http404(f'Ссылка "{key}" не существует.')
+        recipe_id = found[0]
+        if isinstance(key, int):
+            get_code(recipe_id)
+        links.set(key, recipe_id)
+    clicks.add(recipe_id)
+    return recipe_id
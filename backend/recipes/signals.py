@@ -0,0 +1,145 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from foodgram.deletion import pre_bulk_delete
+
+from recipes import changes, tasks
+from recipes.catalogue import record_changes
+from recipes.constants import SCORES_BATCH_SIZE
+from recipes.models import (ChangeEvent, Favorite, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart)
+from users.models import Follow
+
+
+@receiver(post_save, sender=Recipe)
+def push_recipe_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        tasks.push_recipe_to_feeds.delay(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_totals(sender, instance, **kwargs):
+    tasks.update_recipe_totals.delay(instance.id)
+
+
+@receiver(post_delete, sender=Recipe)
+def clean_deleted_recipe(sender, instance, **kwargs):
+    tasks.purge_feed_items.delay(instance.id)
+    if instance.image:
+        tasks.delete_media.delay(instance.image.name)
+
+
+@receiver(pre_bulk_delete, sender=Recipe)
+def clean_deleted_recipes(sender, queryset, **kwargs):
+    recipe_ids = list(queryset.values_list('id', flat=True))
+    tasks.purge_feed_items.delay(*recipe_ids)
+    images = [
+        name for name in queryset.values_list('image', flat=True) if name
+    ]
+    if images:
+        tasks.delete_media.delay(*images)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed(sender, instance, created, **kwargs):
+    if created:
+        tasks.backfill_feed.delay(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clean_feed(sender, instance, **kwargs):
+    tasks.clean_feed.delay(instance.user_id, instance.author_id)
+
+
+@receiver(pre_bulk_delete, sender=Follow)
+def clean_deleted_feeds(sender, queryset, field, **kwargs):
+    if field is not None:
+        return
+    authors = defaultdict(list)
+    for user_id, author_id in queryset.values_list('user_id', 'author_id'):
+        authors[user_id].append(author_id)
+    for user_id, author_ids in authors.items():
+        tasks.clean_feed.delay(user_id, *author_ids)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def add_recipe_score(sender, instance, created, **kwargs):
+    if created:
+        tasks.update_recipe_scores.delay(
+            sender._meta.model_name,
+            [instance.recipe_id],
+            instance.added_at.isoformat(),
+            False,
+            instance.added_at.isoformat(),
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def remove_recipe_score(sender, instance, **kwargs):
+    tasks.update_recipe_scores.delay(
+        sender._meta.model_name,
+        [instance.recipe_id],
+        instance.added_at.isoformat(),
+        True,
+        timezone.now().isoformat(),
+    )
+
+
+@receiver(pre_bulk_delete, sender=Favorite)
+@receiver(pre_bulk_delete, sender=ShoppingCart)
+def remove_deleted_scores(sender, queryset, field, **kwargs):
+    if field is not None and field.name == 'recipe':
+        return
+    occurred = timezone.now().isoformat()
+    events = queryset.values_list('recipe_id', 'added_at').iterator()
+    while True:
+        batch = list(islice(events, SCORES_BATCH_SIZE))
+        if not batch:
+            return
+        tasks.remove_recipe_events.delay(sender._meta.model_name, [
+            (recipe_id, added_at.isoformat()) for recipe_id, added_at in batch
+        ], occurred)
+
+
+@receiver(post_save, sender=Ingredient)
+def record_ingredient_change(sender, instance, created, **kwargs):
+    record_changes((instance.id,))
+    if not created:
+        tasks.update_ingredient_totals.delay(instance.id)
+
+
+@receiver(post_delete, sender=Ingredient)
+def record_ingredient_delete(sender, instance, **kwargs):
+    record_changes((instance.id,), deleted=True)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Follow)
+def record_saved_change(sender, instance, **kwargs):
+    changes.record_objects(sender, ChangeEvent.Action.SAVE, (instance,))
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Follow)
+def record_deleted_change(sender, instance, **kwargs):
+    changes.record_objects(sender, ChangeEvent.Action.DELETE, (instance,))
+
+
+@receiver(pre_bulk_delete, sender=Recipe)
+@receiver(pre_bulk_delete, sender=RecipeIngredient)
+@receiver(pre_bulk_delete, sender=Favorite)
+@receiver(pre_bulk_delete, sender=ShoppingCart)
+@receiver(pre_bulk_delete, sender=Follow)
+def record_bulk_deleted_changes(sender, queryset, **kwargs):
+    changes.record_queryset(queryset, ChangeEvent.Action.DELETE)
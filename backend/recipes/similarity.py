@@ -0,0 +1,182 @@
+"""Похожие рецепты по взвешенному коэффициенту Жаккара.
+
+Рецепт описывается множеством ингредиентов и тегов, теги входят с весом
+SIMILAR_TAG_WEIGHT. Для каждого рецепта хранятся SIMILAR_TOP_K ближайших
+соседей, API только читает готовые списки.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+from scipy import sparse
+
+from recipes.constants import (SIMILAR_BATCH_SIZE, SIMILAR_REVERSE_CANDIDATES,
+                               SIMILAR_TAG_WEIGHT, SIMILAR_TOP_K,
+                               SIMILAR_WATERMARK_OVERLAP_MINUTES)
+from recipes.matching import load_pairs
+from recipes.models import Recipe, SimilarRecipe
+
+
+def load_features():
+    """Матрица рецепты x признаки с весами признаков и id рецептов строк."""
+    recipe_ids = np.fromiter(
+        Recipe.objects.order_by('id').values_list(
+            'id', flat=True
+        ).iterator(),
+        dtype=np.int64,
+    )
+    ingredient_recipes, ingredient_ids = load_pairs()
+    tag_pairs = np.array(
+        Recipe.tags.through.objects.values_list('recipe_id', 'tag_id'),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    offset = int(ingredient_ids.max(initial=0)) + 1
+    rows = np.concatenate((ingredient_recipes, tag_pairs[:, 0]))
+    columns = np.concatenate((ingredient_ids, tag_pairs[:, 1] + offset))
+    weights = np.concatenate((
+        np.ones(len(ingredient_ids)),
+        np.full(len(tag_pairs), SIMILAR_TAG_WEIGHT),
+    ))
+    known = np.isin(rows, recipe_ids)
+    features = sparse.csr_matrix(
+        (
+            weights[known],
+            (np.searchsorted(recipe_ids, rows[known]), columns[known]),
+        ),
+        shape=(len(recipe_ids), int(columns.max(initial=0)) + 1),
+    )
+    features.sum_duplicates()
+    features.data = np.where(
+        features.indices < offset, 1.0, SIMILAR_TAG_WEIGHT
+    )
+    return recipe_ids, features
+
+
+def select_top(batch, rows, columns, scores, limit):
+    """Лучшие limit столбцов для каждой строки пачки, кроме нее самой."""
+    keep = columns != batch[rows]
+    rows, columns, scores = rows[keep], columns[keep], scores[keep]
+    order = np.lexsort((columns, -scores, rows))
+    rows, columns, scores = rows[order], columns[order], scores[order]
+    starts = np.searchsorted(rows, np.arange(len(batch) + 1))
+    for row, position in enumerate(batch):
+        end = min(starts[row + 1], starts[row] + limit)
+        yield position, columns[starts[row]:end], scores[starts[row]:end]
+
+
+def top_neighbours(features, positions, limit):
+    """Соседи рецептов positions: пары массивов (позиции, оценки)."""
+    binary = features.copy()
+    binary.data = np.ones_like(binary.data)
+    sizes = np.asarray(features.sum(axis=1)).ravel()
+    for start in range(0, len(positions), SIMILAR_BATCH_SIZE):
+        batch = positions[start:start + SIMILAR_BATCH_SIZE]
+        common = (features[batch] @ binary.T).tocoo()
+        yield from select_top(
+            batch,
+            common.row,
+            common.col,
+            common.data / (
+                sizes[batch][common.row] + sizes[common.col] - common.data
+            ),
+            limit,
+        )
+
+
+def save_neighbours(model, recipe_ids, neighbours, moment):
+    """Заменяет списки соседей рецептов в таблице model."""
+    with transaction.atomic():
+        model.objects.filter(recipe_id__in=[
+            int(recipe_ids[position]) for position, _, _ in neighbours
+        ]).delete()
+        model.objects.bulk_create(
+            model(
+                recipe_id=int(recipe_ids[position]),
+                neighbour_id=neighbour_id,
+                score=float(score),
+                updated_at=moment,
+            )
+            for position, columns, scores in neighbours
+            for neighbour_id, score in zip(
+                recipe_ids[columns].tolist(), scores
+            )
+        )
+
+
+def recompute(recipe_ids, features, positions, moment):
+    """Пересчитывает списки соседей рецептов positions пачками."""
+    neighbours = []
+    for item in top_neighbours(features, positions, SIMILAR_TOP_K):
+        neighbours.append(item)
+        if len(neighbours) == SIMILAR_BATCH_SIZE:
+            save_neighbours(SimilarRecipe, recipe_ids, neighbours, moment)
+            neighbours = []
+    if neighbours:
+        save_neighbours(SimilarRecipe, recipe_ids, neighbours, moment)
+
+
+def get_affected(recipe_ids, features, positions):
+    """Рецепты, в списки соседей которых могли войти рецепты positions.
+
+    Это рецепты, уже ссылающиеся на изменившиеся, и ближайшие к ним
+    рецепты с неполным списком или худшим соседом слабее нового.
+    """
+    changed_ids = recipe_ids[positions].tolist()
+    affected = set(SimilarRecipe.objects.filter(
+        neighbour_id__in=changed_ids
+    ).values_list('recipe_id', flat=True))
+    candidates = {}
+    for _, columns, scores in top_neighbours(
+        features, positions, SIMILAR_REVERSE_CANDIDATES
+    ):
+        for column, score in zip(recipe_ids[columns].tolist(), scores):
+            candidates[column] = max(score, candidates.get(column, 0))
+    worst = {
+        recipe_id: (count, score)
+        for recipe_id, count, score in SimilarRecipe.objects.filter(
+            recipe_id__in=list(candidates)
+        ).values('recipe_id').annotate(
+            count=Count('id'), score=Min('score')
+        ).values_list('recipe_id', 'count', 'score').order_by()
+    }
+    for recipe_id, score in candidates.items():
+        count, worst_score = worst.get(recipe_id, (0, 0))
+        if count < SIMILAR_TOP_K or score > worst_score:
+            affected.add(recipe_id)
+    affected.difference_update(changed_ids)
+    affected = np.array(sorted(affected), dtype=np.int64)
+    return np.searchsorted(
+        recipe_ids, affected[np.isin(affected, recipe_ids)]
+    )
+
+
+def compute_similar(full=False):
+    """Обновляет соседей рецептов, измененных с прошлого расчета.
+
+    Рецепты, сохраненные позже начала расчета, попадут в следующий.
+    Списки, укоротившиеся из-за удаления рецептов, пополняет только
+    полный пересчет. Возвращает число пересчитанных рецептов.
+    """
+    moment = timezone.now()
+    watermark = None if full else SimilarRecipe.objects.aggregate(
+        watermark=Max('updated_at')
+    )['watermark']
+    recipe_ids, features = load_features()
+    if watermark is None:
+        positions = np.arange(len(recipe_ids))
+    else:
+        changed_ids = np.fromiter(
+            Recipe.objects.filter(modified__gte=watermark - timedelta(
+                minutes=SIMILAR_WATERMARK_OVERLAP_MINUTES
+            )).values_list('id', flat=True),
+            dtype=np.int64,
+        )
+        changed_ids = np.sort(changed_ids[np.isin(changed_ids, recipe_ids)])
+        positions = np.searchsorted(recipe_ids, changed_ids)
+        positions = np.union1d(
+            positions, get_affected(recipe_ids, features, positions)
+        )
+    recompute(recipe_ids, features, positions, moment)
+    return len(positions)
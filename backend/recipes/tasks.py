@@ -0,0 +1,68 @@
+from django.core.files.storage import default_storage
+from django.utils.dateparse import parse_datetime
+
+from recipes import catalogue, changes, feed, nutrition, popularity
+from recipes.constants import CHANGES_SEQUENCE_INTERVAL
+from tasks.constants import LOW_PRIORITY
+from tasks.queue import periodic, task
+
+
+@task()
+def push_recipe_to_feeds(recipe_id):
+    feed.push_recipe(recipe_id)
+
+
+@task()
+def backfill_feed(user_id, *author_ids):
+    for author_id in author_ids:
+        feed.backfill_author(user_id, author_id)
+
+
+@task()
+def clean_feed(user_id, *author_ids):
+    for author_id in author_ids:
+        feed.remove_author(user_id, author_id)
+
+
+@task(priority=LOW_PRIORITY)
+def purge_feed_items(*recipe_ids):
+    for recipe_id in recipe_ids:
+        feed.purge_recipe(recipe_id)
+
+
+@task(priority=LOW_PRIORITY)
+def delete_media(*names):
+    for name in names:
+        default_storage.delete(name)
+
+
+@task()
+def update_recipe_scores(kind, recipe_ids, moment, removed=False,
+                         occurred=None):
+    popularity.update_scores(
+        kind, recipe_ids, parse_datetime(moment), removed,
+        occurred and parse_datetime(occurred),
+    )
+
+
+@task()
+def remove_recipe_events(kind, events, occurred=None):
+    popularity.remove_events(kind, [
+        (recipe_id, parse_datetime(moment)) for recipe_id, moment in events
+    ], occurred and parse_datetime(occurred))
+
+
+@task()
+def update_recipe_totals(*recipe_ids):
+    nutrition.update_totals(recipe_ids)
+
+
+@task(priority=LOW_PRIORITY)
+def update_ingredient_totals(*ingredient_ids):
+    nutrition.update_ingredient_totals(ingredient_ids)
+
+
+@periodic(CHANGES_SEQUENCE_INTERVAL)
+def assign_change_positions():
+    changes.assign_all_positions()
+    catalogue.assign_all_positions()
@@ -1,12 +1,14 @@
 from django.shortcuts import redirect
 from django.views.decorators.http import require_GET
-from rest_framework import status
 
-from recipes.models import Recipe
+from recipes.shortlinks import resolve
+
+
+@require_GET
+def short_link(request, code):
+    return redirect(f'/recipes/{resolve(code)}/')
 
 
 @require_GET
 def short_url(request, pk):
-    if not Recipe.objects.filter(pk=pk).exists():
-        raise status.Http404(f'Рецепт с  id "{pk}"  не существует.')
-    return redirect(f"/recipes/{pk}/")
+    return redirect(f'/recipes/{resolve(pk)}/')
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'created',
+        'started',
+        'finished',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('^name',)
+    actions = ('requeue',)
+
+    @admin.action(description='Перезапустить')
+    def requeue(self, request, queryset):
+        queryset.update(
+            status=Task.Status.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+        )
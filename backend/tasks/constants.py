@@ -0,0 +1,13 @@
+DEFAULT_PRIORITY = 0
+HIGH_PRIORITY = 10
+LOW_PRIORITY = -10
+MAX_ATTEMPTS = 3
+MAX_LENGTH_TASK_NAME = 255
+METRICS_SAMPLE_SIZE = 1000
+RETRY_DELAY_SECONDS = 10
+STALE_TASK_ERROR = 'Обработчик не завершил задачу за отведенное время.'
+TASK_BATCH_SIZE = 10
+TASK_POLL_INTERVAL = 1.0
+TASK_REQUEUE_INTERVAL = 60
+TASK_RETENTION_DAYS = 7
+TASK_TIMEOUT_SECONDS = 600
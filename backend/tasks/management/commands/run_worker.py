@@ -0,0 +1,37 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.constants import TASK_BATCH_SIZE, TASK_POLL_INTERVAL
+from tasks.queue import purge_finished, run_pending, run_periodic
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=TASK_BATCH_SIZE,
+                            help='Задач за один захват')
+        parser.add_argument('--sleep', type=float, default=TASK_POLL_INTERVAL,
+                            help='Пауза при пустой очереди, с')
+        parser.add_argument('--once', action='store_true',
+                            help='Обработать очередь и выйти')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        self.stdout.write('Обработчик задач запущен.')
+        purge_finished()
+        last_runs = {}
+        while self.running:
+            run_periodic(last_runs)
+            processed = run_pending(options['batch'])
+            if not processed:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        self.stdout.write('Обработчик задач остановлен.')
+
+    def stop(self, signum, frame):
+        self.running = False
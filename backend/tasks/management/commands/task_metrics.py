@@ -0,0 +1,12 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks.queue import get_metrics
+
+
+class Command(BaseCommand):
+    help = 'Выводит глубину очереди и задержки фоновых задач.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(get_metrics(), indent=2))
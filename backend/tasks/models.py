@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+from tasks.constants import (DEFAULT_PRIORITY, MAX_ATTEMPTS,
+                             MAX_LENGTH_TASK_NAME)
+
+
+class Task(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Название', max_length=MAX_LENGTH_TASK_NAME)
+    args = models.JSONField('Аргументы', default=list)
+    priority = models.SmallIntegerField('Приоритет', default=DEFAULT_PRIORITY)
+    status = models.CharField(
+        'Статус',
+        max_length=max(len(value) for value in Status.values),
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=MAX_ATTEMPTS
+    )
+    run_after = models.DateTimeField('Запустить после', default=timezone.now)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    started = models.DateTimeField('Запущена', null=True, blank=True)
+    finished = models.DateTimeField('Завершена', null=True, blank=True)
+    error = models.TextField('Ошибка', blank=True)
+
+    class Meta:
+        ordering = ('-priority', 'run_after', 'id')
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        indexes = (
+            models.Index(
+                fields=('status', '-priority', 'run_after'),
+                name='task_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,180 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+from functools import partial
+from statistics import mean
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from tasks.constants import (DEFAULT_PRIORITY, MAX_ATTEMPTS,
+                             METRICS_SAMPLE_SIZE, RETRY_DELAY_SECONDS,
+                             STALE_TASK_ERROR, TASK_REQUEUE_INTERVAL,
+                             TASK_RETENTION_DAYS, TASK_TIMEOUT_SECONDS)
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+periodic_registry = {}
+
+
+def task(priority=DEFAULT_PRIORITY, max_attempts=MAX_ATTEMPTS):
+    """Регистрирует функцию как фоновую задачу.
+
+    Вызов func.delay(*args) ставит задачу в очередь в текущей
+    транзакции, аргументы должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        registry[name] = func
+        func.delay = partial(enqueue, name, priority, max_attempts)
+        return func
+    return decorator
+
+
+def periodic(interval):
+    """Регистрирует функцию, которую обработчик задач вызывает не чаще
+    раза в interval секунд между захватами задач."""
+    def decorator(func):
+        periodic_registry[f'{func.__module__}.{func.__name__}'] = (
+            func, interval
+        )
+        return func
+    return decorator
+
+
+def run_periodic(last_runs):
+    """Вызывает периодические функции, для которых подошел срок.
+
+    last_runs - время последних вызовов по именам, его хранит обработчик.
+    """
+    for name, (func, interval) in periodic_registry.items():
+        now = time.monotonic()
+        if name in last_runs and now - last_runs[name] < interval:
+            continue
+        last_runs[name] = now
+        try:
+            func()
+        except Exception:
+            logger.exception('Ошибка в периодической задаче %s', name)
+
+
+def enqueue(name, priority, max_attempts, *args):
+    if settings.TASKS_EAGER:
+        transaction.on_commit(partial(registry[name], *args))
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        priority=priority,
+        max_attempts=max_attempts,
+    )
+
+
+def claim(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True).filter(
+                status=Task.Status.PENDING,
+                run_after__lte=now,
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        Task.objects.filter(id__in=ids).update(
+            status=Task.Status.RUNNING,
+            started=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(Task.objects.filter(id__in=ids))
+
+
+def execute(task_obj):
+    try:
+        registry[task_obj.name](*task_obj.args)
+    except Exception:
+        logger.exception('Ошибка в задаче %s', task_obj)
+        task_obj.error = traceback.format_exc()
+        if task_obj.attempts < task_obj.max_attempts:
+            task_obj.status = Task.Status.PENDING
+            task_obj.run_after = timezone.now() + timedelta(
+                seconds=RETRY_DELAY_SECONDS * 2 ** task_obj.attempts
+            )
+        else:
+            task_obj.status = Task.Status.FAILED
+            task_obj.finished = timezone.now()
+    else:
+        task_obj.status = Task.Status.DONE
+        task_obj.finished = timezone.now()
+    task_obj.save(update_fields=('status', 'run_after', 'finished', 'error'))
+
+
+def run_pending(batch_size):
+    claimed = claim(batch_size)
+    for task_obj in claimed:
+        execute(task_obj)
+    return len(claimed)
+
+
+@periodic(TASK_REQUEUE_INTERVAL)
+def requeue_stale():
+    """Возвращает в очередь задачи, зависшие у упавшего обработчика.
+
+    Захват уже засчитан в attempts, поэтому задачи, исчерпавшие
+    max_attempts, помечаются ошибкой, а не перезапускаются без конца.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.Status.RUNNING,
+        started__lt=now - timedelta(seconds=TASK_TIMEOUT_SECONDS),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.Status.FAILED, finished=now, error=STALE_TASK_ERROR,
+    )
+    return stale.update(status=Task.Status.PENDING, run_after=now)
+
+
+def purge_finished():
+    return Task.objects.filter(
+        status=Task.Status.DONE,
+        finished__lt=timezone.now() - timedelta(days=TASK_RETENTION_DAYS),
+    ).delete()[0]
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def get_metrics():
+    depth = dict(
+        Task.objects.filter(status=Task.Status.PENDING).values_list(
+            'priority'
+        ).annotate(count=Count('id')).order_by('-priority')
+    )
+    statuses = dict(
+        Task.objects.values_list('status').annotate(
+            count=Count('id')
+        ).order_by()
+    )
+    recent = Task.objects.filter(status=Task.Status.DONE).order_by(
+        '-finished'
+    ).values_list('created', 'started', 'finished')[:METRICS_SAMPLE_SIZE]
+    waits = [(started - created).total_seconds()
+             for created, started, _ in recent]
+    runs = [(finished - started).total_seconds()
+            for _, started, finished in recent]
+    return {
+        'depth': sum(depth.values()),
+        'depth_by_priority': depth,
+        'statuses': statuses,
+        'wait_avg': mean(waits) if waits else None,
+        'wait_p95': percentile(waits, 0.95),
+        'run_avg': mean(runs) if runs else None,
+        'run_p95': percentile(runs, 0.95),
+    }
@@ -0,0 +1,131 @@
+import base64
+import io
+from itertools import count
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from PIL import Image
+from recipes.analytics import recipe_views
+from recipes.models import (CoFavoriteRecipe, Favorite, FeedItem, Ingredient,
+                            Recipe, RecipeIngredient, ShoppingCart,
+                            SimilarRecipe, Tag)
+from recipes.shortlinks import clicks
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import Follow
+
+User = get_user_model()
+
+PASSWORD = 'Pass12345!x'
+RECIPES_PER_AUTHOR = 3
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+IMAGE = make_image()
+
+
+class Dataset:
+    """Набор данных вокруг основного пользователя, растущий по grow().
+
+    Каждый шаг роста добавляет тег, ингредиент и автора с рецептами, на
+    которого подписан основной пользователь, с избранным, списком
+    покупок, лентой и списками соседних рецептов. Новые рецепты содержат
+    все теги и ингредиенты набора.
+    """
+
+    def __init__(self):
+        self.numbers = count(1)
+        self.tags = []
+        self.ingredients = []
+        self.add_catalogue()
+        self.user = self.new_user()
+        self.admin = self.new_user(is_staff=True, is_superuser=True)
+        self.recipe = self.new_recipe(self.user)
+        self.authors = []
+
+    def add_catalogue(self):
+        number = next(self.numbers)
+        self.tags.append(
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}')
+        )
+        self.ingredients.append(Ingredient.objects.create(
+            name=f'Ингредиент {number}', measurement_unit='г'
+        ))
+
+    def new_user(self, **fields):
+        number = next(self.numbers)
+        return User.objects.create_user(
+            username=f'user{number}',
+            email=f'user{number}@example.com',
+            password=PASSWORD,
+            first_name=f'Имя {number}',
+            last_name=f'Фамилия {number}',
+            **fields,
+        )
+
+    def new_recipe(self, author=None):
+        recipe = Recipe.objects.create(
+            name=f'Рецепт {next(self.numbers)}',
+            text='Текст',
+            cooking_time=10,
+            image='recipes/images/test.png',
+            author=author or self.new_user(),
+        )
+        recipe.tags.set(self.tags)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=10)
+            for ingredient in self.ingredients
+        )
+        return recipe
+
+    def grow(self, size):
+        now = timezone.now()
+        for _ in range(size):
+            self.add_catalogue()
+            author = self.new_user()
+            self.authors.append(author)
+            recipes = [
+                self.new_recipe(author) for _ in range(RECIPES_PER_AUTHOR)
+            ]
+            Follow.objects.create(user=self.user, author=author)
+            Favorite.objects.create(user=author, recipe=self.recipe)
+            for recipe in recipes[:-1]:
+                Favorite.objects.create(user=self.user, recipe=recipe)
+                ShoppingCart.objects.create(user=self.user, recipe=recipe)
+                CoFavoriteRecipe.objects.create(
+                    recipe=recipe, neighbour=recipes[-1], score=1,
+                    updated_at=now,
+                )
+            for recipe in recipes:
+                FeedItem.objects.create(
+                    user=self.user, recipe=recipe, pub_date=recipe.pub_date
+                )
+                SimilarRecipe.objects.create(
+                    recipe=self.recipe, neighbour=recipe, score=1,
+                    updated_at=now,
+                )
+
+    def client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+
+@pytest.fixture
+def dataset(db, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.COUNTERS_FLUSH_INTERVAL = 60 * 60
+    settings.TASKS_EAGER = False
+    yield Dataset()
+    recipe_views.flush()
+    clicks.flush()
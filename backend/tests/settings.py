@@ -0,0 +1,18 @@
+"""Настройки тестов: вторая база SQLite для реплики с отставанием.
+
+Реплика не входит в REPLICA_DATABASES, поэтому получает схему при
+создании тестовых баз, а чтения на нее идут только в тестах, которые
+сами включают ее в REPLICA_DATABASES.
+"""
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import BASE_DIR, DATABASES
+
+DATABASES = {
+    **DATABASES,
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+    },
+}
+
+REPLICA_DATABASES = []
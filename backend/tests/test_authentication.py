@@ -0,0 +1,54 @@
+"""Отзыв кэшированных токенов действует со следующего запроса."""
+import pytest
+from api.constants import TOKEN_CACHE_KEY
+from django.core.cache import cache
+from foodgram.deletion import bulk_delete
+
+from tests.conftest import PASSWORD
+
+ME_URL = '/api/users/me/'
+
+
+@pytest.fixture
+def client(dataset):
+    cache.clear()
+    client = dataset.client(dataset.user)
+    assert client.get(ME_URL).status_code == 200
+    assert cache.get(TOKEN_CACHE_KEY.format(
+        dataset.user.auth_token.key
+    )) is not None
+    return client
+
+
+def test_logout_revokes_token(client):
+    assert client.post('/api/auth/token/logout/').status_code == 204
+    assert client.get(ME_URL).status_code == 401
+
+
+def test_password_change_revokes_token(client):
+    response = client.post('/api/users/set_password/', {
+        'current_password': PASSWORD, 'new_password': 'New12345!x',
+    })
+    assert response.status_code == 204
+    assert client.get(ME_URL).status_code == 401
+
+
+def test_deactivation_revokes_token(dataset, client):
+    dataset.user.is_active = False
+    dataset.user.save()
+    assert client.get(ME_URL).status_code == 401
+
+
+def test_self_deletion_revokes_token(dataset, client):
+    response = client.delete(
+        f'/api/users/{dataset.user.id}/',
+        {'current_password': PASSWORD},
+        format='json',
+    )
+    assert response.status_code == 204
+    assert client.get(ME_URL).status_code == 401
+
+
+def test_bulk_deletion_revokes_token(dataset, client):
+    bulk_delete(type(dataset.user), [dataset.user.id])
+    assert client.get(ME_URL).status_code == 401
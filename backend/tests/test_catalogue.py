@@ -0,0 +1,75 @@
+"""Согласованность снимка справочника ингредиентов и дельт к нему."""
+import json
+
+import pytest
+from foodgram import payloads
+from recipes.catalogue import assign_all_positions, record_changes
+from recipes.models import Ingredient, IngredientChange
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def client(db):
+    payloads._payloads.clear()
+    return APIClient()
+
+
+def load_snapshot(client):
+    # Позиции изменениям выдает обработчик задач.
+    assign_all_positions()
+    url = client.get('/api/ingredients/catalogue/').data['url']
+    return json.loads(client.get(url).content)
+
+
+def load_ingredients(client):
+    return json.loads(client.get('/api/ingredients/').content)
+
+
+def get_delta(client, version):
+    assign_all_positions()
+    return client.get(
+        '/api/ingredients/catalogue/', {'since_version': version}
+    ).data
+
+
+def test_loader_changes_reach_snapshot(client):
+    Ingredient.objects.create(name='Соль', measurement_unit='г')
+    snapshot = load_snapshot(client)
+    assert len(load_ingredients(client)) == 1
+    # Загрузчик пишет справочник в обход сигналов, как другой процесс.
+    Ingredient.objects.bulk_create(
+        [Ingredient(name='Сахар', measurement_unit='г')]
+    )
+    record_changes(Ingredient.objects.filter(
+        name='Сахар'
+    ).values_list('id', flat=True))
+    fresh = load_snapshot(client)
+    assert fresh['version'] > snapshot['version']
+    assert len(fresh['ingredients']) == 2
+    assert len(load_ingredients(client)) == 2
+
+
+def test_delta_from_snapshot_is_complete(client):
+    Ingredient.objects.create(name='Соль', measurement_unit='г')
+    snapshot = load_snapshot(client)
+    sugar = Ingredient.objects.create(name='Сахар', measurement_unit='г')
+    delta = get_delta(client, snapshot['version'])
+    assert [item['id'] for item in delta['ingredients']] == [sugar.id]
+    assert delta['version'] == load_snapshot(client)['version']
+
+
+def test_late_commit_reaches_delta(client):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=name, measurement_unit='г')
+        for name in ('Соль', 'Сахар', 'Перец')
+    )
+    salt, sugar, pepper = Ingredient.objects.order_by('id')
+    first = IngredientChange.objects.create(ingredient_id=salt.id)
+    # Номер first.id + 1 выдан долгой транзакции загрузчика, а следующее
+    # изменение зафиксировано раньше нее.
+    IngredientChange.objects.create(id=first.id + 2, ingredient_id=pepper.id)
+    version = get_delta(client, 0)['version']
+    IngredientChange.objects.create(id=first.id + 1, ingredient_id=sugar.id)
+    delta = get_delta(client, version)
+    assert [item['id'] for item in delta['ingredients']] == [sugar.id]
+    assert delta['version'] > version
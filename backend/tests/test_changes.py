@@ -0,0 +1,44 @@
+"""Порядок чтения журнала изменений."""
+from recipes.changes import assign_positions, consume
+from recipes.models import ChangeEvent
+
+
+def add_event(**fields):
+    return ChangeEvent.objects.create(
+        topic='recipe', object_id=1, action=ChangeEvent.Action.SAVE,
+        **fields,
+    )
+
+
+def test_late_commit_is_not_skipped(db):
+    seen = []
+    first = add_event()
+    # Номер first.id + 1 выдан долгой транзакции, которая еще не
+    # зафиксирована, а следующая уже успела зафиксироваться.
+    second = add_event(id=first.id + 2)
+    consume('test', seen.extend)
+    late = add_event(id=first.id + 1)
+    consume('test', seen.extend)
+    assert [event['id'] for event in seen] == [first.id, second.id, late.id]
+    positions = [event['position'] for event in seen]
+    assert positions == sorted(positions)
+
+
+def test_changes_api_pages_by_position(db, dataset):
+    ChangeEvent.objects.all().delete()
+    first = add_event()
+    second = add_event(id=first.id + 2)
+    client = dataset.client(dataset.admin)
+    # Позиции выдает обработчик задач.
+    assign_positions()
+    page = client.get('/api/changes/', {'since': 0}).data
+    assert [event['id'] for event in page['results']] == [
+        first.id, second.id
+    ]
+    late = add_event(id=first.id + 1)
+    assert client.get(
+        '/api/changes/', {'since': page['next']}
+    ).data['results'] == []
+    assign_positions()
+    page = client.get('/api/changes/', {'since': page['next']}).data
+    assert [event['id'] for event in page['results']] == [late.id]
@@ -0,0 +1,72 @@
+"""Совместное избранное, посчитанное полосами пользователей и рецептов."""
+import math
+import random
+from collections import defaultdict
+
+import pytest
+from foodgram.deletion import bulk_delete
+from recipes import cooccurrence
+from recipes.constants import EVENT_WEIGHTS
+from recipes.models import CoFavoriteRecipe, Favorite, Recipe, ShoppingCart
+
+USERS = 12
+RECIPES = 8
+USER_CHUNK_SIZE = 5
+CHUNK_SIZE = 3
+
+
+def fill(dataset):
+    generator = random.Random(0)
+    users = [dataset.new_user() for _ in range(USERS)]
+    recipes = [dataset.new_recipe() for _ in range(RECIPES)]
+    for model in (Favorite, ShoppingCart):
+        model.objects.all().delete()
+        model.objects.bulk_create(
+            model(user=user, recipe=recipe)
+            for user in users
+            for recipe in generator.sample(recipes, generator.randint(0, 4))
+        )
+    bulk_delete(Recipe, [recipes[0].id])
+
+
+def expected_scores(with_cart):
+    vectors = defaultdict(lambda: defaultdict(float))
+    for model in (Favorite, ShoppingCart) if with_cart else (Favorite,):
+        weight = EVENT_WEIGHTS[model._meta.model_name]
+        for user_id, recipe_id in model.objects.values_list(
+            'user_id', 'recipe_id'
+        ):
+            vectors[recipe_id][user_id] += weight
+    norms = {
+        recipe_id: math.sqrt(sum(value ** 2 for value in vector.values()))
+        for recipe_id, vector in vectors.items()
+    }
+    scores = {}
+    for recipe_id, vector in vectors.items():
+        for neighbour_id, other in vectors.items():
+            common = sum(
+                value * other.get(user_id, 0)
+                for user_id, value in vector.items()
+            )
+            if neighbour_id != recipe_id and common:
+                scores[recipe_id, neighbour_id] = common / (
+                    norms[recipe_id] * norms[neighbour_id]
+                )
+    return len(vectors), scores
+
+
+@pytest.mark.parametrize('with_cart', (False, True))
+def test_matches_full_matrix(dataset, monkeypatch, with_cart):
+    monkeypatch.setattr(
+        cooccurrence, 'COFAVORITE_USER_CHUNK_SIZE', USER_CHUNK_SIZE
+    )
+    monkeypatch.setattr(cooccurrence, 'COFAVORITE_CHUNK_SIZE', CHUNK_SIZE)
+    fill(dataset)
+    count, scores = expected_scores(with_cart)
+    assert cooccurrence.compute_cofavorites(with_cart) == count
+    saved = {
+        (recipe_id, neighbour_id): score
+        for recipe_id, neighbour_id, score in CoFavoriteRecipe.objects
+        .values_list('recipe_id', 'neighbour_id', 'score')
+    }
+    assert saved == pytest.approx(scores)
@@ -0,0 +1,46 @@
+"""Счетчики с отложенной записью и сохранение рецепта поверх них."""
+import time
+
+from api.serializers import RecipeCreateSerializer
+from foodgram.counters import BufferedCounter
+from recipes.models import Recipe
+from rest_framework.test import APIRequestFactory
+
+from tests.conftest import Dataset
+from tests.test_query_budgets import recipe_payload
+
+FLUSH_INTERVAL = 0.2
+FLUSH_TIMEOUT = 5
+
+
+def test_counter_is_flushed_by_timer(transactional_db, settings):
+    settings.COUNTERS_FLUSH_INTERVAL = FLUSH_INTERVAL
+    recipe = Dataset().recipe
+    counter = BufferedCounter(Recipe, 'views')
+    counter.add(recipe.id)
+    deadline = time.monotonic() + FLUSH_TIMEOUT
+    while time.monotonic() < deadline:
+        recipe.refresh_from_db(fields=('views',))
+        if recipe.views:
+            break
+        time.sleep(FLUSH_INTERVAL / 2)
+    # Запись без новых приращений и без завершения процесса.
+    assert recipe.views == 1
+    assert not counter.pending
+
+
+def test_recipe_update_keeps_views(dataset):
+    stale = Recipe.objects.get(id=dataset.recipe.id)
+    Recipe.objects.filter(id=stale.id).update(views=7, calories=100)
+    request = APIRequestFactory().patch('/')
+    request.user = dataset.user
+    serializer = RecipeCreateSerializer(
+        stale, data=recipe_payload(dataset), context={'request': request}
+    )
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    recipe = Recipe.objects.get(id=stale.id)
+    assert recipe.name == recipe_payload(dataset)['name']
+    assert recipe.views == 7
+    assert recipe.calories == 100
+    assert recipe.modified > stale.pub_date
@@ -0,0 +1,131 @@
+"""Пакетное каскадное удаление удаляет те же строки, что и Collector."""
+from collections import defaultdict
+
+import pytest
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import RestrictedError
+from django.db.models.deletion import Collector
+from foodgram.deletion import bulk_delete
+from recipes.models import (Favorite, FeedItem, Ingredient, Recipe,
+                            RecipeScore, ShoppingCart, ShortLink,
+                            SimilarRecipe)
+from rest_framework.authtoken.models import Token
+from users.models import Follow
+
+from tests.conftest import PASSWORD
+from tests.test_tasks import run_queue
+
+IMAGE_NAME = 'recipes/images/test.png'
+
+
+def get_rows():
+    return {
+        model._meta.label: set(
+            model._base_manager.values_list('pk', flat=True)
+        )
+        for model in apps.get_models(include_auto_created=True)
+        if not model._meta.proxy
+    }
+
+
+def collect(obj):
+    """Строки, которые удалил бы стандартный obj.delete()."""
+    collector = Collector(using=DEFAULT_DB_ALIAS)
+    collector.collect([obj])
+    rows = defaultdict(set)
+    for model, instances in collector.data.items():
+        rows[model._meta.label].update(instance.pk for instance in instances)
+    for queryset in collector.fast_deletes:
+        rows[queryset.model._meta.label].update(
+            queryset.values_list('pk', flat=True)
+        )
+    return {label: pks for label, pks in rows.items() if pks}
+
+
+def get_deleted(before):
+    after = get_rows()
+    return {
+        label: pks - after[label]
+        for label, pks in before.items() if pks - after[label]
+    }
+
+
+@pytest.fixture
+def marked(dataset):
+    """Рецепт основного пользователя со всеми видами зависимых строк."""
+    dataset.grow(2)
+    recipe = dataset.recipe
+    ShoppingCart.objects.create(user=dataset.authors[0], recipe=recipe)
+    Follow.objects.create(user=dataset.authors[0], author=dataset.user)
+    RecipeScore.objects.create(recipe=recipe, popular=1, trending=1)
+    ShortLink.objects.create(recipe=recipe, code='deleted')
+    Token.objects.create(user=dataset.user)
+    run_queue()
+    return recipe
+
+
+def test_recipe_deletion_matches_collector(dataset, marked):
+    expected = collect(marked)
+    before = get_rows()
+    response = dataset.client(dataset.user).delete(
+        f'/api/recipes/{marked.id}/'
+    )
+    assert response.status_code == 204
+    assert get_deleted(before) == expected
+    for model in (Favorite, ShoppingCart, SimilarRecipe, ShortLink):
+        assert not model.objects.filter(recipe=marked).exists()
+    assert not SimilarRecipe.objects.filter(neighbour=marked).exists()
+
+
+def test_user_deletion_matches_collector(dataset, marked):
+    user = dataset.user
+    expected = collect(user)
+    before = get_rows()
+    response = dataset.client(dataset.admin).delete(
+        f'/api/users/{user.id}/', {'current_password': PASSWORD},
+        format='json',
+    )
+    assert response.status_code == 204
+    assert get_deleted(before) == expected
+    assert not Token.objects.filter(user=user).exists()
+    assert not Follow.objects.filter(user=user).exists()
+    assert not Follow.objects.filter(author=user).exists()
+    assert not Recipe.objects.filter(author=user).exists()
+    assert not Favorite.objects.filter(recipe=marked).exists()
+
+
+def test_recipe_deletion_cleans_feed_and_media(dataset, marked):
+    default_storage.save(IMAGE_NAME, ContentFile(b'image'))
+    recipe = dataset.new_recipe(dataset.authors[0])
+    run_queue()
+    assert FeedItem.objects.filter(recipe=recipe).exists()
+    bulk_delete(Recipe, [recipe.id])
+    # Лента и файлы очищаются задачами, поставленными pre_bulk_delete.
+    assert FeedItem.objects.filter(recipe=recipe).exists()
+    assert default_storage.exists(IMAGE_NAME)
+    run_queue()
+    assert not FeedItem.objects.filter(recipe=recipe).exists()
+    assert not default_storage.exists(IMAGE_NAME)
+
+
+def test_restricted_relation_falls_back_to_collector(dataset):
+    ingredient = dataset.ingredients[0]
+    with pytest.raises(RestrictedError):
+        bulk_delete(Ingredient, [ingredient.id])
+    assert Ingredient.objects.filter(id=ingredient.id).exists()
+
+
+def test_set_null_relation_falls_back_to_collector(dataset):
+    ingredient = Ingredient.objects.create(
+        name='Поваренная соль', measurement_unit='г'
+    )
+    alias = Ingredient.objects.create(
+        name='Соль', measurement_unit='г', alias_of=ingredient
+    )
+    bulk_delete(Ingredient, [ingredient.id])
+    assert not Ingredient.objects.filter(id=ingredient.id).exists()
+    alias.refresh_from_db()
+    assert alias.alias_of is None
@@ -0,0 +1,50 @@
+"""Повторная выгрузка таблиц для аналитики."""
+import csv
+import gzip
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+from recipes.models import Favorite, Recipe
+
+
+def export(output):
+    before = set(output.glob('*.csv.gz'))
+    call_command(
+        'export_analytics', '--output', str(output),
+        '--tables', 'recipes', 'favorites', '--database', 'default',
+    )
+    rows = {}
+    for path in set(output.glob('*.csv.gz')) - before:
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            rows[path.name.split('-')[0]] = list(csv.DictReader(file))
+    return rows
+
+
+def test_changed_rows_are_exported_again(dataset, tmp_path):
+    dataset.grow(1)
+    now = timezone.now()
+    Recipe.objects.update(modified=now - timedelta(hours=1))
+    first = export(tmp_path)
+    assert len(first['recipes']) == Recipe.objects.count()
+    assert len(first['favorites']) == Favorite.objects.count()
+
+    changed, fresh = Recipe.objects.order_by('id')[:2]
+    Recipe.objects.filter(id=changed.id).update(
+        name='Новое название', modified=now - timedelta(minutes=30)
+    )
+    # Изменение моложе EXPORT_COMMIT_LAG_SECONDS ждет следующей выгрузки.
+    Recipe.objects.filter(id=fresh.id).update(modified=now)
+    favorite = Favorite.objects.create(user=dataset.admin, recipe=fresh)
+    second = export(tmp_path)
+    assert [
+        (int(row['id']), row['name']) for row in second['recipes']
+    ] == [(changed.id, 'Новое название')]
+    assert [int(row['id']) for row in second['favorites']] == [favorite.id]
+
+    Recipe.objects.filter(id=fresh.id).update(
+        modified=now - timedelta(minutes=10)
+    )
+    assert [
+        int(row['id']) for row in export(tmp_path)['recipes']
+    ] == [fresh.id]
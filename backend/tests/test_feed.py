@@ -0,0 +1,92 @@
+"""Лента подписок: порядок, курсор и рецепты авторов с подтягиванием."""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from recipes import feed
+from recipes.models import FeedItem, Recipe
+from users.models import Follow
+
+from tests.test_tasks import run_queue
+
+PULL_FOLLOWERS_MIN = 2
+PAGE_SIZE = 2
+URL = '/api/recipes/feed/'
+
+
+@pytest.fixture
+def reader(dataset, monkeypatch):
+    """Читатель, подписанный на двух обычных авторов и одного популярного.
+
+    Рецепты популярного автора не раскладываются по лентам, а
+    подтягиваются при чтении. Часть рецептов опубликована одновременно.
+    """
+    monkeypatch.setattr(feed, 'FEED_PULL_FOLLOWERS_MIN', PULL_FOLLOWERS_MIN)
+    reader = dataset.new_user()
+    pushed = [dataset.new_user() for _ in range(2)]
+    pulled = dataset.new_user()
+    for author in (*pushed, pulled):
+        Follow.objects.create(user=reader, author=author)
+    Follow.objects.create(user=dataset.user, author=pulled)
+    now = timezone.now()
+    moments = [now - timedelta(hours=hours) for hours in (1, 2, 2, 3)]
+    for author in (*pushed, pulled):
+        for moment in moments:
+            recipe = dataset.new_recipe(author)
+            Recipe.objects.filter(id=recipe.id).update(pub_date=moment)
+    dataset.new_recipe(dataset.new_user())
+    run_queue()
+    assert not FeedItem.objects.filter(
+        user=reader, recipe__author=pulled
+    ).exists()
+    return reader
+
+
+def expected_ids(reader):
+    return list(Recipe.objects.filter(
+        author__subscriptions_to_author__user=reader
+    ).order_by('-pub_date', '-id').values_list('id', flat=True))
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.data['results']) <= PAGE_SIZE
+        ids.extend(recipe['id'] for recipe in response.data['results'])
+        url = response.data['next']
+    return ids
+
+
+def test_pages_follow_publication_order(dataset, reader):
+    client = dataset.client(reader)
+    ids = walk(client, f'{URL}?limit={PAGE_SIZE}')
+    assert ids == expected_ids(reader)
+    assert len(ids) == len(set(ids)) == 12
+
+
+def test_cursor_survives_new_recipes(dataset, reader):
+    client = dataset.client(reader)
+    expected = expected_ids(reader)
+    response = client.get(f'{URL}?limit={PAGE_SIZE}')
+    first_page = [recipe['id'] for recipe in response.data['results']]
+    # Новые рецепты попадают в начало ленты и не сдвигают курсор.
+    recipe = dataset.new_recipe(Recipe.objects.get(id=expected[0]).author)
+    run_queue()
+    assert first_page + walk(client, response.data['next']) == expected
+    assert walk(client, f'{URL}?limit={PAGE_SIZE}') == [recipe.id, *expected]
+
+
+def test_unfollowed_author_leaves_feed(dataset, reader):
+    author = Recipe.objects.get(id=expected_ids(reader)[0]).author
+    Follow.objects.filter(user=reader, author=author).delete()
+    run_queue()
+    ids = walk(dataset.client(reader), f'{URL}?limit={PAGE_SIZE}')
+    assert ids == expected_ids(reader)
+    assert not Recipe.objects.filter(id__in=ids, author=author).exists()
+
+
+def test_invalid_cursor_is_not_found(dataset, reader):
+    response = dataset.client(reader).get(URL, {'cursor': 'broken'})
+    assert response.status_code == 404
@@ -0,0 +1,78 @@
+"""Догон индекса подбора рецептов по журналу изменений в базе."""
+import numpy as np
+import pytest
+from django.core.cache import cache
+from recipes.changes import assign_all_positions, record_queryset
+from recipes.matching import MatchIndex
+from recipes.models import ChangeEvent, Ingredient, Recipe, RecipeIngredient
+
+
+@pytest.fixture
+def index(dataset):
+    dataset.grow(2)
+    index = MatchIndex()
+    index.refresh()
+    return index
+
+
+def set_ingredients(recipe, ingredients):
+    recipe.ingredient_list.all().delete()
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+        for ingredient in ingredients
+    )
+    record_queryset(
+        RecipeIngredient.objects.filter(recipe=recipe),
+        ChangeEvent.Action.SAVE,
+    )
+
+
+def matched_ids(index, ingredients):
+    # Позиции событиям выдает обработчик задач.
+    assign_all_positions()
+    matches = index.match([ingredient.id for ingredient in ingredients])
+    return {match['id'] for match in matches[:len(matches)]}
+
+
+def assert_same_as_rebuilt(index):
+    assign_all_positions()
+    index.refresh()
+    rebuilt = MatchIndex()
+    rebuilt.refresh()
+    live = np.flatnonzero(index.sizes)
+    assert index.recipe_ids[live].tolist() == rebuilt.recipe_ids.tolist()
+    assert index.sizes[live].tolist() == rebuilt.sizes.tolist()
+    for ingredient_id, positions in rebuilt.postings.items():
+        assert index.recipe_ids[index.postings[ingredient_id]].tolist() == (
+            rebuilt.recipe_ids[positions].tolist()
+        )
+
+
+def test_changes_from_other_processes_are_applied(dataset, index):
+    salt = Ingredient.objects.create(name='Соль', measurement_unit='г')
+    recipe = dataset.new_recipe()
+    set_ingredients(recipe, [salt])
+    # Журнал в базе не зависит от локального кэша процесса.
+    cache.clear()
+    assert matched_ids(index, [salt]) == {recipe.id}
+    set_ingredients(recipe, dataset.ingredients[:1])
+    assert matched_ids(index, [salt]) == set()
+    Recipe.objects.filter(id=recipe.id).delete()
+    assert recipe.id not in matched_ids(index, dataset.ingredients)
+    assert_same_as_rebuilt(index)
+
+
+def test_removal_touches_only_own_ingredients(dataset, index):
+    pepper = Ingredient.objects.create(name='Перец', measurement_unit='г')
+    set_ingredients(dataset.new_recipe(), [pepper])
+    recipe = dataset.new_recipe()
+    set_ingredients(recipe, dataset.ingredients[:2])
+    assign_all_positions()
+    index.refresh()
+    untouched = index.postings[pepper.id]
+    set_ingredients(recipe, dataset.ingredients[:1])
+    assign_all_positions()
+    index.refresh()
+    assert index.postings[pepper.id] is untouched
+    assert recipe.id not in matched_ids(index, dataset.ingredients[1:2])
+    assert_same_as_rebuilt(index)
@@ -0,0 +1,104 @@
+"""Итоговые калорийность, БЖУ и стоимость рецептов."""
+from decimal import Decimal
+
+import pytest
+from recipes.models import Ingredient, Recipe
+from recipes.nutrition import TOTALS
+
+from tests.test_query_budgets import recipe_payload
+from tests.test_tasks import run_queue
+
+VALUES = (
+    {'calories': 2.0, 'proteins': 0.5, 'fats': 0.1, 'carbohydrates': 1.0,
+     'price': Decimal('0.30')},
+    {'calories': 4.0, 'proteins': None, 'fats': 0.2, 'carbohydrates': None,
+     'price': Decimal('1.25')},
+    {'calories': None, 'proteins': None, 'fats': None, 'carbohydrates': None,
+     'price': None},
+)
+
+
+@pytest.fixture
+def ingredients(dataset):
+    ingredients = [
+        Ingredient.objects.create(
+            name=f'Продукт {number}', measurement_unit='г', **values
+        )
+        for number, values in enumerate(VALUES)
+    ]
+    run_queue()
+    return ingredients
+
+
+def expected_totals(amounts):
+    """Итоги по парам (ингредиент, количество), None без значений."""
+    totals = {}
+    for field, (source, _) in TOTALS.items():
+        values = [
+            amount * getattr(ingredient, source)
+            for ingredient, amount in amounts
+            if getattr(ingredient, source) is not None
+        ]
+        totals[field] = sum(values) if values else None
+    return totals
+
+
+def get_totals(recipe_id):
+    return Recipe.objects.values(*TOTALS).get(id=recipe_id)
+
+
+def save_recipe(dataset, amounts, recipe_id=None):
+    payload = {
+        **recipe_payload(dataset),
+        'ingredients': [
+            {'id': ingredient.id, 'amount': amount}
+            for ingredient, amount in amounts
+        ],
+    }
+    client = dataset.client(dataset.user)
+    if recipe_id is None:
+        response = client.post('/api/recipes/', payload, format='json')
+    else:
+        response = client.patch(
+            f'/api/recipes/{recipe_id}/', payload, format='json'
+        )
+    assert response.status_code in (200, 201), response.data
+    run_queue()
+    return response.data['id']
+
+
+def test_totals_follow_recipe_ingredients(dataset, ingredients):
+    first, second, unknown = ingredients
+    amounts = [(first, 10), (second, 3), (unknown, 7)]
+    recipe_id = save_recipe(dataset, amounts)
+    assert get_totals(recipe_id) == pytest.approx(expected_totals(amounts))
+
+    # Количество меняется, один ингредиент убран, другой добавлен.
+    amounts = [(first, 4), (unknown, 2)]
+    save_recipe(dataset, amounts, recipe_id)
+    assert get_totals(recipe_id) == pytest.approx(expected_totals(amounts))
+
+    amounts = [(first, 4), (second, 1)]
+    save_recipe(dataset, amounts, recipe_id)
+    assert get_totals(recipe_id) == pytest.approx(expected_totals(amounts))
+
+
+def test_totals_without_known_values_are_empty(dataset, ingredients):
+    recipe_id = save_recipe(dataset, [(ingredients[-1], 5)])
+    assert set(get_totals(recipe_id).values()) == {None}
+
+
+def test_ingredient_change_updates_recipes(dataset, ingredients):
+    first, second, unknown = ingredients
+    amounts = [(first, 10), (unknown, 3)]
+    recipe_id = save_recipe(dataset, amounts)
+    other_id = save_recipe(dataset, [(second, 2)])
+    other_totals = get_totals(other_id)
+    first.calories = 5.0
+    first.save()
+    unknown.price = Decimal('2.00')
+    unknown.save()
+    assert get_totals(recipe_id) != pytest.approx(expected_totals(amounts))
+    run_queue()
+    assert get_totals(recipe_id) == pytest.approx(expected_totals(amounts))
+    assert get_totals(other_id) == other_totals
@@ -0,0 +1,82 @@
+"""Рейтинги рецептов при событиях в произвольном порядке."""
+from datetime import timedelta
+from itertools import permutations
+
+import pytest
+from django.utils import timezone
+from recipes.models import Favorite, RecipeScore, ShoppingCart
+from recipes.popularity import (SCORE_FIELDS, recompute_scores, remove_events,
+                                update_scores)
+
+from tests.test_tasks import run_queue
+
+KIND = 'favorite'
+
+
+def get_values(recipe):
+    return list(RecipeScore.objects.filter(recipe=recipe).values_list(
+        *SCORE_FIELDS
+    ).get())
+
+
+@pytest.mark.parametrize('order', list(permutations(range(3))))
+def test_events_commute(dataset, order):
+    older = timezone.now() - timedelta(days=2)
+    newer = timezone.now()
+    recipe_id = dataset.recipe.id
+    events = (
+        lambda: update_scores(KIND, [recipe_id], older),
+        lambda: update_scores(KIND, [recipe_id], newer),
+        # Удаление newer может прийти раньше его добавления.
+        lambda: remove_events(KIND, [(recipe_id, newer)]),
+    )
+    for number in order:
+        events[number]()
+    reference = dataset.new_recipe()
+    update_scores(KIND, [reference.id], older)
+    assert get_values(dataset.recipe) == pytest.approx(
+        get_values(reference)
+    )
+
+
+def test_scores_of_deleted_recipe_are_not_created(dataset):
+    recipe = dataset.new_recipe()
+    recipe_id = recipe.id
+    recipe.delete()
+    update_scores(KIND, [recipe_id], timezone.now())
+    remove_events(KIND, [(recipe_id, timezone.now())])
+    assert not RecipeScore.objects.filter(recipe_id=recipe_id).exists()
+
+
+def test_recompute_matches_incremental(dataset):
+    dataset.grow(2)
+    for model in (Favorite, ShoppingCart):
+        for recipe_id, added_at in model.objects.values_list(
+            'recipe_id', 'added_at'
+        ):
+            update_scores(model._meta.model_name, [recipe_id], added_at)
+    incremental = {
+        score.recipe_id: [getattr(score, field) for field in SCORE_FIELDS]
+        for score in RecipeScore.objects.all()
+    }
+    assert recompute_scores() == len(incremental)
+    for score in RecipeScore.objects.all():
+        assert [getattr(score, field) for field in SCORE_FIELDS] == (
+            pytest.approx(incremental.get(
+                score.recipe_id, [None] * len(SCORE_FIELDS)
+            ))
+        )
+
+
+def test_queued_events_are_not_counted_twice(dataset):
+    recipe = dataset.new_recipe()
+    kept = Favorite.objects.create(user=dataset.user, recipe=recipe)
+    Favorite.objects.create(user=dataset.admin, recipe=recipe).delete()
+    # Задачи добавления и удаления ждут в очереди дольше пересчета.
+    recompute_scores()
+    expected = get_values(recipe)
+    run_queue()
+    assert get_values(recipe) == pytest.approx(expected)
+    Favorite.objects.filter(id=kept.id).delete()
+    run_queue()
+    assert get_values(recipe) == [None] * len(SCORE_FIELDS)
@@ -0,0 +1,380 @@
+"""Бюджеты числа запросов к базе для каждого маршрута API.
+
+Каждый запрос выполняется на наборе данных размера SMALL_SIZE и после
+его роста до LARGE_SIZE; пакетные запросы и новые рецепты растут вместе
+с набором. Число запросов не должно зависеть от объема данных и не
+должно превышать бюджет из query_budgets.json.
+
+Чтобы записать текущие значения в файл бюджетов, запустите тесты с
+переменной окружения UPDATE_QUERY_BUDGETS=1.
+"""
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+from api.urls import router_v1
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from djoser.utils import encode_uid
+from foodgram import payloads
+from recipes import catalogue
+from recipes.matching import match_index
+from recipes.models import Favorite, ShoppingCart
+from users.models import Follow
+
+from tests.conftest import IMAGE, PASSWORD
+
+BUDGETS_PATH = Path(__file__).with_name('query_budgets.json')
+UPDATE_BUDGETS = os.getenv('UPDATE_QUERY_BUDGETS') == '1'
+SMALL_SIZE = 2
+LARGE_SIZE = 10
+UNKNOWN_EMAIL = 'unknown@example.com'
+AUTH_ROUTES = (('login', 'post'), ('logout', 'post'))
+
+Request = namedtuple('Request', 'user url data', defaults=(None,))
+Case = namedtuple('Case', 'name method prepare status')
+
+collected = {}
+
+
+def recipe_payload(dataset):
+    return {
+        'name': 'Новый рецепт',
+        'text': 'Текст',
+        'cooking_time': 5,
+        'image': IMAGE,
+        'tags': [tag.id for tag in dataset.tags],
+        'ingredients': [
+            {'id': ingredient.id, 'amount': 5}
+            for ingredient in dataset.ingredients
+        ],
+    }
+
+
+def favorited(dataset, model):
+    recipe = dataset.new_recipe()
+    model.objects.create(user=dataset.user, recipe=recipe)
+    return recipe
+
+
+def followed(dataset):
+    author = dataset.new_user()
+    Follow.objects.create(user=dataset.user, author=author)
+    return author
+
+
+def recipe_ids(recipes):
+    return {'recipes': [recipe.id for recipe in recipes]}
+
+
+def new_recipes(dataset):
+    return [dataset.new_recipe() for _ in dataset.authors]
+
+
+def token_request(dataset, user):
+    return {
+        'uid': encode_uid(user.pk),
+        'token': default_token_generator.make_token(user),
+    }
+
+
+def reset_password_confirm(dataset):
+    user = dataset.new_user()
+    return Request(None, '/api/users/reset_password_confirm/', {
+        **token_request(dataset, user), 'new_password': 'NewPass12345!x',
+    })
+
+
+def reset_email_confirm(dataset):
+    user = dataset.new_user()
+    return Request(None, '/api/users/reset_email_confirm/', {
+        **token_request(dataset, user),
+        'new_email': f'new-{user.email}',
+    })
+
+
+def activation(dataset):
+    user = dataset.new_user(is_active=False)
+    return Request(
+        None, '/api/users/activation/', token_request(dataset, user)
+    )
+
+
+def catalogue_snapshot(dataset):
+    # Версию справочника двигает обработчик задач.
+    catalogue.assign_all_positions()
+    digest = dataset.client().get(
+        '/api/ingredients/catalogue/'
+    ).json()['hash']
+    return Request(None, f'/api/ingredients/catalogue/{digest}/')
+
+
+def update_user(dataset):
+    user = dataset.new_user()
+    return Request(user, f'/api/users/{user.id}/', {
+        'email': user.email,
+        'username': user.username,
+        'first_name': 'Новое',
+        'last_name': 'Имя',
+        'password': PASSWORD,
+    })
+
+
+def new_user_request(dataset, url, data):
+    user = dataset.new_user()
+    return Request(user, url, data(user))
+
+
+CASES = (
+    Case('api-root', 'get', lambda d: Request(d.user, '/api/'), 200),
+    Case('login', 'post', lambda d: Request(None, '/api/auth/token/login/', {
+        'email': d.new_user().email, 'password': PASSWORD,
+    }), 200),
+    Case('logout', 'post', lambda d: Request(
+        d.new_user(), '/api/auth/token/logout/'
+    ), 204),
+    Case('changes-list', 'get', lambda d: Request(
+        d.admin, '/api/changes/', {'since': 0}
+    ), 200),
+    Case('ingredients-list', 'get', lambda d: Request(
+        None, '/api/ingredients/'
+    ), 200),
+    Case('ingredients-list', 'get', lambda d: Request(
+        None, '/api/ingredients/', {'name': 'Ингр'}
+    ), 200),
+    Case('ingredients-detail', 'get', lambda d: Request(
+        None, f'/api/ingredients/{d.ingredients[0].id}/'
+    ), 200),
+    Case('ingredients-catalogue', 'get', lambda d: Request(
+        None, '/api/ingredients/catalogue/'
+    ), 200),
+    Case('ingredients-catalogue', 'get', lambda d: Request(
+        None, '/api/ingredients/catalogue/', {'since_version': 0}
+    ), 200),
+    Case('ingredients-catalogue-snapshot', 'get', catalogue_snapshot, 200),
+    Case('tags-list', 'get', lambda d: Request(None, '/api/tags/'), 200),
+    Case('tags-detail', 'get', lambda d: Request(
+        None, f'/api/tags/{d.tags[0].id}/'
+    ), 200),
+    Case('recipes-list', 'get', lambda d: Request(
+        None, '/api/recipes/'
+    ), 200),
+    Case('recipes-list', 'get', lambda d: Request(
+        d.user, '/api/recipes/'
+    ), 200),
+    Case('recipes-list', 'get', lambda d: Request(
+        d.user, '/api/recipes/', {'is_favorited': 1, 'ordering': 'popular'}
+    ), 200),
+    Case('recipes-list', 'post', lambda d: Request(
+        d.user, '/api/recipes/', recipe_payload(d)
+    ), 201),
+    Case('recipes-detail', 'get', lambda d: Request(
+        d.user, f'/api/recipes/{d.recipe.id}/'
+    ), 200),
+    Case('recipes-detail', 'put', lambda d: Request(
+        d.user, f'/api/recipes/{d.new_recipe(d.user).id}/', recipe_payload(d)
+    ), 200),
+    Case('recipes-detail', 'patch', lambda d: Request(
+        d.user, f'/api/recipes/{d.new_recipe(d.user).id}/', recipe_payload(d)
+    ), 200),
+    Case('recipes-detail', 'delete', lambda d: Request(
+        d.user, f'/api/recipes/{d.new_recipe(d.user).id}/'
+    ), 204),
+    Case('recipes-get-link', 'get', lambda d: Request(
+        None, f'/api/recipes/{d.new_recipe().id}/get-link/'
+    ), 200),
+    Case('recipes-similar', 'get', lambda d: Request(
+        None, f'/api/recipes/{d.recipe.id}/similar/'
+    ), 200),
+    Case('recipes-recommended', 'get', lambda d: Request(
+        d.user, '/api/recipes/recommended/'
+    ), 200),
+    Case('recipes-feed', 'get', lambda d: Request(
+        d.user, '/api/recipes/feed/'
+    ), 200),
+    Case('recipes-match', 'get', lambda d: Request(
+        None, '/api/recipes/match/',
+        {'ingredients': [ingredient.id for ingredient in d.ingredients]},
+    ), 200),
+    Case('recipes-download_shopping_cart', 'get', lambda d: Request(
+        d.user, '/api/recipes/download_shopping_cart/'
+    ), 200),
+    Case('recipes-favorite', 'post', lambda d: Request(
+        d.user, f'/api/recipes/{d.new_recipe().id}/favorite/'
+    ), 201),
+    Case('recipes-favorite', 'delete', lambda d: Request(
+        d.user, f'/api/recipes/{favorited(d, Favorite).id}/favorite/'
+    ), 204),
+    Case('recipes-shopping_cart', 'post', lambda d: Request(
+        d.user, f'/api/recipes/{d.new_recipe().id}/shopping_cart/'
+    ), 201),
+    Case('recipes-shopping_cart', 'delete', lambda d: Request(
+        d.user, f'/api/recipes/{favorited(d, ShoppingCart).id}/shopping_cart/'
+    ), 204),
+    Case('recipes-favorite-batch', 'post', lambda d: Request(
+        d.user, '/api/recipes/favorite/', recipe_ids(new_recipes(d))
+    ), 201),
+    Case('recipes-favorite-batch', 'delete', lambda d: Request(
+        d.user, '/api/recipes/favorite/', recipe_ids(
+            favorited(d, Favorite) for _ in d.authors
+        )
+    ), 204),
+    Case('recipes-shopping_cart-batch', 'post', lambda d: Request(
+        d.user, '/api/recipes/shopping_cart/', recipe_ids(new_recipes(d))
+    ), 201),
+    Case('recipes-shopping_cart-batch', 'delete', lambda d: Request(
+        d.user, '/api/recipes/shopping_cart/', recipe_ids(
+            favorited(d, ShoppingCart) for _ in d.authors
+        )
+    ), 204),
+    Case('users-list', 'get', lambda d: Request(None, '/api/users/'), 200),
+    Case('users-list', 'get', lambda d: Request(d.user, '/api/users/'), 200),
+    Case('users-list', 'post', lambda d: Request(None, '/api/users/', {
+        'email': f'new{len(d.authors)}@example.com',
+        'username': f'new{len(d.authors)}',
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'password': PASSWORD,
+    }), 201),
+    Case('users-detail', 'get', lambda d: Request(
+        d.user, f'/api/users/{d.authors[0].id}/'
+    ), 200),
+    Case('users-detail', 'put', update_user, 200),
+    Case('users-detail', 'patch', lambda d: Request(
+        d.user, f'/api/users/{d.user.id}/', {'first_name': 'Новое'}
+    ), 200),
+    Case('users-detail', 'delete', lambda d: Request(
+        d.admin, f'/api/users/{d.new_recipe().author_id}/',
+        {'current_password': PASSWORD},
+    ), 204),
+    Case('users-me', 'get', lambda d: Request(d.user, '/api/users/me/'), 200),
+    Case('users-avatar', 'put', lambda d: Request(
+        d.user, '/api/users/me/avatar/', {'avatar': IMAGE}
+    ), 200),
+    Case('users-avatar', 'delete', lambda d: Request(
+        d.user, '/api/users/me/avatar/'
+    ), 204),
+    Case('users-subscriptions', 'get', lambda d: Request(
+        d.user, '/api/users/subscriptions/'
+    ), 200),
+    Case('users-subscriptions-status', 'get', lambda d: Request(
+        d.user, '/api/users/subscriptions/status/',
+        {'authors': ','.join(str(author.id) for author in d.authors)},
+    ), 200),
+    Case('users-subscribe', 'post', lambda d: Request(
+        d.user, f'/api/users/{d.new_user().id}/subscribe/'
+    ), 201),
+    Case('users-subscribe', 'delete', lambda d: Request(
+        d.user, f'/api/users/{followed(d).id}/subscribe/'
+    ), 204),
+    Case('users-subscribe-batch', 'post', lambda d: Request(
+        d.user, '/api/users/subscribe/',
+        {'authors': [d.new_user().id for _ in d.authors]},
+    ), 201),
+    Case('users-subscribe-batch', 'delete', lambda d: Request(
+        d.user, '/api/users/subscribe/',
+        {'authors': [followed(d).id for _ in d.authors]},
+    ), 204),
+    Case('users-set-password', 'post', lambda d: new_user_request(
+        d, '/api/users/set_password/', lambda user: {
+            'current_password': PASSWORD, 'new_password': 'NewPass12345!x',
+        }
+    ), 204),
+    Case('users-set-username', 'post', lambda d: new_user_request(
+        d, '/api/users/set_email/', lambda user: {
+            'current_password': PASSWORD, 'new_email': f'new-{user.email}',
+        }
+    ), 204),
+    Case('users-reset-password', 'post', lambda d: Request(
+        None, '/api/users/reset_password/', {'email': UNKNOWN_EMAIL}
+    ), 204),
+    Case('users-reset-password-confirm', 'post', reset_password_confirm, 204),
+    Case('users-reset-username', 'post', lambda d: Request(
+        None, '/api/users/reset_email/', {'email': UNKNOWN_EMAIL}
+    ), 204),
+    Case('users-reset-username-confirm', 'post', reset_email_confirm, 204),
+    Case('users-activation', 'post', activation, 204),
+    Case('users-resend-activation', 'post', lambda d: Request(
+        None, '/api/users/resend_activation/', {'email': d.user.email}
+    ), 400),
+)
+
+
+def get_key(case):
+    return f'{case.name} {case.method.upper()}'
+
+
+def get_case_id(case):
+    return f'{get_key(case)} #{CASES.index(case)}'
+
+
+def load_budgets():
+    if not BUDGETS_PATH.exists():
+        return {}
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def measure(dataset, case):
+    request = case.prepare(dataset)
+    client = dataset.client(request.user)
+    cache.clear()
+    payloads._payloads.clear()
+    match_index.position = None
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, case.method)(
+            request.url, request.data,
+            **({} if case.method == 'get' else {'format': 'json'}),
+        )
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code == case.status, getattr(
+        response, 'data', response
+    )
+    return len(context.captured_queries)
+
+
+@pytest.fixture(scope='module')
+def budgets():
+    budgets = load_budgets()
+    yield budgets
+    if UPDATE_BUDGETS:
+        BUDGETS_PATH.write_text(
+            json.dumps(dict(sorted(collected.items())), indent=2,
+                       ensure_ascii=False) + '\n'
+        )
+
+
+@pytest.mark.parametrize('case', CASES, ids=get_case_id)
+def test_query_count_is_constant(dataset, budgets, case):
+    dataset.grow(SMALL_SIZE)
+    small = measure(dataset, case)
+    dataset.grow(LARGE_SIZE - SMALL_SIZE)
+    large = measure(dataset, case)
+    assert large == small, (
+        f'{get_key(case)}: {small} запросов на малом наборе данных '
+        f'и {large} на большом'
+    )
+    key = get_key(case)
+    collected[key] = max(small, collected.get(key, 0))
+    if not UPDATE_BUDGETS:
+        assert key in budgets, f'Нет бюджета для {key}'
+        assert small <= budgets[key], (
+            f'{key}: {small} запросов при бюджете {budgets[key]}'
+        )
+
+
+def test_every_route_has_case():
+    routes = {
+        f'{pattern.name} {method.upper()}'
+        for pattern in router_v1.urls
+        if pattern.name != 'api-root'
+        for method in pattern.callback.actions
+        if method != 'head'
+    }
+    routes.update(f'{name} {method.upper()}' for name, method in AUTH_ROUTES)
+    routes.add('api-root GET')
+    assert routes <= {get_key(case) for case in CASES}
@@ -0,0 +1,127 @@
+"""Чтение с реплики, отстающей от основной базы.
+
+Реплика - отдельная база, в которую данные попадают только при вызове
+replicate(), так что все, что записано после него, на реплике еще не
+видно.
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from foodgram import db_routers
+from foodgram.db_routers import _replica
+from recipes.changes import assign_all_positions, assign_positions
+from recipes.models import ChangeEvent, Favorite, Ingredient, Recipe, Tag
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from tests.conftest import PASSWORD
+
+REPLICA = 'replica'
+REPLICATED_MODELS = (
+    get_user_model(),
+    Token,
+    Tag,
+    Ingredient,
+    Recipe,
+    Recipe.tags.through,
+    Recipe.ingredients.through,
+    Favorite,
+    ChangeEvent,
+)
+
+pytestmark = pytest.mark.django_db(databases=('default', REPLICA))
+
+
+def replicate():
+    for model in reversed(REPLICATED_MODELS):
+        model.objects.using(REPLICA).all().delete()
+    for model in REPLICATED_MODELS:
+        model.objects.using(REPLICA).bulk_create(model.objects.all())
+
+
+@pytest.fixture(autouse=True)
+def replica(dataset, settings):
+    settings.REPLICA_DATABASES = [REPLICA]
+    cache.clear()
+    replicate()
+
+
+def get_recipe_ids(client):
+    return sorted(
+        recipe['id'] for recipe in client.get('/api/recipes/').data['results']
+    )
+
+
+def test_reads_go_to_lagging_replica(dataset):
+    client = APIClient()
+    recipe = dataset.new_recipe()
+    assert get_recipe_ids(client) == [dataset.recipe.id]
+    replicate()
+    assert get_recipe_ids(client) == [dataset.recipe.id, recipe.id]
+
+
+def test_replica_is_chosen_once_per_request(dataset, settings,
+                                            monkeypatch):
+    settings.REPLICA_DATABASES = [REPLICA, 'default']
+    chosen, reads = [], []
+    route = db_routers.PrimaryReplicaRouter.db_for_read
+
+    def choice(replicas):
+        chosen.append(replicas[0])
+        return replicas[0]
+
+    def db_for_read(self, model, **hints):
+        reads.append(route(self, model, **hints))
+        return reads[-1]
+
+    monkeypatch.setattr(db_routers.random, 'choice', choice)
+    monkeypatch.setattr(
+        db_routers.PrimaryReplicaRouter, 'db_for_read', db_for_read
+    )
+    assert APIClient().get('/api/recipes/').status_code == 200
+    assert chosen == [REPLICA]
+    assert len(reads) > 1
+    assert set(reads) == {REPLICA}
+
+
+def test_token_from_fresh_login_is_accepted(dataset):
+    client = APIClient()
+    response = client.post('/api/auth/token/login/', {
+        'email': dataset.user.email, 'password': PASSWORD,
+    })
+    assert response.status_code == 200
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {response.data["auth_token"]}'
+    )
+    response = client.get('/api/users/me/')
+    assert response.status_code == 200
+    assert response.data['id'] == dataset.user.id
+
+
+def test_own_writes_are_read_from_primary(dataset):
+    client = dataset.client(dataset.user)
+    replicate()
+    url = f'/api/recipes/{dataset.recipe.id}/'
+    response = client.post(f'{url}favorite/')
+    assert response.status_code == 201
+    assert client.get(url).data['is_favorited'] is True
+    cache.clear()
+    assert client.get(url).data['is_favorited'] is False
+
+
+def test_positions_are_assigned_on_primary(dataset):
+    dataset.new_recipe()
+    replicate()
+    assign_all_positions()
+    # На реплике события еще без позиций.
+    assert ChangeEvent.objects.using(REPLICA).filter(
+        position__isnull=True
+    ).exists()
+    token = _replica.set(REPLICA)
+    try:
+        assert assign_positions() == 0
+    finally:
+        _replica.reset(token)
+    positions = list(ChangeEvent.objects.values_list('position', flat=True))
+    assert None not in positions
+    assert len(set(positions)) == len(positions)
@@ -0,0 +1,161 @@
+"""Быстрые списки совпадают с выводом сериализаторов и JSONRenderer.
+
+Замер скорости включается переменной окружения ROWS_BENCHMARK с числом
+повторов, например:
+
+    ROWS_BENCHMARK=50 pytest tests/test_rows.py -s
+"""
+import datetime
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from api.renderers import FastJSONRenderer
+from api.rows import get_recipe_values, recipe_rows, simple_rows
+from api.serializers import (IngredientSerializer, RecipeSerializer,
+                             TagSerializer, get_requested_fields)
+from api.views import RecipeViewSet
+from recipes.models import Ingredient, Recipe, Tag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+BENCHMARK_REPEATS = int(os.getenv('ROWS_BENCHMARK', 0))
+PAGE_LIMIT = 100
+RECIPE_FIELDS = (None, 'id,name,tags', 'author,is_favorited,ingredients')
+RENDERED_VALUES = (
+    0.1, 1e-7, 1e16, 1.5e300, 2.0, -0.0, 123456789.123,
+    Decimal('1.10'), Decimal('1E+2'), 2 ** 64,
+    datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+    datetime.date(2020, 1, 1),
+    'Строка "в кавычках" \\    \U0001f600',
+    {1: 'ключ-число'}, [None, True, False],
+)
+
+
+@pytest.fixture
+def catalogue(dataset):
+    dataset.grow(3)
+    # Тег, созданный последним, идет первым по алфавиту.
+    tag = Tag.objects.create(name='Аа', slug='aa')
+    for recipe in Recipe.objects.all():
+        recipe.tags.add(tag)
+    Recipe.objects.filter(id=dataset.recipe.id).update(
+        text='Текст "в кавычках"\n\\   \U0001f600'
+    )
+    return dataset
+
+
+def get_request(user, params):
+    request = APIRequestFactory().get('/api/recipes/', params)
+    if user is not None:
+        force_authenticate(request, user)
+    view = RecipeViewSet(
+        action='list', action_map={'get': 'list'}, format_kwarg=None,
+        args=(), kwargs={},
+    )
+    view.request = view.initialize_request(request)
+    view.headers = {}
+    return view
+
+
+def render_serializer(view):
+    queryset = view.filter_queryset(view.get_queryset())
+    page = view.paginate_queryset(queryset)
+    data = RecipeSerializer(
+        page, many=True, context=view.get_serializer_context()
+    ).data
+    return JSONRenderer().render(view.get_paginated_response(data).data)
+
+
+def render_rows(view):
+    fields = (
+        get_requested_fields(view.request)
+        or set(RecipeSerializer.Meta.fields)
+    )
+    page = view.paginate_queryset(get_recipe_values(
+        view.filter_queryset(view.get_queryset()), fields
+    ))
+    return FastJSONRenderer().render(
+        view.get_paginated_response(recipe_rows(page, view.request, fields))
+        .data
+    )
+
+
+@pytest.mark.parametrize('value', RENDERED_VALUES, ids=repr)
+def test_renderer_matches_json_renderer(value):
+    data = {'value': value, 'items': [value, {'nested': value}]}
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('fields', RECIPE_FIELDS)
+@pytest.mark.parametrize('authenticated', (False, True))
+def test_recipe_rows_match_serializer(catalogue, fields, authenticated):
+    params = {'limit': PAGE_LIMIT}
+    if fields is not None:
+        params['fields'] = fields
+    user = catalogue.user if authenticated else None
+    expected = render_serializer(get_request(user, params))
+    assert render_rows(get_request(user, params)) == expected
+
+
+def test_recipe_list_endpoint_matches_serializer(catalogue):
+    client = catalogue.client(catalogue.user)
+    response = client.get('/api/recipes/', {'limit': PAGE_LIMIT})
+    view = get_request(catalogue.user, {'limit': PAGE_LIMIT})
+    assert response.content == render_serializer(view)
+
+
+@pytest.mark.parametrize('model,serializer_class', (
+    (Ingredient, IngredientSerializer),
+    (Tag, TagSerializer),
+))
+def test_simple_rows_match_serializer(catalogue, model, serializer_class):
+    queryset = model.objects.all()
+    assert FastJSONRenderer().render(
+        simple_rows(queryset, serializer_class)
+    ) == JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def measure(build, *args):
+    started = time.perf_counter()
+    for _ in range(BENCHMARK_REPEATS):
+        build(*args)
+    return (time.perf_counter() - started) / BENCHMARK_REPEATS * 1000
+
+
+def render_simple_serializer(model, serializer_class):
+    return JSONRenderer().render(
+        serializer_class(model.objects.all(), many=True).data
+    )
+
+
+def render_simple_rows(model, serializer_class):
+    return FastJSONRenderer().render(
+        simple_rows(model.objects.all(), serializer_class)
+    )
+
+
+@pytest.mark.skipif(not BENCHMARK_REPEATS, reason='задайте ROWS_BENCHMARK')
+def test_benchmark(dataset):
+    dataset.grow(PAGE_LIMIT // 3 + 1)
+    params = {'limit': PAGE_LIMIT}
+    cases = [(
+        'recipes',
+        lambda: render_serializer(get_request(dataset.user, params)),
+        lambda: render_rows(get_request(dataset.user, params)),
+        (),
+    )] + [
+        (model._meta.model_name, render_simple_serializer,
+         render_simple_rows, (model, serializer_class))
+        for model, serializer_class in (
+            (Ingredient, IngredientSerializer), (Tag, TagSerializer)
+        )
+    ]
+    print()
+    for name, slow, fast, args in cases:
+        print(
+            f'{name}: сериализатор + JSONRenderer '
+            f'{measure(slow, *args):.2f} мс, values() + FastJSONRenderer '
+            f'{measure(fast, *args):.2f} мс'
+        )
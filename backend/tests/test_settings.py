@@ -0,0 +1,34 @@
+"""Настройки кэша для разных CACHE_BACKEND."""
+import runpy
+
+import pytest
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+MEMCACHED = 'django.core.cache.backends.memcached.PyMemcacheCache'
+
+
+def build_cache(monkeypatch, backend, location):
+    monkeypatch.setenv('CACHE_BACKEND', backend)
+    monkeypatch.setenv('CACHE_LOCATION', location)
+    config = runpy.run_module('foodgram.settings')['CACHES']['default']
+    return import_string(config['BACKEND'])(
+        config['LOCATION'], {
+            key: value for key, value in config.items()
+            if key not in ('BACKEND', 'LOCATION')
+        }
+    )
+
+
+def test_memcached_client_is_built(monkeypatch):
+    pytest.importorskip('pymemcache')
+    cache = build_cache(monkeypatch, MEMCACHED, 'memcached:11211')
+    # Клиент создается без подключения, OPTIONS идут в его конструктор.
+    assert cache._cache is not None
+
+
+def test_locmem_keeps_max_entries(monkeypatch):
+    cache = build_cache(
+        monkeypatch, 'django.core.cache.backends.locmem.LocMemCache', ''
+    )
+    assert cache._max_entries == caches['default']._max_entries
@@ -0,0 +1,96 @@
+"""Список покупок с переводом единиц и объединением ингредиентов."""
+import pytest
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, UnitConversion)
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+@pytest.fixture
+def catalogue(db):
+    # Переводы кг и ст. л. добавляет миграция.
+    assert UnitConversion.objects.filter(
+        unit__in=('кг', 'ст. л.')
+    ).count() == 2
+    assert not UnitConversion.objects.filter(unit='щепотка').exists()
+    flour = Ingredient.objects.create(name='Мука', measurement_unit='кг')
+    return {
+        'flour': flour,
+        'wheat': Ingredient.objects.create(
+            name='Пшеничная мука', measurement_unit='г', alias_of=flour
+        ),
+        'oil': Ingredient.objects.create(
+            name='Масло', measurement_unit='ст. л.'
+        ),
+        'salt': Ingredient.objects.create(
+            name='Соль', measurement_unit='щепотка'
+        ),
+    }
+
+
+def make_recipe(dataset, amounts):
+    recipe = Recipe.objects.create(
+        name='Рецепт', text='Текст', cooking_time=10,
+        image='recipes/images/test.png', author=dataset.user,
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=amount)
+        for ingredient, amount in amounts
+    )
+    return recipe
+
+
+def download(dataset, user):
+    response = dataset.client(user).get(URL)
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode().splitlines()
+
+
+def test_units_are_converted_and_aliases_merged(dataset, catalogue):
+    ShoppingCart.objects.all().delete()
+    first = make_recipe(dataset, [
+        (catalogue['flour'], 2), (catalogue['oil'], 3),
+        (catalogue['salt'], 1),
+    ])
+    second = make_recipe(dataset, [
+        (catalogue['wheat'], 300), (catalogue['salt'], 2),
+    ])
+    for recipe in (first, second):
+        ShoppingCart.objects.create(user=dataset.user, recipe=recipe)
+    ShoppingCart.objects.create(
+        user=dataset.admin,
+        recipe=make_recipe(dataset, [(catalogue['oil'], 100)]),
+    )
+    assert download(dataset, dataset.user) == [
+        'Список покупок',
+        'Масло - 45 (мл)',
+        'Мука - 2300 (г)',
+        # Без перевода единица остается своей, а множитель равен 1.
+        'Соль - 3 (щепотка)',
+    ]
+    assert download(dataset, dataset.admin) == [
+        'Список покупок',
+        'Масло - 1500 (мл)',
+    ]
+
+
+def test_alias_without_conversion_keeps_own_unit(dataset, catalogue):
+    ShoppingCart.objects.all().delete()
+    shallot = Ingredient.objects.create(
+        name='Шалот', measurement_unit='шт.',
+        alias_of=Ingredient.objects.create(
+            name='Лук', measurement_unit='кг'
+        ),
+    )
+    ShoppingCart.objects.create(
+        user=dataset.user, recipe=make_recipe(dataset, [(shallot, 4)])
+    )
+    assert download(dataset, dataset.user) == [
+        'Список покупок',
+        'Лук - 4 (шт.)',
+    ]
+
+
+def test_empty_cart(dataset):
+    ShoppingCart.objects.filter(user=dataset.user).delete()
+    assert download(dataset, dataset.user) == ['Список покупок']
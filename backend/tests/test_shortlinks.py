@@ -0,0 +1,25 @@
+"""Переходы по коротким и старым ссылкам."""
+from django.test import Client
+from recipes.models import ShortLink
+from recipes.shortlinks import clicks, get_code, links
+
+
+def test_legacy_link_clicks_are_counted(dataset):
+    recipe = dataset.recipe
+    links.entries.clear()
+    assert not ShortLink.objects.filter(recipe=recipe).exists()
+    client = Client()
+    for _ in range(2):
+        response = client.get(f'/s/{recipe.id}/')
+        assert response.status_code == 302
+        assert response['Location'] == f'/recipes/{recipe.id}/'
+    clicks.flush()
+    link = ShortLink.objects.get(recipe=recipe)
+    assert link.clicks == 2
+    assert link.code == get_code(recipe.id)
+
+
+def test_unknown_legacy_link_is_not_found(dataset):
+    links.entries.clear()
+    assert Client().get('/s/999999/').status_code == 404
+    assert not ShortLink.objects.exists()
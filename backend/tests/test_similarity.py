@@ -0,0 +1,130 @@
+"""Похожие рецепты по взвешенному коэффициенту Жаккара."""
+import pytest
+from recipes import similarity
+from recipes.constants import SIMILAR_TAG_WEIGHT
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from rest_framework.test import APIClient
+
+TOP_K = 4
+PAGE_SIZE = 3
+# Наборы (ингредиенты, теги) рецептов, среди них есть равные оценки.
+FEATURES = (
+    ((0, 1, 2), (0,)),
+    ((0, 1, 2), (0,)),
+    ((0, 1), (0,)),
+    ((0, 1), (1,)),
+    ((2, 3), (0, 1)),
+    ((3, 4), (1,)),
+    ((5,), ()),
+    ((0, 1, 2, 3), (0,)),
+)
+
+
+@pytest.fixture
+def recipes(dataset, monkeypatch):
+    monkeypatch.setattr(similarity, 'SIMILAR_TOP_K', TOP_K)
+    ingredients = [
+        Ingredient.objects.create(name=f'Продукт {number}',
+                                  measurement_unit='г')
+        for number in range(6)
+    ]
+    tags = [
+        Tag.objects.create(name=f'Метка {number}', slug=f'label-{number}')
+        for number in range(2)
+    ]
+    recipes = []
+    for ingredient_numbers, tag_numbers in FEATURES:
+        recipe = Recipe.objects.create(
+            name='Рецепт', text='Текст', cooking_time=10,
+            image='recipes/images/test.png', author=dataset.user,
+        )
+        recipe.tags.set([tags[number] for number in tag_numbers])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredients[number], amount=1
+            )
+            for number in ingredient_numbers
+        )
+        recipes.append(recipe)
+    similarity.compute_similar(full=True)
+    return recipes
+
+
+def get_features(recipe):
+    return {
+        **{('ingredient', ingredient_id): 1.0 for ingredient_id in (
+            recipe.ingredient_list.values_list('ingredient_id', flat=True)
+        )},
+        **{('tag', tag_id): SIMILAR_TAG_WEIGHT for tag_id in (
+            recipe.tags.values_list('id', flat=True)
+        )},
+    }
+
+
+def expected_neighbours(recipe):
+    """Лучшие TOP_K соседей полным перебором, при равенстве - меньший id."""
+    features = get_features(recipe)
+    scores = []
+    for other in Recipe.objects.exclude(id=recipe.id):
+        other_features = get_features(other)
+        keys = features.keys() | other_features.keys()
+        common = sum(
+            min(features.get(key, 0), other_features.get(key, 0))
+            for key in keys
+        )
+        if common:
+            scores.append((-common / sum(
+                max(features.get(key, 0), other_features.get(key, 0))
+                for key in keys
+            ), other.id))
+    return [(recipe_id, -score) for score, recipe_id in sorted(scores)][
+        :TOP_K
+    ]
+
+
+def load_pages(recipe):
+    client = APIClient()
+    url = f'/api/recipes/{recipe.id}/similar/?limit={PAGE_SIZE}'
+    items = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        items.extend(response.data['results'])
+        url = response.data['next']
+    return items
+
+
+def test_neighbours_match_brute_force(recipes):
+    for recipe in recipes:
+        items = load_pages(recipe)
+        expected = expected_neighbours(recipe)
+        assert [item['id'] for item in items] == [
+            recipe_id for recipe_id, _ in expected
+        ]
+        assert [item['similarity'] for item in items] == pytest.approx(
+            [score for _, score in expected]
+        )
+        assert all('name' in item for item in items)
+
+
+def test_recipe_without_common_features_has_no_neighbours(recipes):
+    assert load_pages(recipes[6]) == []
+
+
+def test_incremental_update_matches_full(recipes):
+    changed = recipes[5]
+    RecipeIngredient.objects.filter(recipe=changed).delete()
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=changed, ingredient=ingredient, amount=1)
+        for ingredient in recipes[0].ingredients.all()
+    )
+    changed.save()
+    similarity.compute_similar()
+    for recipe in recipes:
+        assert [item['id'] for item in load_pages(recipe)] == [
+            recipe_id for recipe_id, _ in expected_neighbours(recipe)
+        ]
+
+
+def test_unknown_recipe_is_not_found(db):
+    assert APIClient().get('/api/recipes/999999/similar/').status_code == 404
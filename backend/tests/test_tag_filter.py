@@ -0,0 +1,138 @@
+"""Фильтр рецептов по тегам.
+
+Замер на большом наборе данных включается переменной окружения
+TAG_FILTER_BENCHMARK с числом рецептов, например:
+
+    TAG_FILTER_BENCHMARK=1000000 pytest tests/test_tag_filter.py -s
+"""
+import os
+import random
+import time
+from itertools import islice
+
+import pytest
+from api.filters import RecipeFilter
+from django.contrib.auth import get_user_model
+from recipes.models import Recipe, Tag
+from rest_framework.test import APIClient
+
+TAGS_COUNT = 20
+MAX_RECIPE_TAGS = 4
+BATCH_SIZE = 10000
+SEMANTICS_SIZE = 300
+BENCHMARK_SIZE = int(os.getenv('TAG_FILTER_BENCHMARK', 0))
+PAGE_SIZE = 6
+QUERIES = (
+    ('any', ('tag-0',)),
+    ('any', ('tag-1', 'tag-2', 'tag-3')),
+    ('all', ('tag-1', 'tag-2')),
+    ('all', ('tag-4', 'tag-5', 'tag-6')),
+)
+
+
+def make_recipes(size, seed=0):
+    """size рецептов со случайными наборами из 1..MAX_RECIPE_TAGS тегов."""
+    generator = random.Random(seed)
+    Tag.objects.bulk_create(
+        Tag(name=f'Тег {number}', slug=f'tag-{number}')
+        for number in range(TAGS_COUNT)
+    )
+    tag_ids = list(Tag.objects.values_list('id', flat=True))
+    author = get_user_model().objects.create_user(
+        username='author', email='author@example.com', password='-'
+    )
+    Through = Recipe.tags.through
+    recipes = (
+        Recipe(
+            name=f'Рецепт {number}', text='Текст', cooking_time=10,
+            image='recipes/images/test.png', author=author,
+        )
+        for number in range(size)
+    )
+    while True:
+        batch = Recipe.objects.bulk_create(islice(recipes, BATCH_SIZE))
+        if not batch:
+            return
+        recipe_ids = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True
+        )[:len(batch)]
+        Through.objects.bulk_create(
+            Through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in generator.sample(
+                tag_ids, generator.randint(1, MAX_RECIPE_TAGS)
+            )
+        )
+
+
+def filter_exists(match, slugs):
+    return RecipeFilter(
+        data={'tags': slugs, 'tags_match': match},
+        queryset=Recipe.objects.order_by('-id'),
+    ).qs
+
+
+def filter_join(match, slugs):
+    """Прежний вариант: JOIN с recipe_tags и DISTINCT."""
+    queryset = Recipe.objects.order_by('-id')
+    if match == 'all':
+        for slug in slugs:
+            queryset = queryset.filter(tags__slug=slug)
+    else:
+        queryset = queryset.filter(tags__slug__in=slugs)
+    return queryset.distinct()
+
+
+def expected_ids(match, slugs):
+    test = all if match == 'all' else any
+    recipe_tags = {}
+    for recipe_id, slug in Recipe.tags.through.objects.values_list(
+        'recipe_id', 'tag__slug'
+    ):
+        recipe_tags.setdefault(recipe_id, set()).add(slug)
+    return sorted(
+        (recipe_id for recipe_id, tags in recipe_tags.items()
+         if test(slug in tags for slug in slugs)),
+        reverse=True,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('match,slugs', QUERIES)
+def test_filter_matches_reference(match, slugs):
+    make_recipes(SEMANTICS_SIZE)
+    ids = list(filter_exists(match, slugs).values_list('id', flat=True))
+    assert ids == expected_ids(match, slugs)
+
+
+@pytest.mark.django_db
+def test_unknown_tag_is_rejected():
+    make_recipes(1)
+    response = APIClient().get('/api/recipes/', {'tags': ['tag-0', 'nope']})
+    assert response.status_code == 400
+    assert 'tags' in response.data
+
+
+def measure(queryset):
+    started = time.perf_counter()
+    count = queryset.count()
+    page = list(queryset.values_list('id', flat=True)[:PAGE_SIZE])
+    return time.perf_counter() - started, count, page
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not BENCHMARK_SIZE, reason='задайте TAG_FILTER_BENCHMARK'
+)
+def test_benchmark():
+    make_recipes(BENCHMARK_SIZE)
+    print(f'\n{BENCHMARK_SIZE} рецептов x {TAGS_COUNT} тегов')
+    for match, slugs in QUERIES:
+        exists_time, *exists_result = measure(filter_exists(match, slugs))
+        join_time, *join_result = measure(filter_join(match, slugs))
+        assert exists_result == join_result
+        print(
+            f'{match} {",".join(slugs)}: {exists_result[0]} рецептов, '
+            f'EXISTS {exists_time * 1000:.0f} мс, '
+            f'JOIN+DISTINCT {join_time * 1000:.0f} мс'
+        )
@@ -0,0 +1,70 @@
+"""Фоновые задачи: удаление рецепта и зависшие задачи."""
+from datetime import timedelta
+
+from django.utils import timezone
+from recipes.models import ChangeEvent, Favorite, ShoppingCart
+from tasks.constants import MAX_ATTEMPTS, TASK_TIMEOUT_SECONDS
+from tasks.models import Task
+from tasks.queue import requeue_stale, run_pending, run_periodic
+
+
+def run_queue():
+    while run_pending(100):
+        pass
+
+
+def test_recipe_marks_are_deleted_with_recipe(dataset):
+    dataset.grow(2)
+    recipe = dataset.recipe
+    favorites = Favorite.objects.filter(recipe=recipe)
+    assert favorites.exists()
+    ShoppingCart.objects.create(user=dataset.user, recipe=recipe)
+    run_queue()
+    client = dataset.client(dataset.user)
+    response = client.delete(f'/api/recipes/{recipe.id}/')
+    assert response.status_code == 204
+    # Избранное и списки покупок удаляются в запросе, а задачи только
+    # убирают ленты и файлы.
+    assert not favorites.exists()
+    assert not ShoppingCart.objects.filter(recipe=recipe).exists()
+    assert Favorite.objects.filter(user=dataset.user).exists()
+
+
+def make_running(attempts):
+    return Task.objects.create(
+        name='recipes.tasks.delete_media',
+        status=Task.Status.RUNNING,
+        attempts=attempts,
+        started=timezone.now() - timedelta(seconds=TASK_TIMEOUT_SECONDS + 1),
+    )
+
+
+def test_requeue_stale_counts_attempts(db):
+    retried = make_running(MAX_ATTEMPTS - 1)
+    exhausted = make_running(MAX_ATTEMPTS)
+    fresh = Task.objects.create(
+        name='recipes.tasks.delete_media',
+        status=Task.Status.RUNNING,
+        attempts=1,
+        started=timezone.now(),
+    )
+    assert requeue_stale() == 1
+    retried.refresh_from_db()
+    exhausted.refresh_from_db()
+    fresh.refresh_from_db()
+    assert retried.status == Task.Status.PENDING
+    assert exhausted.status == Task.Status.FAILED
+    assert exhausted.error
+    assert fresh.status == Task.Status.RUNNING
+
+
+def test_worker_assigns_change_positions(dataset):
+    unpositioned = ChangeEvent.objects.filter(position__isnull=True)
+    assert unpositioned.exists()
+    last_runs = {}
+    run_periodic(last_runs)
+    assert not unpositioned.exists()
+    dataset.new_recipe()
+    # Следующий вызов - не раньше CHANGES_SEQUENCE_INTERVAL.
+    run_periodic(last_runs)
+    assert unpositioned.exists()
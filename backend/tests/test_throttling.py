@@ -0,0 +1,113 @@
+"""Ограничение частоты запросов по скользящему окну.
+
+Замер скорости проверки включается переменной окружения
+THROTTLE_BENCHMARK с числом повторов, например:
+
+    THROTTLE_BENCHMARK=100000 pytest tests/test_throttling.py -s
+"""
+import os
+import time
+
+import pytest
+from api.throttling import SlidingWindowThrottle
+from api.views import RecipeViewSet
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
+
+BENCHMARK_REPEATS = int(os.getenv('THROTTLE_BENCHMARK', 0))
+MAX_CHECK_SECONDS = 100e-6
+RATES = {'anon_read': '2/min', 'write': '1/min', 'export': '1/min'}
+WINDOW_START = 6000 * 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {'now': WINDOW_START}
+    monkeypatch.setattr(SlidingWindowThrottle, 'THROTTLE_RATES', RATES)
+    monkeypatch.setattr(
+        SlidingWindowThrottle, 'timer', lambda self: clock['now']
+    )
+    cache.clear()
+    yield clock
+    cache.clear()
+
+
+def make_request(method, user=None):
+    request = getattr(APIRequestFactory(), method)('/')
+    request.user = user or AnonymousUser()
+    return request
+
+
+@pytest.mark.parametrize('method, action, authenticated, scope', (
+    ('get', 'list', False, 'anon_read'),
+    ('get', 'list', True, 'read'),
+    ('post', 'create', True, 'write'),
+    ('post', 'create', False, 'anon_write'),
+    ('get', 'download_shopping_cart', True, 'export'),
+    ('get', 'download_shopping_cart', False, 'anon_export'),
+))
+def test_scope(dataset, method, action, authenticated, scope):
+    view = RecipeViewSet(action=action)
+    request = make_request(method, dataset.user if authenticated else None)
+    assert SlidingWindowThrottle().get_scope(request, view) == scope
+
+
+def test_limit_returns_retry_after(dataset, clock):
+    client = APIClient()
+    for _ in range(2):
+        assert client.get('/api/tags/').status_code == 200
+    response = client.get('/api/tags/')
+    assert response.status_code == 429
+    assert response['Retry-After'] == '60'
+    # В начале следующего окна прошлое окно еще весит весь лимит.
+    clock['now'] += 60
+    assert client.get('/api/tags/').status_code == 429
+    clock['now'] += 1
+    assert client.get('/api/tags/').status_code == 200
+
+
+def test_scopes_are_counted_separately(dataset, clock):
+    client = APIClient()
+    client.force_authenticate(dataset.user)
+    url = '/api/recipes/download_shopping_cart/'
+    assert client.get(url).status_code == 200
+    assert client.get(url).status_code == 429
+    # Чтения ограничены своей областью, а для нее лимита нет.
+    assert client.get('/api/tags/').status_code == 200
+    other = APIClient()
+    other.force_authenticate(dataset.admin)
+    assert other.get(url).status_code == 200
+
+
+def test_requests_are_counted_in_cache(dataset, clock):
+    throttle = SlidingWindowThrottle()
+    request = make_request('get')
+    view = RecipeViewSet(action='list')
+    assert throttle.allow_request(request, view)
+    key = throttle.cache_format.format(
+        scope='anon_read', ident=throttle.get_ident(request),
+        window=WINDOW_START // 60,
+    )
+    assert cache.get(key) == 1
+    assert throttle.allow_request(request, view)
+    assert cache.get(key) == 2
+
+
+@pytest.mark.skipif(
+    not BENCHMARK_REPEATS, reason='задайте THROTTLE_BENCHMARK'
+)
+def test_benchmark(dataset, clock, monkeypatch):
+    monkeypatch.setattr(
+        SlidingWindowThrottle, 'THROTTLE_RATES',
+        {'read': f'{BENCHMARK_REPEATS}/min'},
+    )
+    throttle = SlidingWindowThrottle()
+    view = RecipeViewSet(action='list')
+    request = make_request('get', dataset.user)
+    started = time.perf_counter()
+    for _ in range(BENCHMARK_REPEATS):
+        throttle.allow_request(request, view)
+    spent = (time.perf_counter() - started) / BENCHMARK_REPEATS
+    print(f'\nПроверка ограничения: {spent * 1e6:.1f} мкс')
+    assert spent < MAX_CHECK_SECONDS
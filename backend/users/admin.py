@@ -2,36 +2,62 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
+from foodgram.deletion import BulkDeleteAdminMixin
+from foodgram.paginators import EstimatedCountPaginator
 from recipes.models import Recipe
 from users.models import Follow
 
 user = get_user_model()
 
 
+def count_by_author(model):
+    return Coalesce(Subquery(
+        model.objects.filter(
+            author=OuterRef('pk')
+        ).order_by().values('author').annotate(
+            count=Count('id')
+        ).values('count')
+    ), 0)
+
+
 @admin.register(user)
-class GramUserAdmin(UserAdmin):
+class GramUserAdmin(BulkDeleteAdminMixin, UserAdmin):
     list_display = ('username', 'first_name', 'last_name', 'email',
                     'is_staff', 'recipes_count', 'follow_count')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
-    search_fields = ('username', 'first_name', 'last_name', 'email')
+    search_fields = ('username', 'email')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=count_by_author(Recipe),
+            follow_count=count_by_author(Follow),
+        )
 
-    @admin.display(description='Кол-во рецептов')
+    @admin.display(description='Кол-во рецептов', ordering='recipes_count')
     def recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        return obj.recipes_count
 
-    @admin.display(description='Кол-во подписчиков')
+    @admin.display(description='Кол-во подписчиков', ordering='follow_count')
     def follow_count(self, obj):
-        return Follow.objects.filter(author=obj).count()
+        return obj.follow_count
 
 
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
     search_fields = (
         'user__username',
         'author__username'
     )
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.unregister(Group)